@@ -13,4 +13,31 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'be_blog.settings')
 
-application = get_asgi_application()
+# Django duhet inicializuar para importit të consumer-ave (ata importojnë modele)
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import OriginValidator  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from books_api.routing import websocket_urlpatterns  # noqa: E402
+
+
+class NativeClientOriginValidator(OriginValidator):
+    """
+    Shfletuesit dërgojnë gjithmonë Origin, prandaj kontrollohet me listën e lejuar;
+    app-i Flutter (native) lidhet pa Origin dhe lejohet.
+    """
+
+    def valid_origin(self, parsed_origin):
+        if parsed_origin is None:
+            return True
+        return super().valid_origin(parsed_origin)
+
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'websocket': NativeClientOriginValidator(
+        URLRouter(websocket_urlpatterns), settings.WEBSOCKET_ALLOWED_ORIGINS
+    ),
+})
@@ -0,0 +1,77 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified për list dhe retrieve, pa serializuar asgjë.
+
+    Fingerprint-i llogaritet me një query: max(last_modified_field) + numri i
+    rreshtave. Numri kap fshirjet, prandaj If-None-Match është më i saktë se
+    If-Modified-Since kur klienti dërgon të dyja.
+    """
+    last_modified_field = 'updated_at'
+    # Header-at që ndryshojnë përgjigjen (dhe ETag-un) - dërgohen si Vary
+    vary_headers = ['Accept']
+
+    def get_validators(self, queryset):
+        stats = queryset.order_by().aggregate(
+            last_modified=Max(self.last_modified_field),
+            count=Count('pk')
+        )
+        last_modified = stats['last_modified']
+        fingerprint = '|'.join([
+            queryset.model._meta.label,
+            str(stats['count']),
+            last_modified.isoformat() if last_modified else '',
+            self.request.get_full_path(),
+            self.request.META.get('HTTP_ACCEPT', ''),
+        ])
+        etag = '"%s"' % hashlib.md5(fingerprint.encode('utf-8')).hexdigest()
+        # HTTP-date ka saktësi në sekonda
+        return etag, int(last_modified.timestamp()) if last_modified else None
+
+    def conditional_response(self, request, queryset, respond):
+        """Kthen 304 nëse klienti e ka versionin aktual, përndryshe respond()"""
+        etag, last_modified = self.get_validators(queryset)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = respond()
+        # Accept hyn në ETag (JSON vs API i shfletueshëm) - edhe 304 duhet ta ketë (RFC 9110)
+        patch_vary_headers(response, self.vary_headers)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(
+            request, queryset,
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def get_lookup_queryset(self):
+        """Queryset-i i objektit për retrieve, ose None nëse ID-ja është e pavlefshme"""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            return self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+            )
+        except (ValidationError, ValueError):
+            return None
+
+    def retrieve(self, request, *args, **kwargs):
+        queryset = self.get_lookup_queryset()
+        if queryset is None:
+            # ID e pavlefshme - DRF kthen 404 si zakonisht
+            return super().retrieve(request, *args, **kwargs)
+        return self.conditional_response(
+            request, queryset,
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        )
@@ -0,0 +1,84 @@
+import json
+
+_WHITESPACE = ' \t\n\r'
+
+
+def iter_json_array(fp, buffer_size=64 * 1024):
+    """
+    Lexon një array JSON nga file dhe kthen elementet një nga një.
+
+    Memoria varet nga elementi më i madh, jo nga gjithë file-i: buffer-i mban
+    vetëm pjesën e palexuar. Kur një element nuk përfundon brenda buffer-it,
+    leximi i radhës dyfishohet, që të mos e riparsojmë elementin shumë herë.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+
+    def fill(min_size):
+        nonlocal buffer, pos, eof
+        chunk = fp.read(max(buffer_size, min_size))
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill(0)
+
+    skip_whitespace()
+    if pos >= len(buffer) or buffer[pos] != '[':
+        raise ValueError('JSON duhet të fillojë me një array')
+    pos += 1
+
+    expect_value = True
+    after_comma = False
+    while True:
+        skip_whitespace()
+        if pos >= len(buffer):
+            raise ValueError('JSON i paplotë: mungon ]')
+
+        char = buffer[pos]
+        if char == ']':
+            if after_comma:
+                raise ValueError(f'Presje e tepërt para ] te pozicioni {pos}')
+            pos += 1
+            # Pas ] lejohen vetëm hapësira, si te json.load
+            skip_whitespace()
+            if pos < len(buffer):
+                raise ValueError(f'Të dhëna të tepërta pas ] te pozicioni {pos}')
+            return
+        if not expect_value:
+            if char != ',':
+                raise ValueError(f'Pritej , ose ] te pozicioni {pos}')
+            pos += 1
+            expect_value = after_comma = True
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill(len(buffer) - pos)
+            continue
+
+        # Pas elementit duhet të vijë , ose ] brenda buffer-it; përndryshe
+        # një numër në fund të buffer-it mund të vazhdojë në copën tjetër
+        after = end
+        while after < len(buffer) and buffer[after] in _WHITESPACE:
+            after += 1
+        if not eof and (after == len(buffer) or buffer[after] not in ',]'):
+            fill(len(buffer) - pos)
+            continue
+
+        pos = end
+        expect_value = after_comma = False
+        yield value
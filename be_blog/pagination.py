@@ -0,0 +1,8 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Paginim me kursor mbi (created_at, id) - pa COUNT(*) dhe pa OFFSET"""
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -0,0 +1,61 @@
+import logging
+
+from django.utils import timezone
+
+from .transactions import CommitBatches
+
+logger = logging.getLogger(__name__)
+
+# Grupi ku bashkohen të gjithë klientët e lidhur në /ws/updates/
+CONTENT_UPDATES_GROUP = 'content_updates'
+
+# Kur i njëjti objekt ndryshon disa herë në një transaksion, mbetet veprimi më i fortë
+_ACTION_PRIORITY = {'updated': 0, 'created': 1, 'deleted': 2}
+
+
+def _merge(events, event):
+    key = (event['kind'], event['id'])
+    previous = events.get(key)
+    if previous is None or _ACTION_PRIORITY[event['action']] >= _ACTION_PRIORITY[previous['action']]:
+        events[key] = event
+    elif event['version'] is not None:
+        previous['version'] = event['version']
+
+
+def broadcast_content_update(kind, object_id, action='updated', version=None):
+    """
+    Njofton klientët WebSocket që një libër/kuiz/njoftim ndryshoi.
+    Eventi dërgohet pas commit, një herë për objekt edhe nëse ndryshoi disa herë;
+    eventet e një savepoint-i të kthyer mbrapsht (rollback) nuk dërgohen.
+    """
+    event = {'kind': kind, 'id': str(object_id), 'action': action, 'version': version}
+    _pending.record(lambda events: _merge(events, event))
+
+
+def _flush_events(batches):
+    """Ekzekutohet pas commit me eventet e të gjithë blloqeve atomic të mbijetuara"""
+    events = {}
+    for batch in batches:
+        for event in batch.values():
+            _merge(events, event)
+
+    from asgiref.sync import async_to_sync
+    from channels.layers import get_channel_layer
+
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+
+    sent_at = timezone.now().isoformat()
+    for event in events.values():
+        try:
+            async_to_sync(channel_layer.group_send)(
+                CONTENT_UPDATES_GROUP,
+                {'type': 'content.update', 'event': {**event, 'sentAt': sent_at}}
+            )
+        except Exception:
+            # WebSocket është optimizim - klienti bie përsëri te check_updates
+            logger.exception(f"Could not broadcast {event['kind']} {event['id']}")
+
+
+_pending = CommitBatches(dict, _flush_events)
@@ -55,7 +55,7 @@ INSTALLED_APPS = [
     'corsheaders',
     'cloudinary',
     'cloudinary_storage',
-    # 'channels'
+    'channels',
 
 ]
 
@@ -102,6 +102,27 @@ DATABASES = {
 }
 
 
+# Cache - local-memory si parazgjedhje, mund të zëvendësohet me Redis/Memcached
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'biblioteka',
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    }
+}
+
+# Sa gjatë ruhen fragmentet e serializuara të librave (sekonda)
+BOOK_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Cache për URL-të e file-ve në storage (None = pa skadim)
+STORAGE_URL_CACHE_TIMEOUT = None
+
+# Sa libra lexohen nga databaza për çdo copë në initial_sync?stream=
+SYNC_STREAM_CHUNK_SIZE = 100
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -170,6 +191,24 @@ CORS_ALLOWED_ORIGINS = [
 
 FIREBASE_CREDENTIALS_PATH = os.path.join(BASE_DIR, 'firebase-credentials.json')
 
+# Push outbox - dërgohet nga `manage.py process_push_outbox`
+PUSH_TRANSPORT = 'notifications_api.services.FirebaseTransport'
+PUSH_MAX_ATTEMPTS = 5
+PUSH_RETRY_BACKOFF = 30  # sekonda, dyfishohet në çdo përpjekje
+PUSH_LOCK_TIMEOUT = 300  # pas kaq sekondash një mesazh "sending" rimerret
+PUSH_COALESCE_WINDOW = 300  # njoftimet e përsëritura për të njëjtin libër/kuiz bashkohen
+PUSH_RATE_LIMIT = 100  # mesazhe/sekondë drejt Firebase
+PUSH_RATE_BURST = 500
+
+# Delta sync: tombstone-t mbahen kaq ditë, kursorët më të vjetër marrin 410 + resync
+DELTA_TOMBSTONE_RETENTION_DAYS = 30
+
+# Dritaret e dërgimit për njoftimet e planifikuara sipas locale-it:
+# {'sq': ('Europe/Tirane', '08:00', '21:00')}; locale pa dritare dërgohet menjëherë
+NOTIFICATION_DELIVERY_WINDOWS = {
+    'sq': ('Europe/Tirane', '08:00', '21:00'),
+}
+
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 
 CLOUDINARY_STORAGE = {
@@ -179,13 +218,24 @@ CLOUDINARY_STORAGE = {
 }
 
 
-# Channels për WebSocket
-# ASGI_APPLICATION = 'project.asgi.application'
-# CHANNEL_LAYERS = {
-#     'default': {
-#         'BACKEND': 'channels_redis.core.RedisChannelBackend',
-#         'CONFIG': {
-#             "hosts": [('127.0.0.1', 6379)],
-#         },
-#     },
-# }
\ No newline at end of file
+# Channels për WebSocket (/ws/updates/)
+ASGI_APPLICATION = 'be_blog.asgi.application'
+# Origjinat e lejuara për shfletuesit; klientët native (Flutter) nuk dërgojnë Origin
+WEBSOCKET_ALLOWED_ORIGINS = ALLOWED_HOSTS
+# In-memory funksionon vetëm me një proces; me disa workers vendos REDIS_URL
+# (channels_redis në requirements.txt)
+if os.getenv('REDIS_URL'):
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                'hosts': [os.getenv('REDIS_URL')],
+            },
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        },
+    }
\ No newline at end of file
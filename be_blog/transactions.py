@@ -0,0 +1,61 @@
+import threading
+import weakref
+
+from django.db import transaction
+
+
+class _Batch:
+    def __init__(self, owner, data):
+        self.owner = owner
+        self.data = data
+        self.flushed = False
+
+    def run(self):
+        self.owner.run()
+
+
+class CommitBatches:
+    """
+    Të dhëna që mblidhen gjatë transaksionit dhe përpunohen një herë pas commit.
+
+    Çdo bllok atomic (savepoint) ka grupin e vet, që e mban gjallë vetëm
+    callback-u i tij on_commit: kur Django e hedh callback-un në rollback,
+    grupi zhduket bashkë me të dhe ndryshimet e anuluara nuk dërgohen kurrë.
+    """
+
+    def __init__(self, factory, flush):
+        self.factory = factory  # krijon të dhënat bosh të një grupi
+        self.flush = flush  # thirret pas commit me të dhënat e të gjithë grupeve
+        self._local = threading.local()
+
+    def _batches(self):
+        batches = getattr(self._local, 'batches', None)
+        if batches is None:
+            batches = self._local.batches = weakref.WeakValueDictionary()
+        return batches
+
+    def record(self, update):
+        """update(data) shton ndryshimin te grupi i bllokut atomic aktual"""
+        batches = self._batches()
+        connection = transaction.get_connection()
+        if connection.in_atomic_block:
+            scope = tuple(connection.savepoint_ids)
+            batch = batches.get(scope)
+        else:
+            # Brenda callback-eve pas commit: bashkohet me grupet që s'janë dërguar ende
+            scope = None
+            batch = next((b for b in list(batches.values()) if not b.flushed), None)
+
+        if batch is None or batch.flushed:
+            batch = batches[scope] = _Batch(self, self.factory())
+        update(batch.data)
+        # Një callback për thirrje (si on_commit i zakonshëm); pas të parit, të tjerët janë no-op
+        transaction.on_commit(batch.run)
+
+    def run(self):
+        """Callback-u i parë pas commit përpunon të gjithë grupet e mbijetuara; të tjerët janë no-op"""
+        pending = [batch for batch in list(self._batches().values()) if not batch.flushed]
+        for batch in pending:
+            batch.flushed = True
+        if pending:
+            self.flush([batch.data for batch in pending])
@@ -0,0 +1,102 @@
+"""
+Krahason memorien maksimale (peak RSS) të json.load me iter_json_array
+mbi një eksport sintetik books.json.
+
+    python benchmarks/json_import_rss.py              # ~1 GB
+    python benchmarks/json_import_rss.py --size-mb 50
+
+Çdo mënyrë ekzekutohet në proces të veçantë, që matjet të mos përzihen.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+
+def synthetic_book(book_id, pages=40, elements=5):
+    return {
+        'id': str(book_id),
+        'title': f'Libri sintetik {book_id}',
+        'author': 'Autor',
+        'translator': '',
+        'category': 'tjeter',
+        'coverImage': f'assets/images/covers/{book_id}.png',
+        'pdfPath': '',
+        'pages': [
+            {
+                'elements': [
+                    {
+                        'type': 'text',
+                        'content': f'Faqja {page} elementi {position} ' + 'lorem ipsum ' * 8,
+                        'position': position,
+                    }
+                    for position in range(elements)
+                ]
+            }
+            for page in range(pages)
+        ],
+    }
+
+
+def write_export(path, size_mb):
+    target = size_mb * 1024 * 1024
+    written = 0
+    book_id = 0
+    with open(path, 'w', encoding='utf-8') as fp:
+        fp.write('[')
+        while written < target:
+            chunk = json.dumps(synthetic_book(book_id), ensure_ascii=False)
+            fp.write((',' if book_id else '') + chunk)
+            written += len(chunk) + 1
+            book_id += 1
+        fp.write(']')
+    return book_id
+
+
+def measure(mode, path):
+    from be_blog.jsonstream import iter_json_array
+
+    started = time.perf_counter()
+    with open(path, 'r', encoding='utf-8') as fp:
+        if mode == 'load':
+            count = sum(1 for _ in json.load(fp))
+        else:
+            count = sum(1 for _ in iter_json_array(fp))
+    elapsed = time.perf_counter() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'mode': mode, 'books': count, 'seconds': round(elapsed, 2), 'peak_rss_mb': peak_kb // 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=int, default=1024)
+    parser.add_argument('--measure', choices=['load', 'stream'], help=argparse.SUPPRESS)
+    parser.add_argument('--file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure, args.file)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'books.json')
+        print(f'Generating ~{args.size_mb} MB export...')
+        books = write_export(path, args.size_mb)
+        print(f'{books} books, {os.path.getsize(path) // (1024 * 1024)} MB')
+
+        for mode in ('stream', 'load'):
+            subprocess.run(
+                [sys.executable, __file__, '--measure', mode, '--file', path],
+                check=True
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Mat serializimin e kuizeve me 10k pyetje: N+1 (pa prefetch), serializer-i
+nested i DRF me prefetch, dhe serializer-i i sheshtë (QuizSerializer).
+
+    python benchmarks/quiz_serialize.py
+    python benchmarks/quiz_serialize.py --questions 20000 --options 4 --runs 5
+
+Të dhënat krijohen në një DB testi (SQLite në memorie), jo në db.sqlite3.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'be_blog.settings')
+
+
+def seed(questions, options, per_quiz):
+    from books_api.models import Book
+    from quizes_api.models import AnswerOption, Question, Quiz
+
+    book = Book.objects.create(title='Benchmark', author='Autor', category='tjeter')
+    quizzes = Quiz.objects.bulk_create(
+        [Quiz(book=book, title=f'Kuiz {i}') for i in range(-(-questions // per_quiz))]
+    )
+    created = Question.objects.bulk_create([
+        Question(
+            quiz=quizzes[i // per_quiz],
+            text=f'Pyetja {i} ' + 'lorem ipsum ' * 4,
+            correct_option_index=i % options,
+            order=i % per_quiz,
+        )
+        for i in range(questions)
+    ], batch_size=2000)
+    AnswerOption.objects.bulk_create([
+        AnswerOption(question=question, text=f'Opsioni {order}', order=order)
+        for question in created
+        for order in range(options)
+    ], batch_size=2000)
+
+
+def nested_drf_serializer():
+    """Serializer-i i vjetër: fushat nested të DRF për çdo pyetje dhe opsion"""
+    from rest_framework import serializers
+
+    from quizes_api.models import AnswerOption, Question, Quiz
+
+    class OptionSerializer(serializers.ModelSerializer):
+        class Meta:
+            model = AnswerOption
+            fields = ['text']
+
+    class QuestionSerializer(serializers.ModelSerializer):
+        options = OptionSerializer(many=True, read_only=True)
+
+        class Meta:
+            model = Question
+            fields = ['id', 'text', 'options', 'correct_option_index']
+
+    class QuizSerializer(serializers.ModelSerializer):
+        questions = QuestionSerializer(many=True, read_only=True)
+
+        class Meta:
+            model = Quiz
+            fields = ['id', 'book', 'title', 'questions']
+
+    return QuizSerializer
+
+
+def measure(queryset, serializer_class, runs):
+    """Koha e query-ve (fetch) dhe e serializimit veç e veç; query-t numërohen me execute_wrapper"""
+    from django.db import connection
+
+    fetch = []
+    serialize = []
+    queries = []
+
+    def count(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count):
+        for _ in range(runs):
+            queries.clear()
+            started = time.perf_counter()
+            quizzes = list(queryset.all())
+            fetched = time.perf_counter()
+            data = serializer_class(quizzes, many=True).data
+            fetch.append(fetched - started)
+            serialize.append(time.perf_counter() - fetched)
+    return {
+        'fetch_ms': round(statistics.median(fetch) * 1000, 1),
+        'serialize_ms': round(statistics.median(serialize) * 1000, 1),
+        'queries': len(queries),
+        'questions': sum(len(quiz['questions']) for quiz in data),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', type=int, default=10000)
+    parser.add_argument('--options', type=int, default=4)
+    parser.add_argument('--per-quiz', type=int, default=10)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    from quizes_api.models import Quiz
+    from quizes_api.serializers import QuizSerializer
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    seed(args.questions, args.options, args.per_quiz)
+
+    report = {
+        'questions': args.questions,
+        'options': args.options,
+        'n_plus_one': measure(Quiz.objects.all(), QuizSerializer, args.runs),
+        'prefetch_drf_nested': measure(Quiz.objects.with_questions(), nested_drf_serializer(), args.runs),
+        'prefetch_flat': measure(Quiz.objects.with_questions(), QuizSerializer, args.runs),
+    }
+    print(json.dumps(report))
+
+
+if __name__ == '__main__':
+    main()
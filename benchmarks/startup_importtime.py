@@ -0,0 +1,94 @@
+"""
+Mat kohën e importeve në startup me `python -X importtime manage.py check`
+dhe dështon nëse një modul i rëndë (firebase_admin, google-auth, grpc)
+importohet përsëri gjatë nisjes.
+
+    python benchmarks/startup_importtime.py
+    python benchmarks/startup_importtime.py --runs 5 --max-ms 400 --top 20
+
+Kthen exit code 1 kur gjendet një modul i ndaluar ose kur mediana kalon --max-ms.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Ngarkohen vetëm në dërgimin e parë (notifications_api.services.get_firebase_app)
+FORBIDDEN = ('firebase_admin', 'google.auth', 'google.cloud', 'grpc')
+
+
+def run_once():
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', 'manage.py', 'check'],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - started
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|', 2)
+        # Emri ruan hapësirat e nivelit: "  django.http" është nën-import
+        imports.append((name[1:].rstrip(), int(cumulative_us)))
+    return wall, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=15, help='Top-level imports to list')
+    parser.add_argument('--max-ms', type=float, help='Fail when median import time exceeds this')
+    args = parser.parse_args()
+
+    walls = []
+    totals = []
+    imports = []
+    for _ in range(args.runs):
+        wall, imports = run_once()
+        walls.append(wall)
+        # Vetëm importet e nivelit të parë; cumulative përfshin nën-importet
+        totals.append(sum(us for name, us in imports if not name.startswith(' ')) / 1000)
+
+    top_level = sorted(
+        ((name.strip(), us / 1000) for name, us in imports if not name.startswith(' ')),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:args.top]
+    loaded = {name.strip() for name, _ in imports}
+    forbidden = sorted(
+        name for name in loaded if any(name == f or name.startswith(f + '.') for f in FORBIDDEN)
+    )
+
+    report = {
+        'runs': args.runs,
+        'median_import_ms': round(statistics.median(totals), 1),
+        'median_wall_ms': round(statistics.median(walls) * 1000, 1),
+        'modules': len(loaded),
+        'forbidden': forbidden[:10],
+    }
+    print(json.dumps(report))
+    for name, ms in top_level:
+        print(f'{ms:9.1f} ms  {name}')
+
+    failed = False
+    if forbidden:
+        print(f'✗ Heavy modules imported at startup: {", ".join(forbidden[:5])}', file=sys.stderr)
+        failed = True
+    if args.max_ms is not None and report['median_import_ms'] > args.max_ms:
+        print(f'✗ Import time {report["median_import_ms"]} ms > {args.max_ms} ms', file=sys.stderr)
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Lidh N klientë WebSocket lokalë te /ws/updates/ dhe mat vonesën e fan-out:
+nga group_send deri sa çdo klient merr eventin.
+
+    python benchmarks/ws_fanout.py
+    python benchmarks/ws_fanout.py --clients 2000 --events 50
+
+Klientët janë ASGI communicators në të njëjtin proces (pa rrjet), prandaj
+matet kostoja e channel layer-it dhe e consumer-ave. Me REDIS_URL të vendosur
+përdoret RedisChannelLayer në vend të atij in-memory.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'be_blog.settings')
+
+
+async def connect(application, count):
+    from asgiref.testing import ApplicationCommunicator
+
+    clients = []
+    for _ in range(count):
+        client = ApplicationCommunicator(application, {
+            'type': 'websocket',
+            'path': '/ws/updates/',
+            'headers': [(b'host', b'localhost'), (b'origin', b'http://localhost')],
+            'query_string': b'',
+            'subprotocols': [],
+        })
+        await client.send_input({'type': 'websocket.connect'})
+        clients.append(client)
+    for client in clients:
+        message = await client.receive_output(5)
+        assert message['type'] == 'websocket.accept', message
+    return clients
+
+
+async def run(clients_count, events):
+    from channels.layers import get_channel_layer
+
+    from be_blog.asgi import application
+    from be_blog.realtime import CONTENT_UPDATES_GROUP
+
+    layer = get_channel_layer()
+    started = time.perf_counter()
+    clients = await connect(application, clients_count)
+    connect_seconds = time.perf_counter() - started
+
+    latencies = []
+    fanouts = []
+    for seq in range(events):
+        sent = time.perf_counter()
+        await layer.group_send(CONTENT_UPDATES_GROUP, {
+            'type': 'content.update',
+            'event': {'kind': 'book', 'id': str(seq), 'action': 'updated', 'version': seq},
+        })
+
+        async def receive(client):
+            message = await client.receive_output(10)
+            assert json.loads(message['text'])['id'] == str(seq)
+            return time.perf_counter() - sent
+
+        received = await asyncio.gather(*(receive(client) for client in clients))
+        latencies.extend(received)
+        fanouts.append(max(received))
+
+    for client in clients:
+        await client.send_input({'type': 'websocket.disconnect', 'code': 1000})
+    for client in clients:
+        await client.wait(5)
+
+    latencies.sort()
+    return {
+        'clients': clients_count,
+        'events': events,
+        'layer': type(layer).__name__,
+        'connect_seconds': round(connect_seconds, 2),
+        'latency_ms_p50': round(latencies[len(latencies) // 2] * 1000, 2),
+        'latency_ms_p95': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        'latency_ms_max': round(latencies[-1] * 1000, 2),
+        'fanout_ms_avg': round(statistics.mean(fanouts) * 1000, 2),
+        'deliveries_per_second': round(len(latencies) / sum(fanouts)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--events', type=int, default=20)
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+
+    print(json.dumps(asyncio.run(run(args.clients, args.events))))
+
+
+if __name__ == '__main__':
+    main()
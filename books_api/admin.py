@@ -1,9 +1,11 @@
 from django.contrib import admin
 from django.contrib import messages
+from django.urls import reverse
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from .models import Book, BookPage, PageElement
-from notifications_api.services import send_book_notification
+from .storage_urls import resolve_file_url
+from notifications_api.services import send_book_notification, create_push_job
 
 
 class PageElementInline(admin.TabularInline):
@@ -14,7 +16,7 @@ class PageElementInline(admin.TabularInline):
 
     def preview_image(self, obj):
         if obj.image_file:
-            return mark_safe(f'<img src="{obj.image_file.url}" width="100" />')
+            return mark_safe(f'<img src="{resolve_file_url(obj.image_file)}" width="100" />')
         return "Nuk ka imazh"
 
     preview_image.short_description = 'Preview'
@@ -145,7 +147,7 @@ class BookAdmin(admin.ModelAdmin):
         # Nëse cover_file është ngarkuar dhe cover_image është bosh
         if obj.cover_file and not obj.cover_image:
             super().save_model(request, obj, form, change)
-            obj.cover_image = request.build_absolute_uri(obj.cover_file.url)
+            obj.cover_image = request.build_absolute_uri(resolve_file_url(obj.cover_file))
             obj.save(update_fields=['cover_image'])
         else:
             super().save_model(request, obj, form, change)
@@ -157,7 +159,7 @@ class BookAdmin(admin.ModelAdmin):
                 if success:
                     messages.success(
                         request,
-                        f'✅ Njoftimi për librin u dërgua: {response}'
+                        f'✅ Njoftimi për librin u vendos në radhë: {response}'
                     )
                 else:
                     messages.warning(
@@ -171,46 +173,22 @@ class BookAdmin(admin.ModelAdmin):
                 )
 
     def send_notification_for_books(self, request, queryset):
-        """Dërgo notification për librat e zgjedhur"""
-        sent = 0
-        failed = 0
-        already_sent = 0
-        inactive = 0
-
-        for book in queryset:
-            if not book.is_active:
-                inactive += 1
-                continue
-
-            if book.notification_sent:
-                already_sent += 1
-                continue
-
-            try:
-                success, response = send_book_notification(book)
-                if success:
-                    sent += 1
-                else:
-                    failed += 1
-                    messages.warning(
-                        request,
-                        f'⚠️ Libri "{book.title}": {response}'
-                    )
-            except Exception as e:
-                failed += 1
-                messages.error(
-                    request,
-                    f'❌ Gabim për "{book.title}": {str(e)}'
-                )
-
-        if sent > 0:
-            messages.success(request, f'✅ U dërguan {sent} njoftime të reja')
+        """Krijon një punë të vetme për librat e zgjedhur; worker-i i dërgon në grupe"""
+        inactive = queryset.filter(is_active=False).count()
+        already_sent = queryset.filter(is_active=True, notification_sent=True).count()
+        book_ids = list(queryset.filter(is_active=True, notification_sent=False).values_list('id', flat=True))
+
+        if book_ids:
+            job = create_push_job('book', book_ids)
+            url = reverse('admin:notifications_api_pushjob_change', args=[job.pk])
+            messages.success(
+                request,
+                format_html('✅ U krijua puna <a href="{}">#{}</a> për {} njoftime', url, job.pk, len(book_ids))
+            )
         if already_sent > 0:
             messages.info(request, f'ℹ️ {already_sent} libra kishin njoftim të dërguar tashmë')
         if inactive > 0:
             messages.warning(request, f'⚠️ {inactive} libra nuk janë aktivë')
-        if failed > 0:
-            messages.error(request, f'❌ {failed} njoftime dështuan')
 
     send_notification_for_books.short_description = "📚 Dërgo njoftim për librat e zgjedhur"
 
@@ -260,7 +238,7 @@ class PageElementAdmin(admin.ModelAdmin):
 
     def image_preview(self, obj):
         if obj.image_file:
-            return mark_safe(f'<img src="{obj.image_file.url}" width="200" />')
+            return mark_safe(f'<img src="{resolve_file_url(obj.image_file)}" width="200" />')
         return "Nuk ka imazh"
 
     image_preview.short_description = 'Preview'
\ No newline at end of file
@@ -0,0 +1,51 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from quizes_api.models import Quiz
+from quizes_api.serializers import QuizSerializer
+from .cache import BOOK_CACHE_TIMEOUT, cached_book_representations
+from .serializers import BookDetailSerializer
+
+
+def bundle_validators(book, request, with_answers=False):
+    """
+    ETag dhe Last-Modified e bundle-it me një query për kuizet: versioni dhe
+    updated_at i librit + numri dhe max(updated_at) i kuizeve (kap edhe fshirjet).
+    with_answers hyn në ETag, që bundle-i me përgjigje të mos ndajë çelës me atë pa to.
+    """
+    stats = Quiz.objects.filter(book=book).order_by().aggregate(
+        count=Count('pk'), last_modified=Max('updated_at')
+    )
+    last_modified = max(filter(None, [book.updated_at, stats['last_modified']]))
+    fingerprint = '|'.join([
+        str(book.pk),
+        str(book.version),
+        book.updated_at.isoformat(),
+        str(stats['count']),
+        stats['last_modified'].isoformat() if stats['last_modified'] else '',
+        request.build_absolute_uri('/'),
+        'answers' if with_answers else 'no-answers',
+    ])
+    etag = '"%s"' % hashlib.md5(fingerprint.encode('utf-8')).hexdigest()
+    return etag, int(last_modified.timestamp())
+
+
+def get_book_bundle(book, request, etag, with_answers=False):
+    """
+    Libri (fragmenti 'detail' i cache-uar) + kuizet me pyetje, i ruajtur në cache sipas ETag-ut.
+    Fragmenti ka çelës nga version/updated_at i librit, pra është i njëjti gjendje si ETag-u.
+    Kuizet kalojnë nga QuizSerializer, pra pa correctOptionIndex si te /api/quizzes/.
+    """
+    key = 'books_api:bundle:%s:%s:%d' % (book.pk, etag.strip('"'), with_answers)
+    data = cache.get(key)
+    if data is None:
+        detail = cached_book_representations([book], BookDetailSerializer, {'request': request}, 'detail')[0]
+        quizzes = Quiz.objects.with_questions().filter(book=book)
+        data = {
+            'book': dict(detail, version=book.version, updatedAt=book.updated_at.isoformat()),
+            'quizzes': QuizSerializer(quizzes, many=True, context={'with_answers': with_answers}).data,
+        }
+        cache.set(key, data, timeout=BOOK_CACHE_TIMEOUT)
+    return data
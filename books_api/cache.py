@@ -0,0 +1,70 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+
+from .models import content_prefetch
+
+BOOK_CACHE_TIMEOUT = getattr(settings, 'BOOK_CACHE_TIMEOUT', 60 * 60 * 24)
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def _fragment_key(book, kind, base_url):
+    """
+    Çelësi vjen nga rreshti në DB (version + updated_at), jo nga një gjeneratë
+    në memorien e procesit: çdo ndryshim - nga admin-i, komandat ose worker-at -
+    jep çelës të ri në të gjitha proceset, edhe me LocMemCache.
+    """
+    return f'books_api:book:{book.pk}:{book.version}:{book.updated_at.isoformat()}:{kind}:{base_url}'
+
+
+def cached_book_representations(books, serializer_class, context, kind):
+    """
+    Kthen output-in e serializer-it për secilin libër, duke marrë nga cache
+    fragmentet ekzistuese dhe duke serializuar vetëm ato që mungojnë.
+
+    Çelësi përmban version/updated_at e librit dhe host-in e kërkesës, sepse
+    URL-të absolute varen prej tij. Ndryshimet e faqeve prekin updated_at
+    (books_api.signals), prandaj nuk nevojitet invalidim.
+    """
+    books = list(books)
+    if not books:
+        return []
+
+    request = context.get('request')
+    base_url = request.build_absolute_uri('/') if request else ''
+
+    data_keys = {book.pk: _fragment_key(book, kind, base_url) for book in books}
+    found = cache.get_many(data_keys.values())
+
+    misses = [book for book in books if data_keys[book.pk] not in found]
+    if misses:
+        if kind == 'detail':
+            prefetch_related_objects(misses, content_prefetch())
+        computed = serializer_class(misses, many=True, context=context).data
+        fresh = {data_keys[book.pk]: data for book, data in zip(misses, computed)}
+        cache.set_many(fresh, timeout=BOOK_CACHE_TIMEOUT)
+        found.update(fresh)
+
+    with _stats_lock:
+        _stats['hits'] += len(books) - len(misses)
+        _stats['misses'] += len(misses)
+
+    return [found[data_keys[book.pk]] for book in books]
+
+
+def cache_stats():
+    with _stats_lock:
+        stats = dict(_stats)
+    total = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / total if total else 0.0
+    return stats
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats['hits'] = 0
+        _stats['misses'] = 0
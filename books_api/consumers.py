@@ -1,3 +1,31 @@
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from be_blog.realtime import CONTENT_UPDATES_GROUP
+
+
+class ContentUpdatesConsumer(AsyncJsonWebsocketConsumer):
+    """
+    /ws/updates/ - dërgon klientit një event të vogël sa herë që shtohet ose
+    ndryshon një libër, kuiz apo njoftim, që app-i të rifreskojë pa polling:
+    {"kind": "book", "id": "...", "action": "updated", "version": 3, "sentAt": "..."}
+    """
+
+    async def connect(self):
+        await self.channel_layer.group_add(CONTENT_UPDATES_GROUP, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        await self.channel_layer.group_discard(CONTENT_UPDATES_GROUP, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        # Klienti mund të dërgojë ping për të mbajtur lidhjen hapur
+        if content.get('type') == 'ping':
+            await self.send_json({'type': 'pong'})
+
+    async def content_update(self, event):
+        await self.send_json(event['event'])
+
+
 # # books/consumers.py
 # import json
 # from channels.generic.websocket import AsyncWebsocketConsumer
@@ -0,0 +1,80 @@
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Book, BookTombstone, TombstoneHorizon
+
+# Sa ditë mbahen tombstone-t; kursorët më të vjetër marrin përgjigjen "resync"
+TOMBSTONE_RETENTION_DAYS = getattr(settings, 'DELTA_TOMBSTONE_RETENTION_DAYS', 30)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorExpired(ValueError):
+    """Tombstone-t pas kursorit janë fshirë - klienti duhet të bëjë sinkronizim të plotë"""
+
+
+def encode_cursor(timestamp, object_id):
+    """Kursor opak: (timestamp, id) i ndryshimit të fundit të dërguar"""
+    raw = json.dumps([timestamp.isoformat(), str(object_id)])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii'))
+        timestamp, object_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), uuid.UUID(object_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor(cursor)
+
+
+def collect_changes(cursor=None, limit=50):
+    """
+    Kthen ndryshimet pas kursorit, të renditura sipas (koha, id).
+    Çdo element është (timestamp, book_id, book ose None për tombstone).
+    Libra të çaktivizuar raportohen si tombstone.
+    """
+    books = Book.objects.order_by('updated_at', 'id')
+    tombstones = BookTombstone.objects.order_by('deleted_at', 'book_id')
+
+    if cursor:
+        timestamp, object_id = decode_cursor(cursor)
+        horizon = TombstoneHorizon.objects.filter(pk=1).values_list('pruned_before', flat=True).first()
+        if horizon is not None and timestamp < horizon:
+            raise CursorExpired(cursor)
+        books = books.filter(
+            Q(updated_at__gt=timestamp) | Q(updated_at=timestamp, id__gt=object_id)
+        )
+        tombstones = tombstones.filter(
+            Q(deleted_at__gt=timestamp) | Q(deleted_at=timestamp, book_id__gt=object_id)
+        )
+
+    changes = [
+        (book.updated_at, book.id, book if book.is_active else None)
+        for book in books.only('id', 'updated_at', 'is_active')[:limit + 1]
+    ]
+    changes += [
+        (tombstone.deleted_at, tombstone.book_id, None)
+        for tombstone in tombstones[:limit + 1]
+    ]
+    changes.sort(key=lambda change: (change[0], str(change[1])))
+
+    has_more = len(changes) > limit
+    return changes[:limit], has_more
+
+
+def prune_tombstones():
+    """Fshin tombstone-t jashtë dritares dhe e shënon kufirin për kursorët e vjetër"""
+    cutoff = timezone.now() - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+    deleted, _ = BookTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    if deleted:
+        TombstoneHorizon.objects.update_or_create(pk=1, defaults={'pruned_before': cutoff})
+    return deleted
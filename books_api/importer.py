@@ -0,0 +1,144 @@
+import time
+import uuid
+
+from django.db import connection, transaction
+
+from .models import Book, BookPage, PageElement
+from .signals import book_content_changed
+
+
+def book_uuid_for(numeric_id):
+    """UUID deterministik bazuar në ID numerik (i njëjtë me import_quizzes)"""
+    return uuid.uuid5(uuid.NAMESPACE_DNS, f"book_{numeric_id}")
+
+
+def _static_path(path):
+    """Konverto paths nga Flutter në Django paths"""
+    return (path or '').replace('assets/', '/static/')
+
+
+def _page_signature(elements):
+    """Elementet e një faqeje (dict nga JSON), të renditur sipas pozicionit"""
+    return tuple(sorted((e['type'], e['content'], e['position']) for e in elements))
+
+
+def _stored_page_signature(page):
+    return tuple(sorted((e.type, e.content, e.position) for e in page.elements.all()))
+
+
+class BookImportEngine:
+    """
+    Importon librat me bulk_create për faqet dhe elementet.
+    Çdo libër shkruhet në transaksionin e vet (ose gjithë file-i, nëse thirrësi
+    e mbështjell në transaction.atomic) dhe vetëm faqet e ndryshuara rishkruhen.
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.rows = 0
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def import_book(self, book_data):
+        """Kthen (book, status) ku status është 'created', 'updated' ose 'unchanged'"""
+        started = time.perf_counter()
+        with transaction.atomic():
+            book, status = self._upsert_book(book_data)
+            pages_changed = self._sync_pages(book, book_data.get('pages', []))
+            if pages_changed:
+                # bulk_create nuk dërgon sinjale
+                book_content_changed(book_id=book.pk)
+        self.elapsed += time.perf_counter() - started
+
+        if status == 'unchanged' and pages_changed:
+            status = 'updated'
+        setattr(self, status, getattr(self, status) + 1)
+        return book, status
+
+    def _upsert_book(self, book_data):
+        fields = {
+            'title': book_data['title'],
+            'author': book_data['author'],
+            'translator': book_data.get('translator', ''),
+            'category': book_data['category'],
+            'cover_image': _static_path(book_data['coverImage']),
+            'pdf_path': _static_path(book_data.get('pdfPath', '')),
+        }
+        book_uuid = book_uuid_for(book_data['id'])
+        book = Book.objects.filter(pk=book_uuid).first()
+
+        if book is None:
+            book = Book(id=book_uuid, **fields)
+            book.save(force_insert=True)
+            self.rows += 1
+            return book, 'created'
+
+        changed = [name for name, value in fields.items() if getattr(book, name) != value]
+        if not changed:
+            return book, 'unchanged'
+        for name in changed:
+            setattr(book, name, fields[name])
+        book.save(update_fields=changed + ['updated_at'])
+        self.rows += 1
+        return book, 'updated'
+
+    def _sync_pages(self, book, pages_data):
+        """Krahason faqet ekzistuese me ato të reja dhe shkruan vetëm diferencën"""
+        incoming = {}
+        for page_index, page_data in enumerate(pages_data):
+            elements = []
+            for element_data in page_data.get('elements', []):
+                content = element_data['content']
+                if element_data['type'] == 'image':
+                    content = _static_path(content)
+                elements.append({
+                    'type': element_data['type'],
+                    'content': content,
+                    'position': element_data['position'],
+                })
+            incoming[page_index + 1] = elements
+
+        existing = {
+            page.page_number: page
+            for page in BookPage.objects.filter(book=book).prefetch_related('elements')
+        }
+
+        removed = [page.pk for number, page in existing.items() if number not in incoming]
+        rewritten = []
+        new_numbers = []
+        for number, elements in incoming.items():
+            page = existing.get(number)
+            if page is None:
+                new_numbers.append(number)
+            elif _stored_page_signature(page) != _page_signature(elements):
+                rewritten.append(page)
+
+        if not (removed or rewritten or new_numbers):
+            return False
+
+        if removed:
+            BookPage.objects.filter(pk__in=removed).delete()
+            self.rows += len(removed)
+        if rewritten:
+            self.rows += PageElement.objects.filter(page__in=rewritten).delete()[0]
+
+        new_pages = BookPage.objects.bulk_create(
+            [BookPage(book=book, page_number=number) for number in new_numbers]
+        )
+        if new_pages and not connection.features.can_return_rows_from_bulk_insert:
+            new_pages = list(BookPage.objects.filter(book=book, page_number__in=new_numbers))
+        self.rows += len(new_pages)
+
+        elements = [
+            PageElement(page=page, **element)
+            for page in rewritten + new_pages
+            for element in incoming[page.page_number]
+        ]
+        PageElement.objects.bulk_create(elements, batch_size=500)
+        self.rows += len(elements)
+        return True
@@ -2,10 +2,11 @@
 import os
 import uuid
 from django.core.management.base import BaseCommand
-from django.core.files.base import ContentFile
-from django.core.files import File
 from django.conf import settings
+from django.db import transaction
 from books_api.models import Book, BookPage, PageElement
+from books_api.storage_urls import resolve_file_url
+from books_api.uploads import UploadPipeline
 from quizes_api.models import Quiz, Question, AnswerOption
 from notifications_api.services import send_book_notification, send_quiz_notification
 
@@ -25,74 +26,102 @@ class Command(BaseCommand):
             action='store_true',
             help='Send notification after creating'
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Number of parallel upload threads'
+        )
 
     def handle(self, *args, **options):
         pdf_filename = options['pdf']
         send_notification = options['send_notification']
 
-        # 1. Krijo test book
-        book = Book.objects.create(
-            title="Test: Historia e Zubejrit",
-            author="Test Author",
-            translator="Test Translator",
-            category="jetaESahabeve",
-            is_active=True,
-            version=1
-        )
+        # 1. Ngarko file-t paralelisht, para se të krijohet ndonjë rresht në DB
+        storage = Book._meta.get_field('pdf_file').storage
+        pdf_upload = None
+        cover_upload = None
+        with UploadPipeline(storage=storage, max_workers=options['workers']) as pipeline:
+            pdf_path = os.path.join(settings.BASE_DIR, pdf_filename)
+            if os.path.exists(pdf_path):
+                with open(pdf_path, 'rb') as pdf_file:
+                    pdf_upload = pipeline.submit('pdfs/', pdf_filename, pdf_file.read())
+            else:
+                self.stdout.write(
+                    self.style.WARNING(f'⚠️ PDF not found at {pdf_path}')
+                )
 
-        self.stdout.write(f'✅ Created book: {book.title} (ID: {book.id})')
+            cover_bytes = self.build_cover_image()
+            if cover_bytes:
+                cover_upload = pipeline.submit('covers/', 'cover.jpg', cover_bytes)
 
-        # 2. Shto PDF nga file lokale
-        pdf_path = os.path.join(settings.BASE_DIR, pdf_filename)
+            pipeline.wait()
 
-        if os.path.exists(pdf_path):
-            with open(pdf_path, 'rb') as pdf_file:
-                book.pdf_file.save(pdf_filename, File(pdf_file))
-                book.pdf_path = book.pdf_file.url
-                book.save()
-                self.stdout.write(f'✅ Added PDF: {pdf_filename}')
-        else:
-            self.stdout.write(
-                self.style.WARNING(f'⚠️ PDF not found at {pdf_path}')
-            )
+        self.stdout.write(
+            f'✅ Uploaded {pipeline.uploaded} files ({pipeline.deduplicated} already in storage)'
+        )
+
+        # 2. Krijo librin dhe përmbajtjen në një transaksion
+        with transaction.atomic():
+            book, quiz = self.create_book(pdf_upload, cover_upload, pdf_filename)
 
-        # 3. Shto cover image (përdor një test image)
+        self.notify_and_report(book, quiz, send_notification)
+
+    def build_cover_image(self):
+        """Krijo një cover image të thjeshtë me Pillow (None nëse Pillow mungon)"""
         try:
-            # Krijo një cover image të thjeshtë me Pillow
             from PIL import Image, ImageDraw, ImageFont
             import io
+        except ImportError:
+            self.stdout.write(
+                self.style.WARNING('⚠️ Pillow not installed, using placeholder URL')
+            )
+            return None
 
-            # Krijo image
-            img = Image.new('RGB', (300, 400), color='#4CAF50')
-            draw = ImageDraw.Draw(img)
+        # Krijo image
+        img = Image.new('RGB', (300, 400), color='#4CAF50')
+        draw = ImageDraw.Draw(img)
 
-            # Shto tekst
-            try:
-                font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 30)
-            except:
-                font = ImageFont.load_default()
+        # Shto tekst
+        try:
+            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 30)
+        except:
+            font = ImageFont.load_default()
 
-            draw.text((20, 150), "HISTORIA E\nZUBEJRIT", fill='white', font=font)
+        draw.text((20, 150), "HISTORIA E\nZUBEJRIT", fill='white', font=font)
 
-            # Ruaj si bytes
-            img_bytes = io.BytesIO()
-            img.save(img_bytes, format='JPEG')
-            img_bytes.seek(0)
+        # Ruaj si bytes
+        img_bytes = io.BytesIO()
+        img.save(img_bytes, format='JPEG')
+        return img_bytes.getvalue()
 
-            # Ruaj në model
-            book.cover_file.save(f'cover_{book.id}.jpg', ContentFile(img_bytes.read()))
-            book.cover_image = book.cover_file.url
-            book.save()
-            self.stdout.write('✅ Created cover image')
+    def create_book(self, pdf_upload, cover_upload, pdf_filename):
+        book = Book(
+            title="Test: Historia e Zubejrit",
+            author="Test Author",
+            translator="Test Translator",
+            category="jetaESahabeve",
+            is_active=True,
+            version=1
+        )
 
-        except ImportError:
-            self.stdout.write(
-                self.style.WARNING('⚠️ Pillow not installed, using placeholder URL')
-            )
+        if pdf_upload:
+            book.pdf_file = pdf_upload.result()
+            book.pdf_path = resolve_file_url(book.pdf_file)
+        if cover_upload:
+            book.cover_file = cover_upload.result()
+            book.cover_image = resolve_file_url(book.cover_file)
+        else:
             book.cover_image = 'https://via.placeholder.com/300x400/4CAF50/FFFFFF?text=Zubejri'
-            book.save()
+        book.save()
+
+        self.stdout.write(f'✅ Created book: {book.title} (ID: {book.id})')
+        if pdf_upload:
+            self.stdout.write(f'✅ Added PDF: {pdf_filename}')
+        if cover_upload:
+            self.stdout.write('✅ Created cover image')
 
-        # 4. Shto pages me content
+        # 3. Shto pages me content
         # Page 1
         page1 = BookPage.objects.create(book=book, page_number=1)
 
@@ -140,7 +169,7 @@ class Command(BaseCommand):
 
         self.stdout.write(f'✅ Added {book.pages.count()} pages with content')
 
-        # 5. Krijo quiz për librin
+        # 4. Krijo quiz për librin
         quiz = Quiz.objects.create(
             book=book,
             title=f"Quiz - {book.title}"
@@ -186,8 +215,10 @@ class Command(BaseCommand):
         AnswerOption.objects.create(question=q3, text="Tetë", order=3)
 
         self.stdout.write(f'✅ Created quiz with {quiz.questions.count()} questions')
+        return book, quiz
 
-        # 6. Dërgo notification nëse është kërkuar
+    def notify_and_report(self, book, quiz, send_notification):
+        # 5. Dërgo notification nëse është kërkuar
         if send_notification:
             # Për book
             success, response = send_book_notification(book)
@@ -24,6 +24,11 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing data before import'
         )
+        parser.add_argument(
+            '--stream',
+            action='store_true',
+            help='Parse the JSON files incrementally'
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(self.style.NOTICE('Starting full import...\n'))
@@ -33,7 +38,8 @@ class Command(BaseCommand):
         call_command(
             'import_books',
             file=options['books_file'],
-            clear=options['clear']
+            clear=options['clear'],
+            stream=options['stream']
         )
 
         # Then import quizzes
@@ -41,7 +47,8 @@ class Command(BaseCommand):
         call_command(
             'import_quizzes',
             file=options['quizzes_file'],
-            clear=options['clear']
+            clear=options['clear'],
+            stream=options['stream']
         )
 
         self.stdout.write(
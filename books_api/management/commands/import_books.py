@@ -1,9 +1,12 @@
 import json
 import os
-import uuid
+from contextlib import nullcontext
 from django.core.management.base import BaseCommand
 from django.conf import settings
-from books_api.models import Book, BookPage, PageElement
+from be_blog.jsonstream import iter_json_array
+from django.db import transaction
+from books_api.models import Book
+from books_api.importer import BookImportEngine
 
 
 class Command(BaseCommand):
@@ -21,6 +24,16 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing books before import'
         )
+        parser.add_argument(
+            '--stream',
+            action='store_true',
+            help='Parse the JSON file incrementally, one object at a time'
+        )
+        parser.add_argument(
+            '--atomic',
+            action='store_true',
+            help='Import the whole file in a single transaction (default: one per book)'
+        )
 
     def handle(self, *args, **options):
         file_path = options['file']
@@ -38,8 +51,14 @@ class Command(BaseCommand):
         # Lexo JSON file
         self.stdout.write(f'Reading file: {file_path}')
         with open(file_path, 'r', encoding='utf-8') as file:
-            books_data = json.load(file)
+            if options['stream']:
+                # Një objekt në memorie për herë, jo gjithë file-i
+                books_data = iter_json_array(file)
+            else:
+                books_data = json.load(file)
+            self.import_books(books_data, options)
 
+    def import_books(self, books_data, options):
         # Clear existing nëse është specifikuar
         if options['clear']:
             self.stdout.write('Clearing existing books...')
@@ -47,73 +66,31 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('All books deleted!'))
 
         # Import books
-        created_count = 0
-        updated_count = 0
+        engine = BookImportEngine()
 
         # Ruaj mapping për përdorim nga import_quizzes
         book_id_mapping = {}
 
-        for book_data in books_data:
-            self.stdout.write(f"Processing book: {book_data['title']}")
-
-            # Konverto paths nga Flutter në Django paths
-            cover_image = book_data['coverImage'].replace('assets/', '/static/')
-            pdf_path = book_data.get('pdfPath', '').replace('assets/', '/static/')
-
-            # ✅ Gjeneroj UUID deterministik bazuar në ID numerik
-            numeric_id = book_data['id']
-            book_uuid = uuid.uuid5(uuid.NAMESPACE_DNS, f"book_{numeric_id}")
-
-            # Krijo ose përditëso librin
-            book, created = Book.objects.update_or_create(
-                id=book_uuid,  # ✅ Përdor UUID
-                defaults={
-                    'title': book_data['title'],
-                    'author': book_data['author'],
-                    'translator': book_data.get('translator', ''),
-                    'category': book_data['category'],
-                    'cover_image': cover_image,
-                    'pdf_path': pdf_path,
-                }
-            )
+        with transaction.atomic() if options['atomic'] else nullcontext():
+            for book_data in books_data:
+                self.stdout.write(f"Processing book: {book_data['title']}")
 
-            # ✅ Ruaj mapping
-            book_id_mapping[str(numeric_id)] = str(book_uuid)
+                book, status = engine.import_book(book_data)
+                numeric_id = book_data['id']
 
-            if created:
-                created_count += 1
-                self.stdout.write(
-                    self.style.SUCCESS(f'✓ Created book: {book.title} (ID: {numeric_id} → {str(book_uuid)[:8]}...)')
-                )
-            else:
-                updated_count += 1
-                self.stdout.write(
-                    self.style.WARNING(f'↻ Updated book: {book.title} (ID: {numeric_id} → {str(book_uuid)[:8]}...)')
-                )
-
-            # Fshi faqet ekzistuese dhe krijo të rejat
-            book.pages.all().delete()
-
-            # Import pages
-            for page_index, page_data in enumerate(book_data.get('pages', [])):
-                page = BookPage.objects.create(
-                    book=book,
-                    page_number=page_index + 1
-                )
-
-                # Import elements
-                for element_data in page_data.get('elements', []):
-                    # Konverto image paths
-                    content = element_data['content']
-                    if element_data['type'] == 'image':
-                        content = content.replace('assets/', '/static/')
-
-                    PageElement.objects.create(
-                        page=page,
-                        type=element_data['type'],
-                        content=content,
-                        position=element_data['position']
+                # ✅ Ruaj mapping
+                book_id_mapping[str(numeric_id)] = str(book.id)
+
+                if status == 'created':
+                    self.stdout.write(
+                        self.style.SUCCESS(f'✓ Created book: {book.title} (ID: {numeric_id} → {str(book.id)[:8]}...)')
                     )
+                elif status == 'updated':
+                    self.stdout.write(
+                        self.style.WARNING(f'↻ Updated book: {book.title} (ID: {numeric_id} → {str(book.id)[:8]}...)')
+                    )
+                else:
+                    self.stdout.write(f'= Unchanged book: {book.title}')
 
         # ✅ Ruaj mapping në një file për përdorim nga import_quizzes
         mapping_file = os.path.join(settings.BASE_DIR, 'book_id_mapping.json')
@@ -127,6 +104,11 @@ class Command(BaseCommand):
         # Summary
         self.stdout.write(
             self.style.SUCCESS(
-                f'\nImport completed! Created: {created_count}, Updated: {updated_count}'
+                f'\nImport completed! Created: {engine.created}, Updated: {engine.updated}, '
+                f'Unchanged: {engine.unchanged}'
             )
+        )
+        self.stdout.write(
+            f'Rows written: {engine.rows} in {engine.elapsed:.2f}s '
+            f'({engine.rows_per_second:.0f} rows/sec)'
         )
\ No newline at end of file
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:36
+
+from django.db import migrations, models
+
+
+def create_generation(apps, schema_editor):
+    # Snapshot-et e vjetra kanë version nga Max+1; rindërtohen në kërkesën e parë
+    apps.get_model('books_api', 'CatalogSnapshot').objects.all().delete()
+    apps.get_model('books_api', 'CatalogGeneration').objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books_api', '0004_delta_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='catalogsnapshot',
+            constraint=models.UniqueConstraint(fields=('base_url', 'version'), name='catalog_snapshot_version_unique'),
+        ),
+        migrations.RunPython(create_generation, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books_api', '0005_catalog_generation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TombstoneHorizon',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pruned_before', models.DateTimeField()),
+            ],
+        ),
+    ]
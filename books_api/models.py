@@ -3,6 +3,7 @@ from django.utils import timezone
 import uuid
 
 from notifications_api.services import send_book_notification
+from .storage_urls import resolve_file_url
 
 
 class BookCategory(models.TextChoices):
@@ -22,6 +23,22 @@ class BookCategory(models.TextChoices):
     TJETER = 'tjeter', 'Tjeter'
 
 
+def content_prefetch():
+    """Prefetch i faqeve dhe elementeve, i renditur, një query për nivel"""
+    return models.Prefetch(
+        'pages',
+        queryset=BookPage.objects.order_by('page_number').prefetch_related(
+            models.Prefetch('elements', queryset=PageElement.objects.order_by('position'))
+        )
+    )
+
+
+class BookQuerySet(models.QuerySet):
+    def with_content(self):
+        """Ngarkon faqet dhe elementet me nga një query për secilin nivel"""
+        return self.prefetch_related(content_prefetch())
+
+
 class Book(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
@@ -55,8 +72,13 @@ class Book(models.Model):
     notification_sent_at = models.DateTimeField(null=True, blank=True, verbose_name='Dërguar më')
     notification_count = models.IntegerField(default=0, verbose_name='Nr. njoftimesh')
 
+    objects = BookQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='book_updated_at_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -64,7 +86,7 @@ class Book(models.Model):
     def get_cover_url(self):
         """Kthen URL-në e cover - prioritet për file të ngarkuar"""
         if self.cover_file:
-            return self.cover_file.url
+            return resolve_file_url(self.cover_file)
         return self.cover_image or ''
 
     def save(self, *args, **kwargs):
@@ -76,7 +98,7 @@ class Book(models.Model):
             super().save(*args, **kwargs)
             # Pas save-it, cover_file.url është i disponueshëm
             if not self.cover_image:
-                self.cover_image = self.cover_file.url
+                self.cover_image = resolve_file_url(self.cover_file)
                 super().save(update_fields=['cover_image'])
         else:
             super().save(*args, **kwargs)
@@ -114,4 +136,53 @@ class PageElement(models.Model):
         ordering = ['position']
 
     def __str__(self):
-        return f"{self.page.book.title} - Faqja {self.page.page_number} - {self.type}"
\ No newline at end of file
+        return f"{self.page.book.title} - Faqja {self.page.page_number} - {self.type}"
+
+class BookTombstone(models.Model):
+    """Gjurmë për libra të fshirë, që delta sync t'ua raportojë klientëve"""
+    book_id = models.UUIDField(db_index=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['deleted_at', 'book_id'], name='tombstone_deleted_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.book_id} (fshirë më {self.deleted_at})"
+
+
+class TombstoneHorizon(models.Model):
+    """
+    Një rresht i vetëm (pk=1): tombstone-t para pruned_before janë fshirë, pra
+    kursorët delta më të vjetër se kjo kohë duhet të rifillojnë nga e para
+    """
+    pruned_before = models.DateTimeField()
+
+
+class CatalogSnapshot(models.Model):
+    """JSON i parapërgatitur i katalogut aktiv për initial_sync"""
+    version = models.PositiveIntegerField()
+    base_url = models.CharField(max_length=255)
+    etag = models.CharField(max_length=64)
+    payload = models.BinaryField()
+    payload_gzip = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-version']
+        constraints = [
+            models.UniqueConstraint(fields=['base_url', 'version'], name='catalog_snapshot_version_unique'),
+        ]
+
+    def __str__(self):
+        return f"Snapshot v{self.version} ({self.base_url})"
+
+
+class CatalogGeneration(models.Model):
+    """
+    Një rresht i vetëm (pk=1): rritet në çdo invalidim të katalogut. Snapshot-i
+    ruhet vetëm nëse gjenerata nuk ka ndryshuar gjatë ndërtimit të tij.
+    """
+    value = models.PositiveIntegerField(default=0)
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Book, BookPage, PageElement
+from .storage_urls import resolve_file_url
 
 
 class PageElementSerializer(serializers.ModelSerializer):
@@ -38,10 +39,11 @@ class BookListSerializer(serializers.ModelSerializer):
     def get_pdfPath(self, obj):
         """Merr URL-në e PDF - prioritet për file të ngarkuar"""
         if obj.pdf_file:
+            pdf_url = resolve_file_url(obj.pdf_file)
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(obj.pdf_file.url)
-            return obj.pdf_file.url
+                return request.build_absolute_uri(pdf_url)
+            return pdf_url
         return obj.pdf_path or ''
 
     def to_representation(self, instance):
@@ -83,10 +85,11 @@ class BookDetailSerializer(serializers.ModelSerializer):
     def get_pdfPath(self, obj):
         """Merr URL-në e PDF"""
         if obj.pdf_file:
+            pdf_url = resolve_file_url(obj.pdf_file)
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(obj.pdf_file.url)
-            return obj.pdf_file.url
+                return request.build_absolute_uri(pdf_url)
+            return pdf_url
         return obj.pdf_path or ''
 
     def get_pages(self, obj):
@@ -1,3 +1,125 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from be_blog.realtime import broadcast_content_update
+from be_blog.transactions import CommitBatches
+from .models import Book, BookPage, PageElement, BookTombstone
+from .storage_urls import resolve_file_url, uploaded_file_fields
+
+
+def _new_changes():
+    return {'saved': set(), 'touch': set(), 'pages': set(), 'deleted': set()}
+
+
+def book_content_changed(book_id=None, page_id=None, saved=False, deleted=False):
+    """
+    Regjistron ndryshimin e një libri; efektet ekzekutohen pas commit.
+    Book.updated_at përditësohet pas commit, që delta sync ta shohë ndryshimin
+    edhe kur transaksioni zgjati përtej kursorëve të dhënë ndërkohë.
+    saved=True: vetë libri u ruajt dhe e ka njoftuar book_changed.
+    deleted=True: i njëjti përditësim bëhet te tombstone-i i librit.
+    """
+    def update(pending):
+        if book_id is not None:
+            pending['deleted' if deleted else 'saved' if saved else 'touch'].add(book_id)
+        if page_id is not None:
+            pending['pages'].add(page_id)
+    _pending.record(update)
+
+
+def _flush_changed_books(batches):
+    """Ekzekutohet pas commit me ndryshimet e blloqeve atomic të mbijetuara"""
+    from .delta import prune_tombstones
+    from .snapshot import invalidate_catalog_snapshots
+
+    pending = _new_changes()
+    for batch in batches:
+        for name, ids in batch.items():
+            pending[name].update(ids)
+
+    touch_ids = set(pending['touch'])
+    if pending['pages']:
+        touch_ids.update(
+            BookPage.objects.filter(pk__in=pending['pages']).values_list('book_id', flat=True)
+        )
+    now = timezone.now()
+    if touch_ids or pending['saved']:
+        Book.objects.filter(pk__in=touch_ids | pending['saved']).update(updated_at=now)
+    if pending['deleted']:
+        # Libri i rikrijuar me të njëjtin UUID raportohet nga Book, jo nga tombstone-i
+        BookTombstone.objects.filter(book_id__in=pending['deleted']).exclude(
+            book_id__in=Book.objects.filter(pk__in=pending['deleted']).values('pk')
+        ).filter(deleted_at__lt=now).update(deleted_at=now)
+        prune_tombstones()
+    invalidate_catalog_snapshots()
+    # Faqet/elementet e ndryshuara - ruajtja e vetë librit e njofton në book_changed
+    for book_id in touch_ids:
+        broadcast_content_update('book', book_id)
+
+
+_pending = CommitBatches(_new_changes, _flush_changed_books)
+
+
+FILE_FIELDS = {
+    Book: ['cover_file', 'pdf_file'],
+    PageElement: ['image_file'],
+}
+
+
+@receiver(pre_save, sender=Book)
+@receiver(pre_save, sender=PageElement)
+def remember_uploads(sender, instance, **kwargs):
+    instance._uploaded_file_fields = uploaded_file_fields(instance, FILE_FIELDS[sender])
+
+
+def refresh_uploaded_urls(instance):
+    """Pas ngarkimit, URL-ja e re vendoset në cache menjëherë"""
+    for name in getattr(instance, '_uploaded_file_fields', []):
+        resolve_file_url(getattr(instance, name), refresh=True)
+    instance._uploaded_file_fields = []
+
+
+# Fusha që nuk hyjnë në përmbajtjen e app-it (snapshot, fragmente, delta)
+NOTIFICATION_TRACKING_FIELDS = frozenset(['notification_sent', 'notification_sent_at', 'notification_count'])
+
+
+@receiver(post_save, sender=Book)
+def book_changed(sender, instance, created=False, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= NOTIFICATION_TRACKING_FIELDS:
+        return
+    refresh_uploaded_urls(instance)
+    # auto_now vendos kohën brenda transaksionit; touch e rivendos pas commit
+    book_content_changed(book_id=instance.pk, saved=True)
+    # Libri i çaktivizuar zhduket nga app-i si i fshirë (si te delta)
+    action = 'deleted' if not instance.is_active else 'created' if created else 'updated'
+    broadcast_content_update('book', instance.pk, action, version=instance.version)
+
+
+@receiver(post_delete, sender=Book)
+def book_deleted(sender, instance, **kwargs):
+    BookTombstone.objects.create(book_id=instance.pk)
+    book_content_changed(book_id=instance.pk, deleted=True)
+    broadcast_content_update('book', instance.pk, 'deleted')
+
+
+@receiver(post_save, sender=BookPage)
+@receiver(post_delete, sender=BookPage)
+def page_changed(sender, instance, **kwargs):
+    book_content_changed(book_id=instance.book_id)
+
+
+@receiver(post_save, sender=PageElement)
+def element_saved(sender, instance, **kwargs):
+    refresh_uploaded_urls(instance)
+    book_content_changed(page_id=instance.page_id)
+
+
+@receiver(post_delete, sender=PageElement)
+def element_deleted(sender, instance, **kwargs):
+    book_content_changed(page_id=instance.page_id)
+
+
 # from django.db.models.signals import post_save
 # from django.dispatch import receiver
 # from django.utils import timezone
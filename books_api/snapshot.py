@@ -0,0 +1,83 @@
+import gzip
+import hashlib
+import json
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cache import cached_book_representations
+from .models import Book, CatalogGeneration, CatalogSnapshot
+from .serializers import BookDetailSerializer
+
+
+def get_catalog_snapshot(request):
+    """Kthen snapshot-in aktual për host-in e kërkesës, e ndërton nëse mungon"""
+    base_url = request.build_absolute_uri('/')
+    snapshot = CatalogSnapshot.objects.filter(base_url=base_url).first()
+    if snapshot is None:
+        snapshot = build_catalog_snapshot(request)
+    return snapshot
+
+
+def build_catalog_snapshot(request):
+    """
+    Serializon një herë gjithë katalogun aktiv dhe e ruan si blob.
+    Gjenerata lexohet para librave: nëse një invalidim ndodh gjatë ndërtimit,
+    snapshot-i (i ndërtuar nga të dhëna të vjetra) kthehet por nuk ruhet.
+    """
+    generation = CatalogGeneration.objects.get_or_create(pk=1)[0].value
+    books = Book.objects.filter(is_active=True)
+    content = json.dumps(
+        cached_book_representations(books, BookDetailSerializer, {'request': request}, 'detail'),
+        ensure_ascii=False,
+        separators=(',', ':')
+    ).encode('utf-8')
+    # ETag-u nga librat vetëm: rindërtimi pa ndryshime nuk i detyron klientët të shkarkojnë sërish
+    sync_date = json.dumps(timezone.now().isoformat()).encode('utf-8')
+    payload = b'{"books":' + content + b',"sync_date":' + sync_date + b'}'
+    snapshot = CatalogSnapshot(
+        version=generation,
+        base_url=request.build_absolute_uri('/'),
+        etag=hashlib.sha256(content).hexdigest()[:32],
+        payload=payload,
+        payload_gzip=gzip.compress(payload, compresslevel=9),
+        created_at=timezone.now(),
+    )
+
+    with transaction.atomic():
+        # Bllokon gjeneratën: invalidimi pret derisa të ruhet (dhe pastaj e fshin)
+        current = CatalogGeneration.objects.select_for_update().get(pk=1).value
+        if current != generation:
+            return snapshot
+        existing = CatalogSnapshot.objects.filter(base_url=snapshot.base_url, version=generation).first()
+        if existing is not None:
+            return existing
+        snapshot.save()
+    return snapshot
+
+
+def accepts_gzip(request):
+    """Accept-Encoding me q-values: 'gzip;q=0' e refuzon, '*' vlen për gzip kur ai mungon"""
+    qualities = {}
+    for coding in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = coding.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+    quality = qualities.get('gzip', qualities.get('x-gzip', qualities.get('*', 0.0)))
+    return quality > 0
+
+
+def invalidate_catalog_snapshots():
+    """Rrit gjeneratën dhe fshin snapshot-et; i radhës ndërtohet në kërkesën e parë"""
+    with transaction.atomic():
+        if not CatalogGeneration.objects.filter(pk=1).update(value=F('value') + 1):
+            CatalogGeneration.objects.get_or_create(pk=1, defaults={'value': 1})
+        CatalogSnapshot.objects.all().delete()
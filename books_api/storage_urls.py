@@ -0,0 +1,40 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+# None = pa skadim; URL-të e Cloudinary për një emër file nuk ndryshojnë
+STORAGE_URL_CACHE_TIMEOUT = getattr(settings, 'STORAGE_URL_CACHE_TIMEOUT', None)
+
+
+def _cache_key(field_file):
+    storage = type(field_file.storage)
+    identity = f'{storage.__module__}.{storage.__qualname__}:{field_file.name}'
+    return 'storage_url:' + hashlib.md5(identity.encode('utf-8')).hexdigest()
+
+
+def resolve_file_url(field_file, refresh=False):
+    """
+    Kthen field_file.url duke e ruajtur në cache sipas (storage, emri i file),
+    që listat të mos e thërrasin storage-in (Cloudinary) për çdo rresht
+    """
+    if not field_file:
+        return ''
+    key = _cache_key(field_file)
+    if not refresh:
+        url = cache.get(key)
+        if url is not None:
+            return url
+    url = field_file.url
+    cache.set(key, url, STORAGE_URL_CACHE_TIMEOUT)
+    return url
+
+
+def uploaded_file_fields(instance, field_names):
+    """Fushat që kanë file të ri të pangarkuar ende (thirret para save)"""
+    uploaded = []
+    for name in field_names:
+        field_file = getattr(instance, name)
+        if field_file and not field_file._committed:
+            uploaded.append(name)
+    return uploaded
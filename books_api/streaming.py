@@ -0,0 +1,46 @@
+import json
+
+from django.conf import settings
+from django.utils import timezone
+
+from .cache import cached_book_representations
+from .models import Book
+from .serializers import BookDetailSerializer
+
+SYNC_STREAM_CHUNK_SIZE = getattr(settings, 'SYNC_STREAM_CHUNK_SIZE', 100)
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def iter_book_batches(request, chunk_size=SYNC_STREAM_CHUNK_SIZE):
+    """Lexon librat aktivë me .iterator() dhe i serializon në grupe"""
+    books = Book.objects.filter(is_active=True).order_by('-created_at', '-id')
+    context = {'request': request}
+    batch = []
+    for book in books.iterator(chunk_size=chunk_size):
+        batch.append(book)
+        if len(batch) == chunk_size:
+            yield cached_book_representations(batch, BookDetailSerializer, context, 'detail')
+            batch = []
+    if batch:
+        yield cached_book_representations(batch, BookDetailSerializer, context, 'detail')
+
+
+def iter_ndjson(request, chunk_size=SYNC_STREAM_CHUNK_SIZE):
+    """Rreshti i parë mban sync_date, pastaj një libër për rresht"""
+    yield _dumps({'sync_date': timezone.now().isoformat()}) + '\n'
+    for batch in iter_book_batches(request, chunk_size):
+        yield ''.join(_dumps(book) + '\n' for book in batch)
+
+
+def iter_json(request, chunk_size=SYNC_STREAM_CHUNK_SIZE):
+    """I njëjti format si initial_sync, i dërguar në copa"""
+    yield '{"sync_date":%s,"books":[' % _dumps(timezone.now().isoformat())
+    first = True
+    for batch in iter_book_batches(request, chunk_size):
+        chunk = ','.join(_dumps(book) for book in batch)
+        yield chunk if first else ',' + chunk
+        first = False
+    yield ']}'
@@ -1,3 +1,734 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import io
+import json
+import shutil
+import tempfile
+import uuid
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from asgiref.testing import ApplicationCommunicator
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import connection, transaction
+from django.test import TestCase, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from be_blog.asgi import application
+from be_blog.jsonstream import iter_json_array
+from be_blog.realtime import CONTENT_UPDATES_GROUP
+from quizes_api.models import Question
+from quizes_api.tests import create_quiz
+
+from .models import Book, BookPage, BookTombstone, PageElement, CatalogGeneration, CatalogSnapshot
+from .snapshot import build_catalog_snapshot, invalidate_catalog_snapshots
+from .bundle import bundle_validators, get_book_bundle
+from .delta import encode_cursor
+from .importer import BookImportEngine, book_uuid_for
+from .uploads import UploadPipeline
+from .cache import cache_stats, reset_cache_stats
+
+
+def create_book(title='Libër', pages=2, elements=2, **kwargs):
+    book = Book.objects.create(
+        title=title,
+        author='Autor',
+        category='tjeter',
+        cover_image='https://example.com/cover.png',
+        **kwargs
+    )
+    for page_number in range(1, pages + 1):
+        page = BookPage.objects.create(book=book, page_number=page_number)
+        for position in range(elements):
+            PageElement.objects.create(
+                page=page,
+                type='text',
+                content=f'Faqja {page_number} - {position}',
+                position=position
+            )
+    return book
+
+
+class BookPrefetchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def count_snapshot_queries(self):
+        request = RequestFactory().get('/api/books/initial_sync/')
+        invalidate_catalog_snapshots()
+        with CaptureQueriesContext(connection) as ctx:
+            snapshot = build_catalog_snapshot(request)
+        return len(ctx.captured_queries), snapshot
+
+    def test_snapshot_build_query_count_is_constant(self):
+        create_book('Një', pages=1, elements=1)
+        small, _ = self.count_snapshot_queries()
+
+        for i in range(5):
+            create_book(f'Libër {i}', pages=4, elements=3)
+        large, snapshot = self.count_snapshot_queries()
+
+        self.assertEqual(small, large)
+        self.assertIn('Libër 4', bytes(snapshot.payload).decode('utf-8'))
+
+    def test_retrieve_keeps_page_and_element_order(self):
+        book = create_book(pages=3, elements=2)
+        queries, response = self.count_queries(f'/api/books/{book.id}/')
+
+        # validatorët + libri + faqet + elementet
+        self.assertEqual(queries, 4)
+        pages = response.json()['pages']
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(pages[0]['elements'][0]['content'], 'Faqja 1 - 0')
+        self.assertEqual([e['position'] for e in pages[2]['elements']], [0, 1])
+
+
+class CatalogSnapshotTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.book = create_book('Snapshot')
+
+    def test_initial_sync_serves_stored_snapshot(self):
+        response = self.client.get('/api/books/initial_sync/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['books'][0]['title'], 'Snapshot')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertEqual(CatalogSnapshot.objects.count(), 1)
+
+        with self.assertNumQueries(1):
+            again = self.client.get('/api/books/initial_sync/')
+        self.assertEqual(again.content, response.content)
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get('/api/books/initial_sync/')['ETag']
+        response = self.client.get('/api/books/initial_sync/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_gzip_variant(self):
+        response = self.client.get('/api/books/initial_sync/', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'Snapshot', gzip.decompress(response.content))
+
+        for header in ('gzip;q=0', 'br, gzip; q=0.0', 'identity', '*;q=0', 'gzip;q=abc'):
+            response = self.client.get('/api/books/initial_sync/', HTTP_ACCEPT_ENCODING=header)
+            self.assertFalse(response.has_header('Content-Encoding'), header)
+            self.assertIn(b'Snapshot', response.content)
+        for header in ('GZIP;q=0.5', '*', 'br;q=1, *;q=0.1'):
+            response = self.client.get('/api/books/initial_sync/', HTTP_ACCEPT_ENCODING=header)
+            self.assertEqual(response['Content-Encoding'], 'gzip', header)
+
+    def test_rebuild_without_changes_keeps_etag(self):
+        response = self.client.get('/api/books/initial_sync/')
+        invalidate_catalog_snapshots()
+
+        again = self.client.get('/api/books/initial_sync/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertIn('sync_date', response.json())
+
+    def test_notification_tracking_save_keeps_snapshot(self):
+        self.client.get('/api/books/initial_sync/')
+        self.book.notification_sent = True
+        self.book.notification_sent_at = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.save(update_fields=['notification_sent', 'notification_sent_at'])
+        self.assertTrue(CatalogSnapshot.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.save(update_fields=['title', 'notification_sent'])
+        self.assertFalse(CatalogSnapshot.objects.exists())
+
+    def test_snapshot_built_across_an_invalidation_is_not_stored(self):
+        from . import snapshot as snapshot_module
+        build = snapshot_module.cached_book_representations
+
+        def build_then_invalidate(*args):
+            # Një shkrimtar bën commit ndërsa kërkesa po ndërton nga të dhënat e vjetra
+            data = build(*args)
+            invalidate_catalog_snapshots()
+            return data
+
+        with mock.patch.object(snapshot_module, 'cached_book_representations', build_then_invalidate):
+            response = self.client.get('/api/books/initial_sync/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(CatalogSnapshot.objects.exists())
+
+        self.client.get('/api/books/initial_sync/')
+        self.assertEqual(CatalogSnapshot.objects.get().version, CatalogGeneration.objects.get().value)
+
+    def test_content_change_invalidates_snapshot(self):
+        old_etag = self.client.get('/api/books/initial_sync/')['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            element = PageElement.objects.filter(page__book=self.book).first()
+            element.content = 'Përmbajtje e re'
+            element.save()
+        self.assertFalse(CatalogSnapshot.objects.exists())
+
+        response = self.client.get('/api/books/initial_sync/')
+        self.assertNotEqual(response['ETag'], old_etag)
+        self.assertIn('Përmbajtje e re', response.content.decode('utf-8'))
+
+
+class DeltaSyncTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def delta(self, cursor=None, limit=50):
+        params = {'limit': limit}
+        if cursor:
+            params['cursor'] = cursor
+        response = self.client.get('/api/books/delta/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_first_call_returns_all_books(self):
+        create_book('A')
+        create_book('B')
+        data = self.delta()
+        self.assertEqual({b['title'] for b in data['books']}, {'A', 'B'})
+        self.assertEqual(data['deleted'], [])
+        self.assertFalse(data['has_more'])
+        self.assertIn('version', data['books'][0])
+
+    def test_reports_edits_page_changes_and_tombstones(self):
+        edited = create_book('Edited')
+        paged = create_book('Paged')
+        hidden = create_book('Hidden')
+        removed = create_book('Removed')
+        cursor = self.delta()['next_cursor']
+
+        self.assertEqual(self.delta(cursor)['books'], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            edited.title = 'Edited 2'
+            edited.save()
+            element = PageElement.objects.filter(page__book=paged).first()
+            element.content = 'Ndryshuar'
+            element.save()
+            hidden.is_active = False
+            hidden.save()
+            removed_id = str(removed.id)
+            removed.delete()
+
+        data = self.delta(cursor)
+        self.assertEqual({b['title'] for b in data['books']}, {'Edited 2', 'Paged'})
+        self.assertEqual(set(data['deleted']), {str(hidden.id), removed_id})
+
+    def test_cursor_paging(self):
+        for i in range(5):
+            create_book(f'Libër {i}', pages=1, elements=1)
+
+        seen = []
+        cursor = None
+        while True:
+            data = self.delta(cursor, limit=2)
+            seen += [b['title'] for b in data['books']]
+            cursor = data['next_cursor']
+            if not data['has_more']:
+                break
+        self.assertEqual(sorted(seen), [f'Libër {i}' for i in range(5)])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/books/delta/', {'cursor': 'jo-kursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_changes_from_long_transaction_are_not_skipped(self):
+        edited = create_book('Edited')
+        removed = create_book('Removed')
+        removed_id = str(removed.id)
+
+        with mock.patch('books_api.signals.timezone') as clock:
+            with self.captureOnCommitCallbacks(execute=True):
+                edited.title = 'Edited 2'
+                edited.save()
+                removed.delete()
+                # Një klient tjetër merr kursor pas këtyre kohëve, ndërsa transaksioni është ende i hapur
+                mid_transaction = timezone.now() + timedelta(milliseconds=1)
+                cursor = encode_cursor(mid_transaction, uuid.UUID(int=0))
+                clock.now.return_value = mid_transaction + timedelta(seconds=1)
+
+        data = self.delta(cursor)
+        self.assertEqual([b['title'] for b in data['books']], ['Edited 2'])
+        self.assertEqual(data['deleted'], [removed_id])
+
+    def test_old_tombstones_are_pruned_and_old_cursors_resync(self):
+        book = create_book('Old')
+        old_cursor = encode_cursor(timezone.now() - timedelta(days=40), uuid.UUID(int=0))
+        old = BookTombstone.objects.create(book_id=uuid.uuid4(), deleted_at=timezone.now() - timedelta(days=31))
+        self.assertEqual(self.delta(old_cursor)['deleted'], [str(old.book_id)])
+
+        book_id = book.id
+        with self.captureOnCommitCallbacks(execute=True):
+            book.delete()
+        self.assertEqual(list(BookTombstone.objects.values_list('book_id', flat=True)), [book_id])
+
+        response = self.client.get('/api/books/delta/', {'cursor': old_cursor})
+        self.assertEqual(response.status_code, 410)
+        self.assertTrue(response.json()['resync'])
+        recent = encode_cursor(timezone.now() - timedelta(days=1), uuid.UUID(int=0))
+        self.assertEqual(self.delta(recent)['deleted'], [str(book_id)])
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.book = create_book('Validator')
+
+    def test_list_returns_304_for_matching_etag(self):
+        response = self.client.get('/api/books/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('Last-Modified', response)
+        self.assertIn('Accept', response['Vary'])
+
+        with self.assertNumQueries(1):
+            cached = self.client.get('/api/books/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertIn('Accept', cached['Vary'])
+
+    def test_etag_changes_with_content_and_row_count(self):
+        etag = self.client.get('/api/books/')['ETag']
+        create_book('E re')
+        self.assertNotEqual(self.client.get('/api/books/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_retrieve_uses_book_updated_at(self):
+        url = f'/api/books/{self.book.id}/'
+        response = self.client.get(url)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code,
+            304
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            page = self.book.pages.first()
+            PageElement.objects.create(page=page, type='text', content='E re', position=9)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_invalid_id_is_still_404(self):
+        self.assertEqual(self.client.get('/api/books/jo-uuid/').status_code, 404)
+
+
+class BookCacheTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.book = create_book('Cache')
+        reset_cache_stats()
+
+    def test_detail_is_served_from_cache(self):
+        url = f'/api/books/{self.book.id}/'
+        first = self.client.get(url)
+        self.assertEqual(cache_stats()['misses'], 1)
+
+        # validatorët + libri, pa faqe dhe elemente
+        with self.assertNumQueries(2):
+            second = self.client.get(url)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(cache_stats()['hits'], 1)
+
+    def test_list_and_detail_are_cached_separately(self):
+        self.client.get('/api/books/')
+        self.client.get(f'/api/books/{self.book.id}/')
+        self.assertEqual(cache_stats(), {'hits': 0, 'misses': 2, 'hit_rate': 0.0})
+
+    def test_save_invalidates_cached_fragment(self):
+        url = f'/api/books/{self.book.id}/'
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.title = 'Titull i ri'
+            self.book.save()
+
+        self.assertEqual(self.client.get(url).json()['title'], 'Titull i ri')
+        self.assertEqual(cache_stats()['misses'], 2)
+
+    def test_change_from_another_process_is_not_served_stale(self):
+        url = f'/api/books/{self.book.id}/'
+        self.client.get(url)
+
+        # Si admin-i në një worker tjetër: asnjë sinjal/invalidim në këtë proces
+        Book.objects.filter(pk=self.book.pk).update(title='Nga worker-i', updated_at=timezone.now())
+        self.assertEqual(self.client.get(url).json()['title'], 'Nga worker-i')
+
+
+class BookBundleTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.book = create_book('Bundle', pages=2, elements=2)
+        self.url = f'/api/books/{self.book.id}/bundle/'
+
+    def test_returns_book_with_quizzes(self):
+        create_quiz(self.book, 'Kuizi 1', questions=2, options=3)
+        create_quiz(self.book, 'Kuizi 2', questions=1, options=2)
+        create_quiz(create_book('Tjetër'), 'I huaj')
+
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['book']['id'], str(self.book.id))
+        self.assertEqual(data['book']['version'], self.book.version)
+        self.assertEqual(len(data['book']['pages']), 2)
+        self.assertEqual([quiz['title'] for quiz in data['quizzes']], ['Kuizi 2', 'Kuizi 1'])
+        self.assertEqual(len(data['quizzes'][1]['questions'][0]['options']), 3)
+
+    def test_bundle_hides_correct_answers(self):
+        create_quiz(self.book, questions=2)
+        response = self.client.get(self.url)
+        self.assertTrue(all('correctOptionIndex' not in q for q in response.json()['quizzes'][0]['questions']))
+
+        request = RequestFactory().get(self.url)
+        hidden, _ = bundle_validators(self.book, request)
+        shown, _ = bundle_validators(self.book, request, with_answers=True)
+        self.assertEqual(response['ETag'], hidden)
+        self.assertNotEqual(hidden, shown)
+        self.assertIn('correctOptionIndex', get_book_bundle(self.book, request, shown, True)['quizzes'][0]['questions'][0])
+
+    def test_second_request_is_served_from_cache(self):
+        create_quiz(self.book, questions=3)
+        first = self.client.get(self.url)
+
+        # libri + validatorët e kuizeve, pa faqe, pyetje dhe opsione
+        with self.assertNumQueries(2):
+            second = self.client.get(self.url)
+        self.assertEqual(second.json(), first.json())
+
+        with self.assertNumQueries(2):
+            cached = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_quiz_change_invalidates_bundle(self):
+        quiz = create_quiz(self.book)
+        etag = self.client.get(self.url)['ETag']
+
+        Question.objects.filter(quiz=quiz).first().delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['quizzes'][0]['questions']), 1)
+
+    def test_book_edit_from_another_process_refreshes_bundle(self):
+        self.client.get(self.url)
+        self.client.get(f'/api/books/{self.book.id}/')
+
+        # Pa sinjale në këtë proces: fragmenti 'detail' dhe bundle-i duhet të ndryshojnë çelës
+        Book.objects.filter(pk=self.book.pk).update(title='Ndryshuar', updated_at=timezone.now())
+        self.assertEqual(self.client.get(self.url).json()['book']['title'], 'Ndryshuar')
+
+    def test_inactive_or_invalid_book_is_404(self):
+        self.assertEqual(self.client.get('/api/books/jo-uuid/bundle/').status_code, 404)
+        Book.objects.filter(pk=self.book.pk).update(is_active=False)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class PaginationAndStreamingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for i in range(5):
+            create_book(f'Libër {i}', pages=1, elements=1)
+
+    def test_list_uses_cursor_pagination(self):
+        response = self.client.get('/api/books/', {'page_size': 2})
+        data = response.json()
+        self.assertNotIn('count', data)
+        self.assertEqual(len(data['results']), 2)
+
+        titles = [b['title'] for b in data['results']]
+        next_url = data['next']
+        while next_url:
+            data = self.client.get(next_url).json()
+            titles += [b['title'] for b in data['results']]
+            next_url = data['next']
+        self.assertEqual(titles, [f'Libër {i}' for i in reversed(range(5))])
+
+    def test_initial_sync_ndjson_stream(self):
+        response = self.client.get('/api/books/initial_sync/', {'stream': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertIn('sync_date', json.loads(lines[0]))
+        self.assertEqual(len(lines), 6)
+
+    def test_initial_sync_json_stream_matches_snapshot_books(self):
+        streamed = self.client.get('/api/books/initial_sync/', {'stream': 'json'})
+        data = json.loads(b''.join(streamed.streaming_content))
+        snapshot = self.client.get('/api/books/initial_sync/').json()
+        self.assertEqual(data['books'], snapshot['books'])
+
+
+class StorageUrlCacheTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def create_book_with_files(self, title):
+        book = create_book(title, pages=1, elements=1)
+        book.cover_file.save(f'{title}.jpg', ContentFile(b'jpg'), save=False)
+        book.pdf_file.save(f'{title}.pdf', ContentFile(b'pdf'), save=False)
+        book.save()
+        return book
+
+    def test_list_does_not_touch_storage_per_row(self):
+        books = [self.create_book_with_files(f'file-{i}') for i in range(3)]
+        self.client.get('/api/books/')
+        # updated_at i ri jep fragmente të reja, por URL-të e file-ve duhet të vijnë nga cache
+        Book.objects.filter(pk__in=[book.pk for book in books]).update(updated_at=timezone.now())
+
+        with mock.patch.object(FileSystemStorage, 'url') as storage_url:
+            response = self.client.get('/api/books/')
+        self.assertEqual(response.status_code, 200)
+        storage_url.assert_not_called()
+        self.assertTrue(response.json()['results'][0]['pdfPath'].endswith('.pdf'))
+
+    def test_upload_refreshes_cached_url(self):
+        book = self.create_book_with_files('cover')
+        old_url = book.get_cover_url()
+
+        # File i pangarkuar me të njëjtin emër: ngarkohet gjatë book.save()
+        book.cover_file = ContentFile(b'jpg2', name='cover.jpg')
+        book.save()
+        self.assertNotEqual(book.get_cover_url(), old_url)
+        self.assertEqual(book.get_cover_url(), book.cover_file.url)
+
+
+class BookImportEngineTests(TestCase):
+    def book_data(self, pages):
+        return {
+            'id': '42',
+            'title': 'Importuar',
+            'author': 'Autor',
+            'category': 'tjeter',
+            'coverImage': 'assets/images/covers/page1.png',
+            'pages': [
+                {'elements': [{'type': 'text', 'content': text, 'position': 0}]}
+                for text in pages
+            ],
+        }
+
+    def test_creates_book_pages_and_elements_in_bulk(self):
+        engine = BookImportEngine()
+        book, status = engine.import_book(self.book_data(['a', 'b', 'c']))
+
+        self.assertEqual(status, 'created')
+        self.assertEqual(book.pk, book_uuid_for('42'))
+        self.assertEqual(book.cover_image, '/static/images/covers/page1.png')
+        self.assertEqual(list(book.pages.values_list('page_number', flat=True)), [1, 2, 3])
+        self.assertEqual(engine.rows, 7)
+
+    def test_reimport_only_rewrites_changed_pages(self):
+        BookImportEngine().import_book(self.book_data(['a', 'b', 'c']))
+        untouched_page = BookPage.objects.get(page_number=1)
+
+        engine = BookImportEngine()
+        _, status = engine.import_book(self.book_data(['a', 'b', 'c']))
+        self.assertEqual((status, engine.rows), ('unchanged', 0))
+
+        engine = BookImportEngine()
+        _, status = engine.import_book(self.book_data(['a', 'B']))
+        self.assertEqual(status, 'updated')
+        self.assertTrue(BookPage.objects.filter(pk=untouched_page.pk).exists())
+        self.assertEqual(
+            list(PageElement.objects.order_by('page__page_number').values_list('content', flat=True)),
+            ['a', 'B']
+        )
+
+
+class StreamingJsonParserTests(TestCase):
+    def test_yields_each_array_element_with_tiny_buffer(self):
+        data = [{'id': str(i), 'pages': [{'elements': [{'content': 'x, ] {' * i}]}]} for i in range(20)]
+        data += [12345, -1.5e-3, None, 'tekst']
+        text = json.dumps(data, indent=2)
+        for buffer_size in (1, 7, 64):
+            self.assertEqual(list(iter_json_array(io.StringIO(text), buffer_size=buffer_size)), data)
+
+    def test_matches_json_load_for_repository_exports(self):
+        from django.conf import settings
+        for name in ('books.json', 'quizzes.json'):
+            with open(settings.BASE_DIR / name, encoding='utf-8') as fp:
+                expected = json.load(fp)
+            with open(settings.BASE_DIR / name, encoding='utf-8') as fp:
+                self.assertEqual(list(iter_json_array(fp, buffer_size=256)), expected)
+
+    def test_rejects_truncated_input(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(io.StringIO('[{"id": 1}, {"id": ')))
+
+    def test_rejects_trailing_comma_and_data_after_array(self):
+        for text in ('[1,]', '[1, 2 ,\n]', '[1] 2', '[1]]', '[] {}'):
+            for buffer_size in (1, 64):
+                with self.subTest(text=text, buffer_size=buffer_size), self.assertRaises(ValueError):
+                    list(iter_json_array(io.StringIO(text), buffer_size=buffer_size))
+
+    def test_allows_empty_array_and_trailing_whitespace(self):
+        self.assertEqual(list(iter_json_array(io.StringIO(' [ ] \n'), buffer_size=1)), [])
+        self.assertEqual(list(iter_json_array(io.StringIO('[1, 2]\n\n'), buffer_size=1)), [1, 2])
+
+
+class UploadPipelineTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.storage = FileSystemStorage(location=self.media_root)
+
+    def test_same_content_is_uploaded_once(self):
+        with UploadPipeline(storage=self.storage, max_workers=3) as pipeline:
+            first = pipeline.submit('page_images/', 'a.png', b'imazh')
+            second = pipeline.submit('page_images/', 'b.png', b'imazh')
+            other = pipeline.submit('page_images/', 'c.png', b'tjeter')
+            pipeline.wait()
+
+        self.assertIs(first, second)
+        self.assertNotEqual(first.result(), other.result())
+        self.assertEqual((pipeline.uploaded, pipeline.deduplicated), (2, 1))
+        self.assertEqual(len(self.storage.listdir('page_images')[1]), 2)
+
+        with UploadPipeline(storage=self.storage) as again:
+            again.submit('page_images/', 'a.png', b'imazh')
+            again.wait()
+        self.assertEqual(again.uploaded, 0)
+
+    def test_same_content_in_another_folder_is_its_own_file(self):
+        with UploadPipeline(storage=self.storage) as pipeline:
+            page = pipeline.submit('page_images/', 'a.png', b'imazh')
+            cover = pipeline.submit('covers/', 'a.jpg', b'imazh')
+            pipeline.wait()
+
+        self.assertTrue(page.result().startswith('page_images/') and page.result().endswith('.png'))
+        self.assertTrue(cover.result().startswith('covers/') and cover.result().endswith('.jpg'))
+        self.assertTrue(self.storage.exists(cover.result()))
+
+    def test_failed_upload_is_retried(self):
+        save = self.storage.save
+        calls = []
+
+        def flaky_save(name, content):
+            calls.append(name)
+            if len(calls) == 1:
+                raise OSError('timeout')
+            return save(name, content)
+
+        with mock.patch.object(self.storage, 'save', side_effect=flaky_save):
+            with UploadPipeline(storage=self.storage, backoff=0) as pipeline:
+                future = pipeline.submit('covers/', 'cover.jpg', b'cover')
+                pipeline.wait()
+
+        self.assertEqual(len(calls), 2)
+        self.assertTrue(self.storage.exists(future.result()))
+
+
+class ContentUpdatesBroadcastTests(TestCase):
+    def setUp(self):
+        self.layer = get_channel_layer()
+        async_to_sync(self.layer.flush)()
+        self.channel = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(CONTENT_UPDATES_GROUP, self.channel)
+
+    def received(self):
+        async def drain():
+            events = []
+            while True:
+                try:
+                    message = await asyncio.wait_for(self.layer.receive(self.channel), 0.05)
+                except asyncio.TimeoutError:
+                    return events
+                events.append(message['event'])
+        return async_to_sync(drain)()
+
+    def test_one_event_per_book_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            book = create_book(pages=3, elements=2)
+            book.title = 'Titull i ri'
+            book.save()
+            self.assertEqual(self.received(), [])
+
+        events = self.received()
+        self.assertEqual(len(events), 1)
+        self.assertEqual((events[0]['kind'], events[0]['id'], events[0]['action']), ('book', str(book.pk), 'created'))
+
+    def test_page_edit_and_deactivation(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            book = create_book()
+        self.received()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PageElement.objects.filter(page__book=book).first().save()
+        self.assertEqual([e['action'] for e in self.received()], ['updated'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            book.is_active = False
+            book.save()
+        self.assertEqual([e['action'] for e in self.received()], ['deleted'])
+
+    def test_rolled_back_changes_are_not_broadcast(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            kept = create_book()
+            try:
+                with transaction.atomic():
+                    create_book(title='Anuluar')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual([(e['id'], e['action']) for e in self.received()], [(str(kept.pk), 'created')])
+
+        # Transaksioni i plotë që dështon nuk rrjedh te commit-i i radhës
+        try:
+            with transaction.atomic():
+                book = create_book(title='Anuluar')
+                PageElement.objects.filter(page__book=book).first().save()
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        with self.captureOnCommitCallbacks(execute=True):
+            kept.save()
+        self.assertEqual([(e['id'], e['action']) for e in self.received()], [(str(kept.pk), 'updated')])
+
+    async def connect(self, headers):
+        communicator = ApplicationCommunicator(application, {
+            'type': 'websocket',
+            'path': '/ws/updates/',
+            'headers': headers,
+            'query_string': b'',
+            'subprotocols': [],
+        })
+        await communicator.send_input({'type': 'websocket.connect'})
+        return communicator, (await communicator.receive_output(1))['type']
+
+    async def test_native_client_without_origin_connects(self):
+        communicator, output = await self.connect([(b'host', b'localhost')])
+        self.assertEqual(output, 'websocket.accept')
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait(1)
+
+        # Shfletuesi me Origin të huaj refuzohet
+        _, output = await self.connect([(b'host', b'localhost'), (b'origin', b'https://evil.example.com')])
+        self.assertEqual(output, 'websocket.close')
+
+    async def test_websocket_client_receives_events(self):
+        communicator = ApplicationCommunicator(application, {
+            'type': 'websocket',
+            'path': '/ws/updates/',
+            'headers': [(b'host', b'localhost'), (b'origin', b'http://localhost')],
+            'query_string': b'',
+            'subprotocols': [],
+        })
+        await communicator.send_input({'type': 'websocket.connect'})
+        self.assertEqual((await communicator.receive_output(1))['type'], 'websocket.accept')
+
+        event = {'kind': 'quiz', 'id': '1', 'action': 'created', 'version': None}
+        await self.layer.group_send(CONTENT_UPDATES_GROUP, {'type': 'content.update', 'event': event})
+        self.assertEqual(json.loads((await communicator.receive_output(1))['text']), event)
+
+        await communicator.send_input({'type': 'websocket.receive', 'text': '{"type": "ping"}'})
+        self.assertEqual(json.loads((await communicator.receive_output(1))['text']), {'type': 'pong'})
+
+        await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await communicator.wait(1)
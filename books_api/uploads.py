@@ -0,0 +1,83 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+
+class UploadPipeline:
+    """
+    Ngarkon file në storage (Cloudinary ose FileSystemStorage) në një thread
+    pool të kufizuar, me retry dhe deduplikim sipas SHA-256 të përmbajtjes.
+
+    Emri i file-it del nga hash-i, prandaj i njëjti imazh ngarkohet vetëm një
+    herë edhe mes ekzekutimeve. Rreshtat në DB krijohen pasi wait() kthehet.
+    """
+
+    def __init__(self, storage=None, max_workers=4, retries=3, backoff=0.5):
+        self.storage = storage or default_storage
+        self.retries = retries
+        self.backoff = backoff
+        self.uploaded = 0
+        self.deduplicated = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='upload')
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, upload_to, filename, content):
+        """Kthen një Future me emrin përfundimtar të file-it në storage"""
+        digest = hashlib.sha256(content).hexdigest()
+        extension = os.path.splitext(filename)[1].lower()
+        name = f'{upload_to}{digest[:32]}{extension}'
+
+        # Çelësi është emri: e njëjta përmbajtje me upload_to/prapashtesë tjetër është file tjetër
+        with self._lock:
+            future = self._futures.get(name)
+            if future is not None:
+                self.deduplicated += 1
+                return future
+            future = self._executor.submit(self._upload, name, content)
+            self._futures[name] = future
+            return future
+
+    def _upload(self, name, content):
+        if self.storage.exists(name):
+            with self._lock:
+                self.deduplicated += 1
+            return name
+
+        for attempt in range(1, self.retries + 1):
+            try:
+                stored_name = self.storage.save(name, ContentFile(content))
+                with self._lock:
+                    self.uploaded += 1
+                return stored_name
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * 2 ** (attempt - 1)
+                logger.warning(f"Upload of {name} failed (attempt {attempt}): {e}; retrying in {delay}s")
+                time.sleep(delay)
+
+    def wait(self):
+        """Pret të gjitha ngarkimet; ngre gabimin e parë nëse ndonjë dështoi"""
+        with self._lock:
+            futures = list(self._futures.values())
+        wait(futures)
+        for future in futures:
+            future.result()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
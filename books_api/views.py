@@ -2,15 +2,26 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
+from be_blog.conditional import ConditionalGetMixin
+from be_blog.pagination import CreatedAtCursorPagination
 from .models import Book, BookPage, PageElement
 from .serializers import BookSerializer, BookDetailSerializer, BookListSerializer
+from .snapshot import accepts_gzip, get_catalog_snapshot
+from .delta import collect_changes, encode_cursor, CursorExpired, InvalidCursor
+from .cache import cached_book_representations
+from .bundle import bundle_validators, get_book_bundle
+from .streaming import iter_ndjson, iter_json
+from django.http import HttpResponse, Http404, StreamingHttpResponse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
 from datetime import datetime
 
 
-class BookViewSet(viewsets.ReadOnlyModelViewSet):
+class BookViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Book.objects.filter(is_active=True)
     permission_classes = [AllowAny]
+    pagination_class = CreatedAtCursorPagination
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -23,15 +34,81 @@ class BookViewSet(viewsets.ReadOnlyModelViewSet):
         context['request'] = self.request
         return context
 
+    def list(self, request, *args, **kwargs):
+        """Lista ndërtohet nga fragmentet e cache-uara të çdo libri"""
+        queryset = self.filter_queryset(self.get_queryset())
+
+        def respond():
+            page = self.paginate_queryset(queryset)
+            books = page if page is not None else queryset
+            data = cached_book_representations(
+                books, BookListSerializer, self.get_serializer_context(), 'list'
+            )
+            if page is not None:
+                return self.get_paginated_response(data)
+            return Response(data)
+
+        return self.conditional_response(request, queryset, respond)
+
+    def retrieve(self, request, *args, **kwargs):
+        queryset = self.get_lookup_queryset()
+        if queryset is None:
+            raise Http404
+
+        def respond():
+            data = cached_book_representations(
+                [self.get_object()], BookDetailSerializer, self.get_serializer_context(), 'detail'
+            )
+            return Response(data[0])
+
+        return self.conditional_response(request, queryset, respond)
+
+    @action(detail=True, methods=['get'])
+    def bundle(self, request, pk=None):
+        """Libri me faqet dhe të gjitha kuizet e tij në një përgjigje (një round-trip për app-in)"""
+        if self.get_lookup_queryset() is None:
+            raise Http404
+        book = self.get_object()
+
+        etag, last_modified = bundle_validators(book, request)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        response = Response(get_book_bundle(book, request, etag))
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
     @action(detail=False, methods=['get'])
     def initial_sync(self, request):
-        """Endpoint për sinkronizimin fillestar të librave"""
-        books = Book.objects.filter(is_active=True)
-        serializer = BookDetailSerializer(books, many=True, context={'request': request})
-        return Response({
-            'books': serializer.data,
-            'sync_date': timezone.now().isoformat()
-        })
+        """
+        Endpoint për sinkronizimin fillestar të librave - shërben snapshot-in e ruajtur.
+        ?stream=ndjson ose ?stream=json e dërgon katalogun në copa, me memorie konstante.
+        """
+        stream = request.query_params.get('stream')
+        if stream == 'ndjson':
+            return StreamingHttpResponse(iter_ndjson(request), content_type='application/x-ndjson')
+        if stream == 'json':
+            return StreamingHttpResponse(iter_json(request), content_type='application/json')
+
+        snapshot = get_catalog_snapshot(request)
+        etag = f'W/"{snapshot.etag}"'
+        last_modified = int(snapshot.created_at.timestamp())
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        if accepts_gzip(request):
+            response = HttpResponse(bytes(snapshot.payload_gzip), content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(bytes(snapshot.payload), content_type='application/json')
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
 
     @action(detail=False, methods=['get'])
     def check_updates(self, request):
@@ -49,8 +126,54 @@ class BookViewSet(viewsets.ReadOnlyModelViewSet):
         else:
             books = Book.objects.filter(is_active=True)
 
-        serializer = BookListSerializer(books, many=True, context={'request': request})
+        new_books = cached_book_representations(books, BookListSerializer, {'request': request}, 'list')
         return Response({
-            'new_books': serializer.data,
+            'new_books': new_books,
             'count': books.count()
-        })
\ No newline at end of file
+        })
+
+    @action(detail=False, methods=['get'])
+    def delta(self, request):
+        """
+        Sinkronizim inkremental: librat e ndryshuar (me faqe dhe elemente)
+        dhe ID-të e librave të fshirë/çaktivizuar pas kursorit
+        """
+        cursor = request.query_params.get('cursor') or None
+        try:
+            limit = min(max(int(request.query_params.get('limit', 50)), 1), 200)
+        except ValueError:
+            return Response({'error': 'limit duhet të jetë numër'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            changes, has_more = collect_changes(cursor, limit)
+        except InvalidCursor:
+            return Response({'error': 'cursor i pavlefshëm'}, status=status.HTTP_400_BAD_REQUEST)
+        except CursorExpired:
+            # Tombstone-t e nevojshme janë fshirë: klienti rifillon pa cursor
+            return Response({'error': 'cursor i skaduar', 'resync': True}, status=status.HTTP_410_GONE)
+
+        # Ngjarja e fundit për çdo libër fiton
+        latest = {}
+        for timestamp, book_id, book in changes:
+            latest[book_id] = book
+        active_ids = [book_id for book_id, book in latest.items() if book is not None]
+
+        books = list(Book.objects.filter(pk__in=active_ids).order_by('updated_at', 'id'))
+        representations = cached_book_representations(
+            books, BookDetailSerializer, {'request': request}, 'detail'
+        )
+        books_data = [
+            dict(data, version=book.version, updatedAt=book.updated_at.isoformat())
+            for book, data in zip(books, representations)
+        ]
+
+        if changes:
+            timestamp, book_id, _ = changes[-1]
+            cursor = encode_cursor(timestamp, book_id)
+
+        return Response({
+            'books': books_data,
+            'deleted': [str(book_id) for book_id, book in latest.items() if book is None],
+            'next_cursor': cursor,
+            'has_more': has_more,
+        })
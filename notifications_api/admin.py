@@ -1,16 +1,23 @@
 from django.contrib import admin
 from django.contrib import messages
-from .models import Notification
-from .services import send_notification_to_all, send_book_notification, send_quiz_notification
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.html import format_html
+import logging
+from .models import DeviceToken, Notification, PushDelivery, PushJob, PushOutbox
+from .services import enqueue_notification, next_delivery_time
 # from .services import send_multicast_notification, send_book_notification, send_quiz_notification
 
+logger = logging.getLogger(__name__)
+
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ['title', 'type', 'is_active', 'created_at', 'notification_sent_status']
-    list_filter = ['type', 'is_active', 'created_at']
+    list_display = ['title', 'type', 'is_active', 'created_at', 'send_at', 'push_status', 'notification_sent_status']
+    list_filter = ['type', 'is_active', 'push_status', 'created_at']
     search_fields = ['title', 'description']
-    readonly_fields = ['created_at', 'id']  # ✅ Shto id për debugging
+    readonly_fields = ['created_at', 'id', 'push_status', 'push_queued_at']  # ✅ Shto id për debugging
+    list_select_related = ['book', 'quiz']  # notification_sent_status lexon book/quiz për çdo rresht
 
     fieldsets = (
         ('Përmbajtja', {
@@ -23,6 +30,10 @@ class NotificationAdmin(admin.ModelAdmin):
         ('Statusi', {
             'fields': ('is_active',)
         }),
+        ('Planifikimi', {
+            'fields': ('send_at', 'locale', 'push_status', 'push_queued_at'),
+            'description': 'Bosh = dërgo menjëherë. Locale me dritare (NOTIFICATION_DELIVERY_WINDOWS) shtyhet brenda orarit.'
+        }),
         ('Info', {
             'fields': ('id', 'created_at'),  # ✅ Shto ID për debugging
             'classes': ('collapse',)
@@ -44,69 +55,49 @@ class NotificationAdmin(admin.ModelAdmin):
 
     def save_model(self, request, obj, form, change):
         """Override save për të dërguar notification automatikisht"""
-        # Ruaj objektin fillimisht
-        super().save_model(request, obj, form, change)
-
         # ✅ Dërgo notification për objekte të reja DHE kur kërkohet eksplicit
         should_send = (
                 obj.is_active and
                 (not change or request.POST.get('_send_notification', False))
         )
 
+        if should_send:
+            # Planifikimi vendoset para ruajtjes, që njoftimi të mos dalë në feed para kohe
+            deliver_at = next_delivery_time(obj)
+            if deliver_at > timezone.now():
+                obj.send_at = deliver_at
+                obj.push_status = 'scheduled'
+            elif obj.push_status == 'scheduled':
+                # Publikohet tani, njëlloj si kur e nxjerr scheduler-i
+                obj.push_status = ''
+                obj.created_at = timezone.now()
+
+        # Ruaj objektin
+        super().save_model(request, obj, form, change)
+
         if should_send:
             success = self._send_firebase_notification(obj, request)
             obj._notification_sent = success
 
     def _send_firebase_notification(self, notification, request):
-        """Dërgon Firebase notification bazuar në tipin"""
+        """Vendos në radhë push-in, ose e planifikon nëse ka send_at / dritare locale"""
         try:
-            # Përgatit të dhënat bazuar në tipin
-            if notification.type == 'newBook' and notification.book:
-                success, response = send_book_notification(notification.book)
-
-            elif notification.type == 'newQuiz' and notification.quiz:
-                success, response = send_quiz_notification(notification.quiz)
-
-            else:
-                # ✅ Sigurohu që të gjitha të dhënat janë strings për Firebase
-                data = {
-                    'type': str(notification.type),
-                    'notification_id': str(notification.id),
-                    'title': str(notification.title),
-                    'description': str(notification.description),
-                }
-
-                # Shto të dhëna specifike nëse ka
-                if notification.book:
-                    data.update({
-                        'book_id': str(notification.book.id),
-                        'book_title': str(notification.book.title),
-                        'cover_image': str(notification.book.get_cover_url() or ''),
-                    })
-                elif notification.quiz:
-                    data.update({
-                        'quiz_id': str(notification.quiz.id),
-                        'quiz_title': str(notification.quiz.title),
-                        'book_id': str(notification.quiz.book.id),
-                        'book_title': str(notification.quiz.book.title),
-                    })
-
-                if notification.image_url:
-                    data['image_url'] = str(notification.image_url)
-
-                # ✅ Debug
-                self.stdout.write(f"Sending notification with data: {data}")
-
-                success, response = send_notification_to_all(
-                    title=notification.title,
-                    body=notification.description,
-                    data=data
+            # save_model e ka ruajtur tashmë me send_at dhe push_status='scheduled'
+            if notification.push_status == 'scheduled':
+                messages.success(
+                    request,
+                    f'⏰ Njoftimi u planifikua për {timezone.localtime(notification.send_at):%d.%m.%Y %H:%M}'
                 )
+                return True
 
+            success, response = enqueue_notification(notification)
             if success:
+                notification.push_status = 'queued'
+                notification.push_queued_at = timezone.now()
+                notification.save(update_fields=['push_status', 'push_queued_at'])
                 messages.success(
                     request,
-                    f'✅ Njoftimi u dërgua me sukses! Response: {response}'
+                    f'✅ Njoftimi u vendos në radhë për dërgim: {response}'
                 )
                 return True
             else:
@@ -117,9 +108,85 @@ class NotificationAdmin(admin.ModelAdmin):
                 return False
 
         except Exception as e:
-            import traceback
+            logger.exception(f"Could not queue notification {notification.pk}")
             messages.error(
                 request,
-                f'❌ Gabim në dërgimin e njoftimit: {str(e)}\n{traceback.format_exc()}'
+                f'❌ Gabim në dërgimin e njoftimit: {str(e)}'
             )
-            return False
\ No newline at end of file
+            return False
+
+
+@admin.register(PushOutbox)
+class PushOutboxAdmin(admin.ModelAdmin):
+    list_display = ['title', 'kind', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at']
+    list_filter = ['status', 'kind', 'created_at']
+    search_fields = ['title', 'object_id', 'last_error']
+    readonly_fields = [
+        'kind', 'object_id', 'title', 'body', 'data', 'topic', 'attempts',
+        'locked_by', 'locked_at', 'last_error', 'response', 'created_at', 'sent_at'
+    ]
+    actions = ['retry_now']
+
+    def retry_now(self, request, queryset):
+        """Rikthe në radhë mesazhet e dështuara"""
+        try:
+            with transaction.atomic():
+                count = queryset.exclude(status='sent').update(
+                    status='pending',
+                    attempts=0,
+                    next_attempt_at=timezone.now()
+                )
+        except IntegrityError:
+            # Një libër/kuiz ka vetëm një mesazh aktiv (outbox_one_active_per_object)
+            messages.error(request, '❌ Disa libra/kuize kanë tashmë njoftim në radhë - zgjidh vetëm një mesazh për secilin')
+            return
+        messages.success(request, f'🔄 {count} mesazhe u rikthyen në radhë')
+
+    retry_now.short_description = "🔄 Riprovo dërgimin tani"
+
+
+@admin.register(DeviceToken)
+class DeviceTokenAdmin(admin.ModelAdmin):
+    list_display = ['token', 'platform', 'locale', 'last_seen_at', 'created_at']
+    list_filter = ['platform', 'locale']
+    search_fields = ['token']
+    readonly_fields = ['created_at']
+
+
+@admin.register(PushJob)
+class PushJobAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'kind', 'status', 'progress_bar', 'sent', 'failed', 'skipped', 'created_at', 'finished_at']
+    list_filter = ['status', 'kind', 'created_at']
+    readonly_fields = [
+        'kind', 'status', 'progress_bar', 'total', 'sent', 'failed', 'skipped', 'object_ids',
+        'last_error', 'locked_by', 'created_at', 'started_at', 'finished_at'
+    ]
+
+    def has_add_permission(self, request):
+        # Punët krijohen nga veprimet te librat/kuizet
+        return False
+
+    def progress_bar(self, obj):
+        """Progresi i dërgimit; rifresko faqen për ta përditësuar"""
+        color = {'done': 'green', 'failed': 'red'}.get(obj.status, 'orange')
+        return format_html(
+            '<div style="width: 150px; background: #eee;">'
+            '<div style="width: {}%; background: {}; color: white; padding: 0 4px;">{}%</div></div>',
+            obj.progress, color, obj.progress
+        )
+
+    progress_bar.short_description = 'Progresi'
+
+
+@admin.register(PushDelivery)
+class PushDeliveryAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'kind', 'object_id', 'channel', 'success', 'error_code', 'latency_ms', 'payload_bytes', 'messages']
+    list_filter = ['success', 'channel', 'kind', 'error_code', 'created_at']
+    search_fields = ['object_id', 'error_code']
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
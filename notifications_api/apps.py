@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class NotificationsApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notifications_api'
+
+    def ready(self):
+        import notifications_api.signals
@@ -0,0 +1,69 @@
+import time
+from django.core.management.base import BaseCommand
+from notifications_api import telemetry
+from notifications_api.services import process_outbox, process_push_jobs, PUSH_MAX_ATTEMPTS
+
+
+class Command(BaseCommand):
+    help = 'Send queued push notifications and admin push jobs (run continuously, or once with --once)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue once and exit'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Messages claimed per batch'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Parallel Firebase calls per batch'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=PUSH_MAX_ATTEMPTS,
+            help='Attempts before a message is marked as failed'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds to sleep when the queue is empty'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.NOTICE('Push outbox worker started'))
+        try:
+            while True:
+                jobs = process_push_jobs()
+                if jobs:
+                    self.stdout.write(f'Processed {jobs} push jobs')
+
+                processed = process_outbox(
+                    batch_size=options['batch_size'],
+                    concurrency=options['concurrency'],
+                    max_attempts=options['max_attempts'],
+                )
+                if processed:
+                    self.stdout.write(f'Processed {processed} messages')
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        metrics = telemetry.snapshot()
+        self.stdout.write(
+            f"Coalesced: {metrics['coalesced']}, throttled: {metrics['throttled']} "
+            f"({metrics['throttled_seconds']:.1f}s waiting)"
+        )
+        self.stdout.write(self.style.SUCCESS('✓ Push outbox worker stopped'))
+
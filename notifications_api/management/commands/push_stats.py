@@ -0,0 +1,135 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.utils import timezone
+
+from notifications_api.models import PushDelivery
+from notifications_api.telemetry import LATENCY_BUCKETS_MS
+
+
+class Command(BaseCommand):
+    help = 'Push delivery telemetry: latency histogram, errors by code and payload size'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=float,
+            default=24,
+            help='Look back this many hours'
+        )
+        parser.add_argument(
+            '--kind',
+            help='Only book, quiz, notification, topic or devices'
+        )
+        parser.add_argument(
+            '--object-id',
+            help='Only deliveries for this Book/Quiz/Notification id'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the report as JSON'
+        )
+
+    def handle(self, *args, **options):
+        deliveries = PushDelivery.objects.filter(
+            created_at__gte=timezone.now() - timedelta(hours=options['hours'])
+        )
+        if options['kind']:
+            deliveries = deliveries.filter(kind=options['kind'])
+        if options['object_id']:
+            deliveries = deliveries.filter(object_id=options['object_id'])
+        # Njoftimet e bashkuara nuk janë thirrje drejt Firebase - numërohen veç
+        coalesced = deliveries.filter(channel='coalesced').count()
+        deliveries = deliveries.exclude(channel='coalesced')
+
+        # Një query për totalet dhe histogramin kumulativ
+        buckets = {f'le_{bound}': Count('id', filter=Q(latency_ms__lte=bound)) for bound in LATENCY_BUCKETS_MS}
+        totals = deliveries.aggregate(
+            deliveries=Count('id'),
+            messages=Sum('messages'),
+            failures=Sum('failures'),
+            latency_avg=Avg('latency_ms'),
+            latency_max=Max('latency_ms'),
+            payload_avg=Avg('payload_bytes'),
+            payload_max=Max('payload_bytes'),
+            **buckets
+        )
+        count = totals['deliveries']
+
+        histogram = {}
+        previous = 0
+        for bound in LATENCY_BUCKETS_MS:
+            cumulative = totals.pop(f'le_{bound}')
+            histogram[f'<={bound}'] = cumulative - previous
+            previous = cumulative
+        histogram['+inf'] = count - previous
+
+        report = {
+            **totals,
+            'coalesced': coalesced,
+            'latency_p50': self.percentile(histogram, count, 0.50),
+            'latency_p95': self.percentile(histogram, count, 0.95),
+            'latency_buckets': histogram,
+            'errors': {
+                row['error_code']: row['count']
+                for row in deliveries.exclude(error_code='').values('error_code')
+                .annotate(count=Count('id')).order_by('-count')
+            },
+            'by_kind': {
+                row['kind']: {'deliveries': row['count'], 'failures': row['failures'], 'latency_avg': row['latency']}
+                for row in deliveries.values('kind').annotate(
+                    count=Count('id'), failures=Sum('failures'), latency=Avg('latency_ms')
+                ).order_by('kind')
+            },
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, default=str))
+            return
+
+        if not count:
+            self.stdout.write(f'No push deliveries in this period ({coalesced} coalesced)')
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Push deliveries (last {options['hours']:g}h)"))
+        self.stdout.write(
+            f"{count} deliveries, {report['messages']} messages, {report['failures']} failed, "
+            f"{coalesced} coalesced"
+        )
+        self.stdout.write(
+            f"Latency: avg {report['latency_avg']:.1f} ms, p50 <= {report['latency_p50']} ms, "
+            f"p95 <= {report['latency_p95']} ms, max {report['latency_max']:.1f} ms"
+        )
+        self.stdout.write(f"Payload: avg {report['payload_avg']:.0f} B, max {report['payload_max']} B")
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Latency histogram (ms)'))
+        widest = max(histogram.values()) or 1
+        for label, value in histogram.items():
+            self.stdout.write(f"{label:>8} {value:6d} {'█' * round(30 * value / widest)}")
+
+        if report['errors']:
+            self.stdout.write(self.style.MIGRATE_HEADING('Errors by code'))
+            for code, value in report['errors'].items():
+                self.stdout.write(f'{code:>24} {value}')
+
+        self.stdout.write(self.style.MIGRATE_HEADING('By kind'))
+        for kind, row in report['by_kind'].items():
+            self.stdout.write(
+                f"{kind:>14} {row['deliveries']:6d} deliveries, {row['failures']} failed, "
+                f"avg {row['latency_avg']:.1f} ms"
+            )
+
+    @staticmethod
+    def percentile(histogram, count, quantile):
+        """Kufiri i sipërm i bucket-it ku bie percentili"""
+        if not count:
+            return None
+        seen = 0
+        for label, value in histogram.items():
+            seen += value
+            if seen >= quantile * count:
+                return label.lstrip('<=')
+        return '+inf'
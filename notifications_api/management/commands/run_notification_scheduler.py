@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from notifications_api.scheduler import NotificationScheduler
+
+
+class Command(BaseCommand):
+    help = 'Queue scheduled notifications when their send time (and locale window) arrives'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Queue whatever is due now and exit'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Notifications claimed per cycle'
+        )
+        parser.add_argument(
+            '--refresh-interval',
+            type=float,
+            default=30,
+            help='Seconds between reloads of upcoming schedules from the database'
+        )
+        parser.add_argument(
+            '--horizon',
+            type=int,
+            default=3600,
+            help='How far ahead (seconds) upcoming schedules are kept in memory'
+        )
+
+    def handle(self, *args, **options):
+        scheduler = NotificationScheduler(
+            batch_size=options['batch_size'],
+            refresh_interval=options['refresh_interval'],
+            horizon=options['horizon'],
+        )
+        self.stdout.write(self.style.NOTICE('Notification scheduler started'))
+        try:
+            scheduler.run(once=options['once'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'✓ Queued {scheduler.queued} scheduled notifications'))
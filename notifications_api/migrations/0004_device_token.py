@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:46
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications_api', '0003_push_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=255, unique=True)),
+                ('platform', models.CharField(choices=[('android', 'Android'), ('ios', 'iOS'), ('web', 'Web'), ('unknown', 'Unknown')], default='unknown', max_length=10)),
+                ('locale', models.CharField(blank=True, max_length=10)),
+                ('last_seen_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-last_seen_at'],
+                'indexes': [models.Index(fields=['platform', 'locale'], name='device_target_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications_api', '0005_push_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pushoutbox',
+            index=models.Index(fields=['kind', 'object_id'], name='outbox_object_idx'),
+        ),
+    ]
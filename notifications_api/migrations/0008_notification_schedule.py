@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books_api', '0004_delta_sync'),
+        ('notifications_api', '0007_notification_read_state'),
+        ('quizes_api', '0002_quiz_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='locale',
+            field=models.CharField(blank=True, help_text='Dritarja e dërgimit nga NOTIFICATION_DELIVERY_WINDOWS (p.sh. "sq")', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='push_queued_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='push_status',
+            field=models.CharField(blank=True, choices=[('', 'Pa planifikim'), ('scheduled', 'Planifikuar'), ('queued', 'Në radhë')], default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='send_at',
+            field=models.DateTimeField(blank=True, help_text='Bosh = dërgo menjëherë', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['push_status', 'send_at'], name='notification_due_idx'),
+        ),
+    ]
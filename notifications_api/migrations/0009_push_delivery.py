@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications_api', '0008_notification_schedule'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pushoutbox',
+            name='kind',
+            field=models.CharField(choices=[('book', 'Book'), ('quiz', 'Quiz'), ('notification', 'Notification'), ('topic', 'Topic')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='PushDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('object_id', models.CharField(blank=True, max_length=64)),
+                ('channel', models.CharField(choices=[('send', 'Send'), ('send_each', 'Send each'), ('multicast', 'Multicast')], max_length=10)),
+                ('success', models.BooleanField()),
+                ('error_code', models.CharField(blank=True, max_length=64)),
+                ('latency_ms', models.FloatField()),
+                ('payload_bytes', models.IntegerField(default=0)),
+                ('messages', models.IntegerField(default=1)),
+                ('failures', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['kind', 'object_id'], name='delivery_object_idx'), models.Index(fields=['created_at'], name='delivery_created_idx')],
+            },
+        ),
+    ]
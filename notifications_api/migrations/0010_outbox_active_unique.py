@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:25
+
+from django.db import migrations, models
+
+
+def drop_duplicate_active(apps, schema_editor):
+    """Mban mesazhin aktiv më të vjetër për çdo libër/kuiz; të tjerët janë i njëjti njoftim"""
+    PushOutbox = apps.get_model('notifications_api', 'PushOutbox')
+    seen = set()
+    duplicates = []
+    active = PushOutbox.objects.filter(status__in=['pending', 'sending'], kind__in=['book', 'quiz'])
+    for pk, kind, object_id in active.order_by('created_at', 'pk').values_list('pk', 'kind', 'object_id'):
+        if (kind, object_id) in seen:
+            duplicates.append(pk)
+        seen.add((kind, object_id))
+    PushOutbox.objects.filter(pk__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications_api', '0009_push_delivery'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pushdelivery',
+            name='channel',
+            field=models.CharField(choices=[('send', 'Send'), ('send_each', 'Send each'), ('multicast', 'Multicast'), ('coalesced', 'Coalesced')], max_length=10),
+        ),
+        migrations.RunPython(drop_duplicate_active, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='pushoutbox',
+            constraint=models.UniqueConstraint(condition=models.Q(('kind__in', ['book', 'quiz']), ('status__in', ['pending', 'sending'])), fields=('kind', 'object_id'), name='outbox_one_active_per_object'),
+        ),
+    ]
@@ -1,9 +1,17 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 import uuid
 from books_api.models import Book
 from quizes_api.models import Quiz
 
 
+class NotificationQuerySet(models.QuerySet):
+    def published(self):
+        """Njoftimet e dukshme te klientët: aktive dhe jo të planifikuara për më vonë"""
+        return self.filter(is_active=True).exclude(push_status='scheduled')
+
+
 class Notification(models.Model):
     NOTIFICATION_TYPES = [
         ('newBook', 'New Book'),
@@ -19,11 +27,249 @@ class Notification(models.Model):
     book = models.ForeignKey(Book, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
     image_url = models.URLField(max_length=500, blank=True)
+    # Koha e publikimit: për njoftimet e planifikuara rivendoset kur dalin në radhë
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)  # Për të kontrolluar cilat njoftime janë aktive
 
+    # ⏰ Planifikimi - dërgohet nga `manage.py run_notification_scheduler`
+    PUSH_STATUS_CHOICES = [
+        ('', 'Pa planifikim'),
+        ('scheduled', 'Planifikuar'),
+        ('queued', 'Në radhë'),
+    ]
+    send_at = models.DateTimeField(null=True, blank=True, help_text='Bosh = dërgo menjëherë')
+    locale = models.CharField(
+        max_length=10, blank=True,
+        help_text='Dritarja e dërgimit nga NOTIFICATION_DELIVERY_WINDOWS (p.sh. "sq")'
+    )
+    push_status = models.CharField(max_length=10, choices=PUSH_STATUS_CHOICES, default='', blank=True)
+    push_queued_at = models.DateTimeField(null=True, blank=True)
+
+    objects = NotificationQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['push_status', 'send_at'], name='notification_due_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class NotificationReadState(models.Model):
+    """
+    Statusi i leximit për një përdorues, pa rresht për çdo (përdorues, njoftim):
+    gjithçka e krijuar deri te `read_until` është lexuar, plus `read_ids` -
+    njoftimet më të reja të lexuara një nga një.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notification_read_state')
+    read_until = models.DateTimeField(null=True, blank=True)
+    read_ids = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user} - {self.read_until} (+{len(self.read_ids)})"
+
+    def is_read(self, notification):
+        if self.read_until and notification.created_at <= self.read_until:
+            return True
+        if not hasattr(self, '_read_id_set'):
+            self._read_id_set = set(self.read_ids)
+        return str(notification.id) in self._read_id_set
+
+    def unread(self, queryset):
+        """Filtron queryset-in e njoftimeve në ato të palexuara"""
+        if self.read_until:
+            queryset = queryset.filter(created_at__gt=self.read_until)
+        if self.read_ids:
+            queryset = queryset.exclude(id__in=self.read_ids)
+        return queryset
+
+    def mark_all_read(self, until):
+        self.read_until = until
+        self.read_ids = []
+        self.__dict__.pop('_read_id_set', None)
+
+    def mark_read(self, notifications):
+        """
+        Shton njoftimet te `read_ids`, pastaj e shtyn `read_until` përpara sa
+        kohë njoftimet më të vjetra të palexuara janë lexuar, që lista të mbetet e vogël.
+        """
+        read = set(self.read_ids)
+        read.update(str(n.id) for n in notifications if not self.is_read(n))
+
+        pending = Notification.objects.published()
+        if self.read_until:
+            pending = pending.filter(created_at__gt=self.read_until)
+        # Prefiksi i lexuar nuk mund të jetë më i gjatë se `read`
+        oldest = pending.order_by('created_at', 'id').values_list('id', 'created_at')[:len(read) + 1]
+        advanced = []
+        for notification_id, created_at in oldest:
+            if str(notification_id) not in read:
+                # Një i palexuar me të njëjtën kohë nuk duhet mbuluar nga read_until
+                while advanced and advanced[-1] >= created_at:
+                    advanced.pop()
+                break
+            advanced.append(created_at)
+        if advanced:
+            self.read_until = advanced[-1]
+
+        if self.read_until:
+            newer = {str(pk) for pk in Notification.objects.filter(
+                id__in=read, created_at__gt=self.read_until
+            ).values_list('id', flat=True)}
+            read &= newer
+        self.read_ids = sorted(read)
+        self.__dict__.pop('_read_id_set', None)
+
+
+class PushOutbox(models.Model):
+    """Radha e njoftimeve push; dërgohen nga `manage.py process_push_outbox`"""
+    KIND_CHOICES = [
+        ('book', 'Book'),
+        ('quiz', 'Quiz'),
+        ('notification', 'Notification'),
+        ('topic', 'Topic'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.CharField(max_length=64, blank=True)
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    data = models.JSONField(default=dict, blank=True)
+    topic = models.CharField(max_length=100, default='all_users')
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    response = models.CharField(max_length=255, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+            models.Index(fields=['kind', 'object_id'], name='outbox_object_idx'),
+        ]
+        constraints = [
+            # Një njoftim aktiv për libër/kuiz - enqueue_push e bashkon të dytin
+            models.UniqueConstraint(
+                fields=['kind', 'object_id'],
+                condition=models.Q(status__in=['pending', 'sending'], kind__in=['book', 'quiz']),
+                name='outbox_one_active_per_object',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.title} ({self.status})"
+
+
+class DeviceToken(models.Model):
+    """FCM token i një pajisjeje, për njoftime të targetuara"""
+    PLATFORM_CHOICES = [
+        ('android', 'Android'),
+        ('ios', 'iOS'),
+        ('web', 'Web'),
+        ('unknown', 'Unknown'),
+    ]
+
+    token = models.CharField(max_length=255, unique=True)
+    platform = models.CharField(max_length=10, choices=PLATFORM_CHOICES, default='unknown')
+    locale = models.CharField(max_length=10, blank=True)
+    last_seen_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-last_seen_at']
+        indexes = [
+            models.Index(fields=['platform', 'locale'], name='device_target_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.platform}: {self.token[:16]}…"
+
+
+class PushJob(models.Model):
+    """Njoftime për shumë libra/kuize, të dërguara si një punë e vetme në grupe"""
+    KIND_CHOICES = [
+        ('book', 'Book'),
+        ('quiz', 'Quiz'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_ids = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+
+    total = models.IntegerField(default=0)
+    sent = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    skipped = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    locked_by = models.CharField(max_length=64, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind} ({self.status})"
+
+    @property
+    def progress(self):
+        """Përqindja e mesazheve të përpunuara"""
+        if not self.total:
+            return 100 if self.status in ('done', 'failed') else 0
+        return int(100 * (self.sent + self.failed) / self.total)
+
+
+class PushDelivery(models.Model):
+    """Një thirrje drejt Firebase: kohëzgjatja, rezultati dhe madhësia e payload-it"""
+    CHANNEL_CHOICES = [
+        ('send', 'Send'),
+        ('send_each', 'Send each'),
+        ('multicast', 'Multicast'),
+        ('coalesced', 'Coalesced'),  # pa thirrje: bashkuar me një njoftim të mëparshëm
+    ]
+
+    kind = models.CharField(max_length=20)  # book / quiz / notification / topic / devices
+    object_id = models.CharField(max_length=64, blank=True)
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    success = models.BooleanField()
+    error_code = models.CharField(max_length=64, blank=True)
+    latency_ms = models.FloatField()
+    payload_bytes = models.IntegerField(default=0)
+    messages = models.IntegerField(default=1)
+    failures = models.IntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['kind', 'object_id'], name='delivery_object_idx'),
+            models.Index(fields=['created_at'], name='delivery_created_idx'),
+        ]
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f"{self.kind} {self.object_id} {self.channel}: {'ok' if self.success else self.error_code} ({self.latency_ms:.0f} ms)"
@@ -0,0 +1,120 @@
+import heapq
+import logging
+import time
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from be_blog.realtime import broadcast_content_update
+from .models import Notification
+from .services import enqueue_notification, next_delivery_time
+
+logger = logging.getLogger(__name__)
+
+
+def _due(now):
+    # Përdor indeksin notification_due_idx (push_status, send_at)
+    return Notification.objects.filter(
+        push_status='scheduled', send_at__lte=now, is_active=True
+    ).order_by('send_at')
+
+
+def claim_due_notifications(limit=100, now=None):
+    """
+    Merr atomikisht njoftimet që u ka ardhur koha dhe i vendos në radhë.
+    Me select_for_update(skip_locked=True) disa scheduler-a punojnë paralelisht
+    pa marrë të njëjtin rresht; në DB pa këtë mbështetje (SQLite) përdoret një
+    UPDATE i kushtëzuar për çdo rresht. Kthen njoftimet e vendosura në radhë.
+    """
+    now = now or timezone.now()
+    queued = []
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            claimed = list(_due(now).select_for_update(skip_locked=True)[:limit])
+        else:
+            claimed = [
+                notification for notification in _due(now)[:limit]
+                if Notification.objects.filter(pk=notification.pk, push_status='scheduled').update(push_status='queued')
+            ]
+
+        for notification in claimed:
+            deliver_at = next_delivery_time(notification, now)
+            if deliver_at > now:
+                # Jashtë dritares së locale-it - shtyje te fillimi i saj
+                # update() pa sinjal: njoftimi nuk është publikuar ende, s'ka çfarë të njoftohet
+                Notification.objects.filter(pk=notification.pk).update(send_at=deliver_at, push_status='scheduled')
+                logger.info(f"Notification {notification.pk} postponed to {deliver_at.isoformat()}")
+                continue
+
+            # Outbox-i dhe statusi ruhen në të njëjtin transaksion
+            enqueue_notification(notification)
+            notification.push_status = 'queued'
+            notification.push_queued_at = now
+            # Publikohet tani: `since`, renditja dhe read_until nisin nga kjo kohë
+            notification.created_at = now
+            notification.save(update_fields=['push_status', 'push_queued_at', 'created_at', 'updated_at'])
+            broadcast_content_update('notification', notification.pk, 'created')
+            queued.append(notification)
+
+    return queued
+
+
+class NotificationScheduler:
+    """
+    Cikli i scheduler-it: mban në një heap kohët e njoftimeve të ardhshme dhe
+    fle deri te më e afërta, në vend që të kontrollojë çdo rresht në çdo cikël.
+    Heap-i rifreskohet nga DB çdo `refresh_interval` sekonda, që të kapë
+    njoftimet e reja ose të ndryshuara nga admin-i.
+    """
+
+    def __init__(self, batch_size=100, refresh_interval=30, horizon=3600, clock=timezone.now, sleep=time.sleep):
+        self.batch_size = batch_size
+        self.refresh_interval = refresh_interval
+        self.horizon = horizon
+        self.clock = clock
+        self.sleep = sleep
+        self.heap = []
+        self.refreshed_at = None
+        self.queued = 0
+
+    def refresh(self):
+        """Ngarkon njoftimet e planifikuara brenda horizontit (query me indeks, me limit)"""
+        now = self.clock()
+        upcoming = _due(now + timedelta(seconds=self.horizon)).values_list('send_at', 'pk')
+        self.heap = list(upcoming[:self.batch_size])
+        heapq.heapify(self.heap)
+        self.refreshed_at = now
+
+    def next_wakeup(self):
+        """Sa sekonda të flejë: deri te njoftimi i radhës ose rifreskimi i radhës"""
+        now = self.clock()
+        wakeup = self.refreshed_at + timedelta(seconds=self.refresh_interval)
+        if self.heap:
+            wakeup = min(wakeup, self.heap[0][0])
+        return max((wakeup - now).total_seconds(), 0)
+
+    def tick(self):
+        """Një cikël: rifresko nëse duhet, dërgo të gatshmet; kthen numrin e vendosur në radhë"""
+        now = self.clock()
+        if self.refreshed_at is None or (now - self.refreshed_at).total_seconds() >= self.refresh_interval:
+            self.refresh()
+
+        if not self.heap or self.heap[0][0] > now:
+            return 0
+
+        while self.heap and self.heap[0][0] <= now:
+            heapq.heappop(self.heap)
+        queued = claim_due_notifications(limit=self.batch_size, now=now)
+        self.queued += len(queued)
+        if len(queued) == self.batch_size or not self.heap:
+            # Mund të ketë më shumë - rifresko në ciklin e radhës
+            self.refreshed_at = None
+        return len(queued)
+
+    def run(self, once=False):
+        while True:
+            self.tick()
+            if once:
+                return self.queued
+            self.sleep(self.next_wakeup() if self.refreshed_at else 0)
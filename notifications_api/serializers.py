@@ -14,14 +14,16 @@ class NotificationSerializer(serializers.ModelSerializer):
         ]
 
     def to_representation(self, instance):
+        read_state = self.context.get('read_state')
         return {
             'id': str(instance.id),
             'title': instance.title,
             'description': instance.description,
             'type': instance.type,
             'createdAt': instance.created_at.isoformat(),
-            'isRead': False,
-            'bookId': instance.book_id if instance.book else None,
-            'quizId': instance.quiz_id if instance.quiz else None,
+            'isRead': read_state.is_read(instance) if read_state else False,
+            # ✅ Kolonat e FK-së mjaftojnë, pa lexuar librin/kuizin
+            'bookId': str(instance.book_id) if instance.book_id else None,
+            'quizId': str(instance.quiz_id) if instance.quiz_id else None,
             'imageUrl': instance.image_url or None
         }
\ No newline at end of file
@@ -1,71 +1,269 @@
-import firebase_admin
-from firebase_admin import credentials, messaging
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
 from django.utils import timezone
-import json
-
-# Initialize Firebase Admin SDK
-cred_path = settings.BASE_DIR / 'firebase-credentials.json'
-if cred_path.exists():
-    cred = credentials.Certificate(cred_path)
-    firebase_admin.initialize_app(cred)
-
-
-# def send_notification_to_all(title, body, data=None):
-#     """Dërgon notifikim tek të gjithë përdoruesit"""
-#     message = messaging.Message(
-#         notification=messaging.Notification(
-#             title=title,
-#             body=body,
-#         ),
-#         data=data or {},
-#         topic='all_users',
-#     )
-#
-#     try:
-#         response = messaging.send(message)
-#         return True, response
-#     except Exception as e:
-#         return False, str(e)
-
-
+from django.utils.module_loading import import_string
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 import logging
+import os
+import threading
+import time
+import uuid
+
+from . import telemetry
 
 logger = logging.getLogger(__name__)
 
+PUSH_MAX_ATTEMPTS = getattr(settings, 'PUSH_MAX_ATTEMPTS', 5)
+PUSH_RETRY_BACKOFF = getattr(settings, 'PUSH_RETRY_BACKOFF', 30)
+PUSH_LOCK_TIMEOUT = getattr(settings, 'PUSH_LOCK_TIMEOUT', 300)
 
-def send_notification_to_all(title, body, data=None):
-    """Dërgon notifikim tek të gjithë përdoruesit"""
-    # ✅ Konverto të gjitha values në strings
-    if data:
-        data = {k: str(v) for k, v in data.items() if v is not None}
-
-    logger.info(f"Sending notification - Title: {title}, Body: {body}, Data: {data}")
-
-    message = messaging.Message(
-        notification=messaging.Notification(
-            title=title,
-            body=body,
-        ),
-        data=data or {},
-        topic='all_users',
-    )
+# Kufiri i Firebase për një thirrje send_each_for_multicast
+MULTICAST_BATCH_SIZE = 500
+
+# Njoftimet për të njëjtin libër/kuiz brenda kësaj dritareje bashkohen në një
+PUSH_COALESCE_WINDOW = getattr(settings, 'PUSH_COALESCE_WINDOW', 300)
+
+class TokenBucket:
+    """
+    Rate limiter global për thirrjet drejt Firebase. Një thirrje me më shumë
+    mesazhe se `capacity` lejohet, por e lë bucket-in negativ dhe të tjerat presin.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """Bllokon derisa të ketë vend; kthen sekondat e pritjes"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if wait:
+            telemetry.count('throttled')
+            telemetry.count('throttled_seconds', wait)
+            time.sleep(wait)
+        return wait
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def throttle(amount=1):
+    """
+    Pret radhën te rate limiter-i para çdo thirrjeje drejt transportit.
+    PUSH_RATE_LIMIT = mesazhe/sekondë (None = pa kufi), PUSH_RATE_BURST = sa dalin njëherësh.
+    """
+    global _rate_limiter
+    rate = getattr(settings, 'PUSH_RATE_LIMIT', 100)
+    if not rate:
+        return 0.0
+    with _rate_limiter_lock:
+        if _rate_limiter is None or _rate_limiter.rate != rate:
+            _rate_limiter = TokenBucket(rate, getattr(settings, 'PUSH_RATE_BURST', 500))
+        limiter = _rate_limiter
+    return limiter.acquire(amount)
+
+
+_firebase_lock = threading.Lock()
+_firebase_app = None
+
+
+def get_firebase_app():
+    """
+    Inicializon Firebase Admin SDK në dërgimin e parë dhe e ruan.
+    firebase_admin (google-auth, grpc) importohet vetëm këtu, që komandat,
+    worker-at dhe testet të mos e paguajnë këtë kosto në startup.
+    """
+    global _firebase_app
+    if _firebase_app is not None:
+        return _firebase_app
+
+    with _firebase_lock:
+        if _firebase_app is None:
+            import firebase_admin
+            from firebase_admin import credentials
+
+            try:
+                _firebase_app = firebase_admin.get_app()
+            except ValueError:
+                cred_path = getattr(
+                    settings, 'FIREBASE_CREDENTIALS_PATH', settings.BASE_DIR / 'firebase-credentials.json'
+                )
+                if not os.path.exists(cred_path):
+                    raise RuntimeError(f'Firebase credentials not found: {cred_path}')
+                _firebase_app = firebase_admin.initialize_app(credentials.Certificate(cred_path))
+    return _firebase_app
+
+
+def _messaging():
+    get_firebase_app()
+    from firebase_admin import messaging
+    return messaging
+
+
+class FirebaseTransport:
+    """Dërgon mesazhe te Firebase Cloud Messaging"""
+
+    def send(self, title, body, data, topic):
+        messaging = _messaging()
+        message = messaging.Message(
+            notification=messaging.Notification(
+                title=title,
+                body=body,
+            ),
+            data=data or {},
+            topic=topic,
+        )
+        return messaging.send(message)
+
+    def send_multicast(self, title, body, data, tokens):
+        """
+        Një thirrje për deri në 500 token-a. Kthen një listë me None për
+        sukses ose kodin e gabimit për çdo token, në të njëjtën renditje.
+        """
+        messaging = _messaging()
+        message = messaging.MulticastMessage(
+            notification=messaging.Notification(
+                title=title,
+                body=body,
+            ),
+            data=data or {},
+            tokens=tokens,
+        )
+        return self._errors(messaging.send_each_for_multicast(message))
+
+    def send_each(self, messages):
+        """
+        Një thirrje për deri në 500 mesazhe të ndryshme (dict me title, body,
+        data, topic). Kthen None ose kodin e gabimit për çdo mesazh.
+        """
+        messaging = _messaging()
+        batch = messaging.send_each([
+            messaging.Message(
+                notification=messaging.Notification(
+                    title=message['title'],
+                    body=message['body'],
+                ),
+                data=message.get('data') or {},
+                topic=message.get('topic', 'all_users'),
+            )
+            for message in messages
+        ])
+        return self._errors(batch)
 
-    try:
-        response = messaging.send(message)
-        logger.info(f"Firebase response: {response}")
-        print(f"✅ Firebase SUCCESS: {response}")  # ✅ Print në console
-        return True, response
-    except Exception as e:
-        logger.error(f"Firebase error: {str(e)}")
-        print(f"❌ Firebase ERROR: {str(e)}")  # ✅ Print në console
-        import traceback
-        traceback.print_exc()  # ✅ Print full error
-        return False, str(e)
+    @staticmethod
+    def _errors(batch):
+        from firebase_admin import messaging
+
+        results = []
+        for response in batch.responses:
+            if response.success:
+                results.append(None)
+            elif isinstance(response.exception, (messaging.UnregisteredError, messaging.SenderIdMismatchError)):
+                results.append('UNREGISTERED')
+            else:
+                results.append(getattr(response.exception, 'code', None) or str(response.exception))
+        return results
+
+
+def get_transport():
+    """Transporti nga settings.PUSH_TRANSPORT (testet përdorin një fake)"""
+    path = getattr(settings, 'PUSH_TRANSPORT', 'notifications_api.services.FirebaseTransport')
+    return import_string(path)()
+
+
+def _stringify(data):
+    """✅ Firebase pranon vetëm string values"""
+    return {k: str(v) for k, v in (data or {}).items() if v is not None}
+
+
+def recently_pushed(kind, object_ids):
+    """
+    Id-të (si string) që kanë njoftim në radhë, ose të dërguar brenda
+    PUSH_COALESCE_WINDOW, qoftë nga outbox-i apo nga një PushJob.
+    """
+    from books_api.models import Book
+    from quizes_api.models import Quiz
+    from .models import PushOutbox
+
+    object_ids = [str(pk) for pk in object_ids]
+    since = timezone.now() - timedelta(seconds=PUSH_COALESCE_WINDOW)
+    queued = PushOutbox.objects.filter(kind=kind, object_id__in=object_ids).filter(
+        # Një dërgim i dështuar nuk bashkon njoftimin e radhës - ai është ripërpjekja
+        Q(status__in=['pending', 'sending']) | Q(status='sent', sent_at__gte=since)
+    ).values_list('object_id', flat=True)
+
+    model = Book if kind == 'book' else Quiz
+    delivered = model.objects.filter(
+        pk__in=object_ids, notification_sent_at__gte=since
+    ).values_list('pk', flat=True)
+
+    return set(queued) | {str(pk) for pk in delivered}
+
+
+def _record_coalesced(kind, object_ids):
+    """Ruhet si PushDelivery (channel='coalesced') që `push_stats` ta shohë nga çdo proces"""
+    telemetry.count('coalesced', len(object_ids))
+    telemetry.persist([telemetry.delivery(kind, pk, 'coalesced', 0.0, 0, []) for pk in object_ids])
+
+
+def enqueue_push(kind, title, body, data=None, object_id='', topic='all_users'):
+    """Vendos njoftimin në radhë dhe kthehet menjëherë"""
+    from .models import PushOutbox
+
+    coalescable = bool(object_id) and kind in ('book', 'quiz')
+    if coalescable and str(object_id) in recently_pushed(kind, [object_id]):
+        _record_coalesced(kind, [object_id])
+        logger.info(f"Coalesced push ({kind} {object_id}) - Title: {title}")
+        return True, "Coalesced"
+
+    fields = {
+        'kind': kind,
+        'object_id': str(object_id),
+        'title': title,
+        'body': body,
+        'data': _stringify(data),
+        'topic': topic,
+    }
+    if not coalescable:
+        outbox = PushOutbox.objects.create(**fields)
+    else:
+        try:
+            # Savepoint: dy procese që kalojnë kontrollin njëkohësisht i ndal
+            # constraint-i unik mbi rreshtat pending/sending (kind, object_id)
+            with transaction.atomic():
+                outbox = PushOutbox.objects.create(**fields)
+        except IntegrityError:
+            _record_coalesced(kind, [object_id])
+            logger.info(f"Coalesced push ({kind} {object_id}) - Title: {title}")
+            return True, "Coalesced"
+    logger.info(f"Queued push #{outbox.pk} ({kind}) - Title: {title}")
+    return True, f"Queued #{outbox.pk}"
+
+
+def send_notification_to_all(title, body, data=None):
+    """Vendos në radhë një njoftim për të gjithë përdoruesit"""
+    return enqueue_push('topic', title, body, data)
 
 
 def send_book_notification(book):
-    """Dërgon notifikim për libër të ri dhe e track"""
+    """Vendos në radhë njoftimin për libër të ri; tracking bëhet pas dërgimit"""
+    title, body, data = build_book_message(book)
+    return enqueue_push('book', title, body, data, object_id=book.id)
+
+
+def build_book_message(book):
+    """Kthen (title, body, data) për njoftimin e librit"""
     title = "📚 Libër i ri!"
     body = f"{book.title} nga {book.author}"
 
@@ -77,22 +275,19 @@ def send_book_notification(book):
         'category': book.category,
         'cover_image': book.cover_image,
     }
+    return title, body, data
 
-    success, response = send_notification_to_all(title, body, data)
 
-    # ✅ Track notification
-    if success:
-        book.notification_sent = True
-        book.notification_sent_at = timezone.now()
-        book.notification_count += 1
-        book.save(update_fields=['notification_sent', 'notification_sent_at', 'notification_count'])
+def send_quiz_notification(quiz):
+    """Vendos në radhë njoftimin për kuiz të ri; tracking bëhet pas dërgimit"""
+    title, body, data = build_quiz_message(quiz)
+    return enqueue_push('quiz', title, body, data, object_id=quiz.id)
 
-    return success, response
 
-
-def send_quiz_notification(quiz):
-    """Dërgon notifikim për kuiz të ri dhe e track"""
-    question_count = quiz.questions.count()
+def build_quiz_message(quiz, question_count=None):
+    """Kthen (title, body, data); `question_count` kursen një query kur vjen nga annotate"""
+    if question_count is None:
+        question_count = quiz.questions.count()
 
     title = "🎯 Kuiz i ri!"
     body = f"{quiz.title} - {question_count} pyetje për '{quiz.book.title}'"
@@ -111,17 +306,400 @@ def send_quiz_notification(quiz):
     if quiz.book.cover_image:
         data['cover_image'] = quiz.book.cover_image
 
-    success, response = send_notification_to_all(title, body, data)
+    return title, body, data
+
+
+def enqueue_notification(notification):
+    """Vendos në radhë push-in për një Notification bazuar në tipin"""
+    if notification.type == 'newBook' and notification.book:
+        return send_book_notification(notification.book)
+    if notification.type == 'newQuiz' and notification.quiz:
+        return send_quiz_notification(notification.quiz)
+
+    data = {
+        'type': notification.type,
+        'notification_id': notification.id,
+        'title': notification.title,
+        'description': notification.description,
+    }
+
+    # Shto të dhëna specifike nëse ka
+    if notification.book:
+        data.update({
+            'book_id': notification.book.id,
+            'book_title': notification.book.title,
+            'cover_image': notification.book.get_cover_url() or '',
+        })
+    elif notification.quiz:
+        data.update({
+            'quiz_id': notification.quiz.id,
+            'quiz_title': notification.quiz.title,
+            'book_id': notification.quiz.book.id,
+            'book_title': notification.quiz.book.title,
+        })
+
+    if notification.image_url:
+        data['image_url'] = notification.image_url
+
+    logger.debug(f"Queueing notification with data: {data}")
+    return enqueue_push(
+        'notification', notification.title, notification.description, data, object_id=notification.id
+    )
+
+
+def next_delivery_time(notification, now=None):
+    """
+    Koha kur njoftimi lejohet të dërgohet: send_at (ose tani), e shtyrë te
+    fillimi i dritares së radhës nëse locale ka dritare në
+    NOTIFICATION_DELIVERY_WINDOWS = {'sq': ('Europe/Tirane', '08:00', '21:00')}.
+    """
+    from zoneinfo import ZoneInfo
+
+    now = now or timezone.now()
+    at = max(notification.send_at or now, now)
+    window = getattr(settings, 'NOTIFICATION_DELIVERY_WINDOWS', {}).get(notification.locale)
+    if not window:
+        return at
+
+    zone, start, end = window
+    start = datetime.strptime(start, '%H:%M').time()
+    end = datetime.strptime(end, '%H:%M').time()
+    local = at.astimezone(ZoneInfo(zone))
+    current = local.time()
+    # Dritare që kalon mesnatën (p.sh. 22:00-02:00) kur start > end
+    in_window = start <= current < end if start <= end else (current >= start or current < end)
+    if in_window:
+        return at
+
+    next_start = local.replace(hour=start.hour, minute=start.minute, second=0, microsecond=0)
+    if next_start <= local:
+        next_start += timedelta(days=1)
+    return next_start
+
+
+def register_device_token(token, platform='unknown', locale=''):
+    """Ruan ose rifreskon token-in e pajisjes"""
+    from .models import DeviceToken
+
+    device, created = DeviceToken.objects.update_or_create(
+        token=token,
+        defaults={'platform': platform, 'locale': locale, 'last_seen_at': timezone.now()},
+    )
+    return device, created
+
+
+def send_to_devices(title, body, data=None, tokens=None, platform=None, locale=None,
+                    concurrency=4, transport=None):
+    """
+    Dërgon njoftim te pajisjet e regjistruara (ose te `tokens`), me grupe prej
+    500 token-ash për thirrje dhe disa grupe paralelisht. Token-at që Firebase
+    i raporton si të çregjistruar fshihen.
+    """
+    from .models import DeviceToken
+
+    if tokens is None:
+        devices = DeviceToken.objects.all()
+        if platform:
+            devices = devices.filter(platform=platform)
+        if locale:
+            devices = devices.filter(locale=locale)
+        tokens = list(devices.values_list('token', flat=True))
+
+    stats = {'success': 0, 'failure': 0, 'pruned': 0}
+    if not tokens:
+        return stats
+
+    transport = transport or get_transport()
+    data = _stringify(data)
+    batches = [tokens[i:i + MULTICAST_BATCH_SIZE] for i in range(0, len(tokens), MULTICAST_BATCH_SIZE)]
+
+    size = telemetry.payload_size(title, body, data)
+
+    def send_batch(batch):
+        throttle(len(batch))
+        with telemetry.Timer() as timer:
+            try:
+                errors = transport.send_multicast(title, body, data, batch)
+            except Exception as e:
+                logger.exception(f"Multicast of {len(batch)} tokens failed: {e}")
+                errors = [e] * len(batch)
+        codes = [telemetry.error_code(error) for error in errors]
+        return errors, telemetry.record('devices', '', 'multicast', timer.ms, size, codes)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send_batch, batches))
+    telemetry.persist([delivery for _, delivery in results])
+
+    unregistered = []
+    for batch, (errors, _) in zip(batches, results):
+        for token, error in zip(batch, errors):
+            if error is None:
+                stats['success'] += 1
+            else:
+                stats['failure'] += 1
+                if error == 'UNREGISTERED':
+                    unregistered.append(token)
+
+    if unregistered:
+        stats['pruned'] = DeviceToken.objects.filter(token__in=unregistered).delete()[0]
+
+    logger.info(
+        f"Sent to {len(tokens)} devices in {len(batches)} batches: "
+        f"{stats['success']} ok, {stats['failure']} failed, {stats['pruned']} pruned"
+    )
+    return stats
+
+
+def _deliver(outbox, transport):
+    """
+    Dërgon një mesazh; thirret nga thread-et e worker-it, nuk shkruan në DB.
+    Kthen (success, response, PushDelivery).
+    """
+    throttle()
+    error = None
+    with telemetry.Timer() as timer:
+        try:
+            response = transport.send(outbox.title, outbox.body, outbox.data, outbox.topic)
+        except Exception as e:
+            error = e
+            logger.exception(f"Push #{outbox.pk} failed: {e}")
+
+    delivery = telemetry.record(
+        outbox.kind, outbox.object_id, 'send', timer.ms,
+        telemetry.payload_size(outbox.title, outbox.body, outbox.data),
+        [telemetry.error_code(error)]
+    )
+    if error is not None:
+        return False, str(error), delivery
+    return True, str(response), delivery
+
+
+def _track_delivery(outbox):
+    """✅ Track notification te libri/kuizi pasi Firebase e pranoi"""
+    from books_api.models import Book
+    from quizes_api.models import Quiz
+
+    model = {'book': Book, 'quiz': Quiz}.get(outbox.kind)
+    if model is None:
+        return
+    model.objects.filter(pk=outbox.object_id).update(
+        notification_sent=True,
+        notification_sent_at=outbox.sent_at,
+        notification_count=F('notification_count') + 1,
+    )
+
+
+def claim_outbox_batch(limit, worker_id):
+    """Merr atomikisht deri në `limit` mesazhe gati për dërgim"""
+    from .models import PushOutbox
+
+    now = timezone.now()
+    due = PushOutbox.objects.filter(
+        Q(status='pending', next_attempt_at__lte=now) |
+        Q(status='sending', locked_at__lt=now - timedelta(seconds=PUSH_LOCK_TIMEOUT))
+    )
+    ids = list(due.order_by('next_attempt_at').values_list('pk', flat=True)[:limit])
+    if not ids:
+        return []
+
+    # Vetëm rreshtat që nuk i ka marrë ndonjë worker tjetër ndërkohë
+    due.filter(pk__in=ids).update(
+        status='sending',
+        locked_by=worker_id,
+        locked_at=now,
+        attempts=F('attempts') + 1,
+    )
+    return list(PushOutbox.objects.filter(pk__in=ids, status='sending', locked_by=worker_id))
+
+
+def process_outbox(batch_size=50, concurrency=4, max_attempts=PUSH_MAX_ATTEMPTS, transport=None):
+    """Dërgon një grup mesazhesh paralelisht; kthen numrin e mesazheve të përpunuara"""
+    from .models import PushOutbox
+
+    transport = transport or get_transport()
+    worker_id = uuid.uuid4().hex
+    batch = claim_outbox_batch(batch_size, worker_id=worker_id)
+    if not batch:
+        return 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda outbox: _deliver(outbox, transport), batch))
+    telemetry.persist([delivery for _, _, delivery in results])
+
+    now = timezone.now()
+    for outbox, (success, response, _) in zip(batch, results):
+        if success:
+            outbox.status = 'sent'
+            outbox.sent_at = now
+            outbox.response = response[:255]
+            outbox.last_error = ''
+        elif outbox.attempts >= max_attempts:
+            outbox.status = 'failed'
+            outbox.last_error = response
+        else:
+            # Backoff eksponencial: 30s, 60s, 120s, ...
+            outbox.status = 'pending'
+            outbox.next_attempt_at = now + timedelta(seconds=PUSH_RETRY_BACKOFF * 2 ** (outbox.attempts - 1))
+            outbox.last_error = response
+        # Vetëm nëse rreshti është ende i këtij worker-i: pas PUSH_LOCK_TIMEOUT
+        # një worker tjetër mund ta ketë rimarrë dhe rezultati i tij vlen
+        owned = PushOutbox.objects.filter(pk=outbox.pk, locked_by=worker_id).update(
+            status=outbox.status,
+            sent_at=outbox.sent_at,
+            response=outbox.response,
+            last_error=outbox.last_error,
+            next_attempt_at=outbox.next_attempt_at,
+            locked_by='',
+            locked_at=None,
+        )
+        if not owned:
+            logger.warning(f"Push #{outbox.pk}: lock lost to another worker, result not saved ({outbox.status})")
+            continue
+        if success:
+            _track_delivery(outbox)
+
+    return len(batch)
+
+
+def create_push_job(kind, object_ids):
+    """Krijon punën dhe kthehet menjëherë; dërgimi bëhet nga worker-i"""
+    from .models import PushJob
+
+    object_ids = [str(pk) for pk in object_ids]
+    job = PushJob.objects.create(kind=kind, object_ids=object_ids, total=len(object_ids))
+    logger.info(f"Created push job #{job.pk} ({kind}, {len(object_ids)} objects)")
+    return job
+
+
+def _job_messages(job):
+    """Ndërton të gjitha mesazhet përpara dërgimit: [(objekt, mesazh), ...]"""
+    from django.db.models import Count
+    from books_api.models import Book
+    from quizes_api.models import Quiz
+
+    # Objektet që kanë tashmë njoftim në radhë nga outbox-i nuk dërgohen dy herë
+    coalesced = recently_pushed(job.kind, job.object_ids)
+    if coalesced:
+        _record_coalesced(job.kind, sorted(coalesced))
+    object_ids = [pk for pk in job.object_ids if pk not in coalesced]
+
+    if job.kind == 'book':
+        objects = Book.objects.filter(pk__in=object_ids, is_active=True, notification_sent=False)
+        built = ((obj, build_book_message(obj)) for obj in objects)
+    else:
+        objects = (
+            Quiz.objects.filter(pk__in=object_ids, notification_sent=False)
+            .select_related('book')
+            .annotate(question_total=Count('questions'))
+        )
+        built = ((obj, build_quiz_message(obj, obj.question_total)) for obj in objects)
+
+    return [
+        (obj, {'title': title, 'body': body, 'data': _stringify(data), 'topic': 'all_users'})
+        for obj, (title, body, data) in built
+    ]
+
+
+def _owns_job(job, worker_id, **fields):
+    """
+    Ruan fushat vetëm nëse puna është ende e këtij worker-i dhe rifreskon
+    started_at (heartbeat), që process_push_jobs të mos e rimarrë si të ngecur.
+    """
+    from .models import PushJob
+
+    if worker_id is None:
+        owned = PushJob.objects.filter(pk=job.pk)
+    else:
+        owned = PushJob.objects.filter(pk=job.pk, locked_by=worker_id)
+    return bool(owned.update(started_at=timezone.now(), **fields))
+
+
+def run_push_job(job, transport=None, chunk_size=MULTICAST_BATCH_SIZE, worker_id=None):
+    """
+    Dërgon mesazhet e punës me send_each në grupe. Tracking-u i objekteve
+    ruhet pas çdo grupi, prandaj një punë e rimarrë pas një crash-i nuk
+    i ridërgon objektet e dërguara (_job_messages merr vetëm notification_sent=False).
+    Para çdo grupi dhe në fund kontrollohet që puna është ende e worker_id.
+    """
+    transport = transport or get_transport()
+    pairs = _job_messages(job)
+    # Në rifillim, `sent` mban objektet e dërguara nga ekzekutimi i mëparshëm
+    job.total = job.sent + len(pairs)
+    job.skipped = max(len(job.object_ids) - job.total, 0)
+    job.failed = 0
+    if not _owns_job(job, worker_id, total=job.total, skipped=job.skipped, failed=0):
+        logger.warning(f"Push job #{job.pk} was claimed by another worker")
+        return job
+
+    for start in range(0, len(pairs), chunk_size):
+        if start and not _owns_job(job, worker_id):
+            logger.warning(f"Push job #{job.pk} was claimed by another worker, stopping")
+            return job
+
+        chunk = pairs[start:start + chunk_size]
+        throttle(len(chunk))
+        with telemetry.Timer() as timer:
+            try:
+                errors = transport.send_each([message for _, message in chunk])
+            except Exception as e:
+                logger.exception(f"Push job #{job.pk} chunk failed: {e}")
+                errors = [e] * len(chunk)
+
+        # Histogrami mat thirrjen; PushDelivery ruhet për çdo libër/kuiz me kohën e grupit
+        sizes = [telemetry.payload_size(m['title'], m['body'], m['data']) for _, m in chunk]
+        codes = [telemetry.error_code(error) for error in errors]
+        telemetry.observe(timer.ms, sum(sizes), codes)
+        telemetry.persist([
+            telemetry.delivery(job.kind, obj.pk, 'send_each', timer.ms, size, [code])
+            for (obj, _), size, code in zip(chunk, sizes, codes)
+        ])
+
+        delivered = []
+        for (obj, _), error, code in zip(chunk, errors, codes):
+            if not code:
+                delivered.append(obj)
+            else:
+                # Kodi shkon te telemetria; te puna ruhet mesazhi i plotë
+                job.last_error = str(error)
+                job.failed += 1
+        if delivered:
+            now = timezone.now()
+            for obj in delivered:
+                obj.notification_sent = True
+                obj.notification_sent_at = now
+                obj.notification_count = F('notification_count') + 1
+            type(delivered[0]).objects.bulk_update(
+                delivered, ['notification_sent', 'notification_sent_at', 'notification_count']
+            )
+        job.sent += len(delivered)
+        _owns_job(job, worker_id, sent=job.sent, failed=job.failed, last_error=job.last_error)
+
+    job.status = 'failed' if job.failed and not job.sent else 'done'
+    job.finished_at = timezone.now()
+    if not _owns_job(job, worker_id, status=job.status, finished_at=job.finished_at):
+        logger.warning(f"Push job #{job.pk} was claimed by another worker before finishing")
+        return job
+    logger.info(f"Push job #{job.pk}: {job.sent} sent, {job.failed} failed, {job.skipped} skipped")
+    return job
 
-    # ✅ Track notification
-    if success:
-        quiz.notification_sent = True
-        quiz.notification_sent_at = timezone.now()
-        quiz.notification_count += 1
-        quiz.save(update_fields=['notification_sent', 'notification_sent_at', 'notification_count'])
 
-    return success, response
+def process_push_jobs(transport=None, worker_id=None):
+    """Merr dhe ekzekuton punët në pritje; kthen numrin e punëve"""
+    from .models import PushJob
 
+    worker_id = worker_id or uuid.uuid4().hex
+    stale = timezone.now() - timedelta(seconds=PUSH_LOCK_TIMEOUT)
+    due = PushJob.objects.filter(Q(status='pending') | Q(status='running', started_at__lt=stale))
+    processed = 0
+    for pk in due.order_by('created_at').values_list('pk', flat=True):
+        # Vetëm një worker e merr punën
+        claimed = due.filter(pk=pk).update(
+            status='running', locked_by=worker_id, started_at=timezone.now()
+        )
+        if claimed:
+            run_push_job(PushJob.objects.get(pk=pk), transport=transport, worker_id=worker_id)
+            processed += 1
+    return processed
 
 
 #
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from be_blog.realtime import broadcast_content_update
+from .models import Notification
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created=False, **kwargs):
+    """Klientët e lidhur e shohin njoftimin menjëherë, pa pritur push-in"""
+    if instance.push_status == 'scheduled':
+        # Shfaqet kur e publikon scheduler-i; një i publikuar që riplanifikohet hiqet
+        if not created:
+            broadcast_content_update('notification', instance.pk, 'deleted')
+        return
+    action = 'deleted' if not instance.is_active else 'created' if created else 'updated'
+    broadcast_content_update('notification', instance.pk, action)
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    broadcast_content_update('notification', instance.pk, 'deleted')
@@ -0,0 +1,157 @@
+import json
+import logging
+import threading
+import time
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# Kufijtë e sipërm (ms) të histogramit; i fundit është +inf
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_lock = threading.Lock()
+
+
+def _empty():
+    return {
+        'calls': 0,
+        'messages': 0,
+        'failures': 0,
+        'errors': {},
+        'latency_buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+        'latency_ms_total': 0.0,
+        'payload_bytes_total': 0,
+        # Pa thirrje drejt transportit: bashkimet dhe pritjet e rate limiter-it
+        'coalesced': 0,
+        'throttled': 0,
+        'throttled_seconds': 0.0,
+    }
+
+
+_metrics = _empty()
+
+
+def payload_size(title, body, data):
+    """Madhësia e përafërt e mesazhit në bytes (JSON UTF-8)"""
+    return len(json.dumps({'title': title, 'body': body, 'data': data or {}}, ensure_ascii=False).encode('utf-8'))
+
+
+def error_code(error):
+    """Kodi i gabimit nga përgjigja e transportit ose nga exception-i"""
+    if error is None:
+        return ''
+    if isinstance(error, Exception):
+        return str(getattr(error, 'code', None) or type(error).__name__)[:64]
+    return str(error)[:64]
+
+
+def bucket_index(latency_ms):
+    for index, bound in enumerate(LATENCY_BUCKETS_MS):
+        if latency_ms <= bound:
+            return index
+    return len(LATENCY_BUCKETS_MS)
+
+
+class Timer:
+    """with Timer() as timer: ... ; timer.ms"""
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.ms = (time.perf_counter() - self.started) * 1000
+
+
+def observe(latency_ms, payload_bytes, errors):
+    """Shton një thirrje drejt transportit te histogrami i procesit"""
+    codes = [code for code in errors if code]
+    with _lock:
+        _metrics['calls'] += 1
+        _metrics['messages'] += len(errors)
+        _metrics['failures'] += len(codes)
+        _metrics['latency_buckets'][bucket_index(latency_ms)] += 1
+        _metrics['latency_ms_total'] += latency_ms
+        _metrics['payload_bytes_total'] += payload_bytes
+        for code in codes:
+            _metrics['errors'][code] = _metrics['errors'].get(code, 0) + 1
+
+
+def count(name, amount=1):
+    """Rrit një numërues të procesit (coalesced, throttled, throttled_seconds)"""
+    with _lock:
+        _metrics[name] += amount
+
+
+def delivery(kind, object_id, channel, latency_ms, payload_bytes, errors):
+    """PushDelivery (pa e ruajtur) për një objekt; `errors` ka një kod ose '' për çdo mesazh"""
+    from .models import PushDelivery
+
+    codes = [code for code in errors if code]
+    logger.info(
+        'push_delivery',
+        extra={
+            'push_kind': kind,
+            'push_object_id': str(object_id or ''),
+            'push_channel': channel,
+            'latency_ms': round(latency_ms, 1),
+            'payload_bytes': payload_bytes,
+            'messages': len(errors),
+            'failures': len(codes),
+            'error_code': codes[0] if codes else '',
+        }
+    )
+    return PushDelivery(
+        kind=kind,
+        object_id=str(object_id or ''),
+        channel=channel,
+        success=not codes,
+        error_code=codes[0] if codes else '',
+        latency_ms=latency_ms,
+        payload_bytes=payload_bytes,
+        messages=len(errors),
+        failures=len(codes),
+    )
+
+
+def record(kind, object_id, channel, latency_ms, payload_bytes, errors):
+    """
+    observe() + delivery() për një thirrje që i përket një objekti të vetëm.
+    Ruajtja bëhet me persist() nga thread-i kryesor, jo nga thread-et e dërgimit.
+    """
+    observe(latency_ms, payload_bytes, errors)
+    return delivery(kind, object_id, channel, latency_ms, payload_bytes, errors)
+
+
+def persist(deliveries):
+    """Ruan PushDelivery-t me një bulk_create; telemetria nuk duhet të prishë dërgimin"""
+    from .models import PushDelivery
+
+    if not deliveries:
+        return
+    try:
+        # Savepoint: një gabim këtu nuk e prish transaksionin e thirrësit
+        with transaction.atomic():
+            PushDelivery.objects.bulk_create(deliveries, batch_size=500)
+    except Exception:
+        logger.exception('Could not persist push deliveries')
+
+
+def snapshot():
+    """Metrikat e procesit aktual (histogrami, gabimet sipas kodit, payload, bashkimet, pritjet)"""
+    with _lock:
+        metrics = json.loads(json.dumps(_metrics))
+    calls = metrics['calls']
+    metrics['latency_ms_avg'] = metrics['latency_ms_total'] / calls if calls else 0.0
+    metrics['payload_bytes_avg'] = metrics['payload_bytes_total'] / calls if calls else 0.0
+    metrics['latency_buckets'] = dict(zip(
+        [f'<={bound}' for bound in LATENCY_BUCKETS_MS] + ['+inf'], metrics['latency_buckets']
+    ))
+    return metrics
+
+
+def reset():
+    global _metrics
+    with _lock:
+        _metrics = _empty()
@@ -1,3 +1,718 @@
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+import asyncio
+import json
+import subprocess
+import sys
+from unittest import mock
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from be_blog.realtime import CONTENT_UPDATES_GROUP
+from books_api.models import Book
+from quizes_api.tests import create_quiz
+from . import telemetry
+from .models import DeviceToken, Notification, NotificationReadState, PushDelivery, PushJob, PushOutbox
+from .scheduler import NotificationScheduler, claim_due_notifications
+from .services import (
+    TokenBucket, next_delivery_time, create_push_job, enqueue_notification, send_book_notification,
+    send_notification_to_all, send_to_devices, process_outbox, process_push_jobs,
+    run_push_job
+)
+
+
+class NotificationConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.notification = Notification.objects.create(
+            title='Njoftim', description='Përshkrim', type='announcement'
+        )
+
+    def test_list_returns_304_until_notification_is_edited(self):
+        etag = self.client.get('/api/notifications/')['ETag']
+        self.assertEqual(
+            self.client.get('/api/notifications/', HTTP_IF_NONE_MATCH=etag).status_code,
+            304
+        )
+
+        self.notification.title = 'Njoftim i ndryshuar'
+        self.notification.save()
+        self.assertEqual(
+            self.client.get('/api/notifications/', HTTP_IF_NONE_MATCH=etag).status_code,
+            200
+        )
+
+
+class FakeTransport:
+    """Transport në memorie për testet; `failures` dështon N thirrjet e para"""
+    sent = []
+    multicasts = []
+    batches = []
+    failures = 0
+
+    def send(self, title, body, data, topic):
+        if FakeTransport.failures:
+            FakeTransport.failures -= 1
+            raise RuntimeError('UNAVAILABLE')
+        FakeTransport.sent.append({'title': title, 'body': body, 'data': data, 'topic': topic})
+        return f'projects/test/messages/{len(FakeTransport.sent)}'
+
+    def send_each(self, messages):
+        FakeTransport.batches.append(list(messages))
+        return ['INTERNAL' if m['data'].get('title') == 'Dështon' else None for m in messages]
+
+    def send_multicast(self, title, body, data, tokens):
+        FakeTransport.multicasts.append(list(tokens))
+        return ['UNREGISTERED' if token.startswith('stale') else None for token in tokens]
+
+
+@override_settings(PUSH_TRANSPORT='notifications_api.tests.FakeTransport')
+class PushOutboxTests(TestCase):
+    def setUp(self):
+        FakeTransport.sent = []
+        FakeTransport.failures = 0
+        self.book = Book.objects.create(title='Libër', author='Autor', category='tjeter')
+
+    def test_send_book_notification_only_enqueues(self):
+        success, response = send_book_notification(self.book)
+
+        self.assertTrue(success)
+        self.assertEqual(FakeTransport.sent, [])
+        outbox = PushOutbox.objects.get()
+        self.assertEqual((outbox.kind, outbox.object_id, outbox.status), ('book', str(self.book.id), 'pending'))
+        self.book.refresh_from_db()
+        self.assertFalse(self.book.notification_sent)
+
+    def test_book_save_with_send_push_now_does_not_call_firebase(self):
+        self.book.send_push_now = True
+        self.book.save()
+        self.assertEqual(PushOutbox.objects.count(), 1)
+        self.assertEqual(FakeTransport.sent, [])
+
+    def test_worker_that_lost_the_lock_does_not_overwrite(self):
+        send_book_notification(self.book)
+
+        def reclaimed(deliveries):
+            # Pas PUSH_LOCK_TIMEOUT një worker tjetër e rimori rreshtin gjatë dërgimit
+            PushOutbox.objects.update(locked_by='tjetri', attempts=2)
+
+        with mock.patch('notifications_api.services.telemetry.persist', side_effect=reclaimed), \
+                self.assertLogs('notifications_api.services', 'WARNING'):
+            process_outbox()
+
+        outbox = PushOutbox.objects.get()
+        self.assertEqual((outbox.status, outbox.locked_by, outbox.sent_at), ('sending', 'tjetri', None))
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.notification_count, 0)
+
+    def test_worker_delivers_and_tracks(self):
+        send_book_notification(self.book)
+        send_notification_to_all('Titull', 'Trup', {'count': 3, 'skip': None})
+
+        self.assertEqual(process_outbox(concurrency=2), 2)
+
+        self.assertEqual(len(FakeTransport.sent), 2)
+        self.assertIn({'count': '3'}, [m['data'] for m in FakeTransport.sent])
+        self.assertFalse(PushOutbox.objects.exclude(status='sent').exists())
+        self.book.refresh_from_db()
+        self.assertTrue(self.book.notification_sent)
+        self.assertEqual(self.book.notification_count, 1)
+
+    def test_failed_send_is_retried_with_backoff(self):
+        FakeTransport.failures = 1
+        send_notification_to_all('Titull', 'Trup')
+
+        process_outbox()
+        outbox = PushOutbox.objects.get()
+        self.assertEqual((outbox.status, outbox.attempts), ('pending', 1))
+        self.assertGreater(outbox.next_attempt_at, timezone.now())
+        self.assertEqual(process_outbox(), 0)
+
+        PushOutbox.objects.update(next_attempt_at=timezone.now())
+        process_outbox()
+        outbox.refresh_from_db()
+        self.assertEqual((outbox.status, outbox.attempts), ('sent', 2))
+
+    def test_gives_up_after_max_attempts(self):
+        FakeTransport.failures = 10
+        send_notification_to_all('Titull', 'Trup')
+        for _ in range(2):
+            PushOutbox.objects.update(next_attempt_at=timezone.now())
+            process_outbox(max_attempts=2)
+        outbox = PushOutbox.objects.get()
+        self.assertEqual(outbox.status, 'failed')
+        self.assertIn('UNAVAILABLE', outbox.last_error)
+
+
+@override_settings(PUSH_TRANSPORT='notifications_api.tests.FakeTransport', PUSH_RATE_LIMIT=None)
+class DeviceTokenTests(TestCase):
+    def setUp(self):
+        FakeTransport.multicasts = []
+        self.client = APIClient()
+
+    def test_register_token_persists_and_refreshes(self):
+        url = '/api/notifications/register_token/'
+        response = self.client.post(url, {'token': 'abc', 'platform': 'ios', 'locale': 'sq'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.client.post(url, {'token': 'abc', 'platform': 'ios', 'locale': 'en'}, format='json')
+
+        device = DeviceToken.objects.get()
+        self.assertEqual((device.platform, device.locale), ('ios', 'en'))
+        self.assertEqual(self.client.post(url, {}, format='json').status_code, 400)
+
+    def test_register_token_rejects_invalid_input(self):
+        url = '/api/notifications/register_token/'
+        cases = [
+            {'token': 123},
+            {'token': ['abc']},
+            {'token': 'abc', 'locale': 5},
+            {'token': 'x' * 256},
+            ['abc'],
+        ]
+        for payload in cases:
+            self.assertEqual(self.client.post(url, payload, format='json').status_code, 400, payload)
+        self.assertFalse(DeviceToken.objects.exists())
+
+        response = self.client.post(url, {'token': 'x' * 255, 'platform': ['ios']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(DeviceToken.objects.get().platform, 'unknown')
+
+    def test_send_to_devices_batches_and_prunes_unregistered(self):
+        DeviceToken.objects.bulk_create(
+            [DeviceToken(token=f'token-{i}', locale='sq') for i in range(1200)] +
+            [DeviceToken(token=f'stale-{i}', locale='sq') for i in range(3)] +
+            [DeviceToken(token='other', locale='en')]
+        )
+
+        stats = send_to_devices('Titull', 'Trup', {'book_id': 1}, locale='sq')
+
+        self.assertEqual(sorted(len(batch) for batch in FakeTransport.multicasts), [203, 500, 500])
+        self.assertEqual(stats, {'success': 1200, 'failure': 3, 'pruned': 3})
+        self.assertFalse(DeviceToken.objects.filter(token__startswith='stale').exists())
+        self.assertEqual(DeviceToken.objects.count(), 1201)
+
+
+@override_settings(PUSH_TRANSPORT='notifications_api.tests.FakeTransport')
+class PushJobTests(TestCase):
+    def setUp(self):
+        FakeTransport.batches = []
+        self.client = APIClient()
+        self.client.force_login(get_user_model().objects.create_superuser('admin@example.com', 'Admin', 'pass'))
+
+    def test_admin_action_creates_job_without_sending(self):
+        books = [Book.objects.create(title=f'Libër {i}', author='Autor', category='tjeter') for i in range(3)]
+        Book.objects.filter(pk=books[0].pk).update(notification_sent=True)
+
+        response = self.client.post('/admin/books_api/book/', {
+            'action': 'send_notification_for_books',
+            '_selected_action': [str(book.pk) for book in books],
+        })
+
+        self.assertEqual(response.status_code, 302)
+        job = PushJob.objects.get()
+        self.assertEqual((job.kind, job.status, job.total), ('book', 'pending', 2))
+        self.assertEqual(FakeTransport.batches, [])
+        self.assertEqual(self.client.get(f'/admin/notifications_api/pushjob/{job.pk}/change/').status_code, 200)
+
+    def test_worker_sends_in_chunks_and_bulk_updates_tracking(self):
+        books = [Book.objects.create(title=f'Libër {i}', author='Autor', category='tjeter') for i in range(5)]
+        books.append(Book.objects.create(title='Dështon', author='Autor', category='tjeter'))
+        self.client.post('/admin/books_api/book/', {
+            'action': 'send_notification_for_books',
+            '_selected_action': [str(book.pk) for book in books],
+        })
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(process_push_jobs(), 1)
+        updates = [q for q in queries if q['sql'].startswith('UPDATE "books_api_book"')]
+        self.assertEqual(len(updates), 1)
+
+        job = PushJob.objects.get()
+        self.assertEqual((job.status, job.sent, job.failed, job.progress), ('done', 5, 1, 100))
+        self.assertEqual(len(FakeTransport.batches), 1)
+        self.assertEqual(Book.objects.filter(notification_sent=True, notification_count=1).count(), 5)
+
+    def test_quiz_job_counts_questions_without_per_quiz_queries(self):
+        quizzes = [create_quiz(title=f'Kuiz {i}', questions=3) for i in range(4)]
+        self.client.post('/admin/quizes_api/quiz/', {
+            'action': 'send_notification_for_quizzes',
+            '_selected_action': [str(quiz.pk) for quiz in quizzes],
+        })
+
+        # + një INSERT (me savepoint) për PushDelivery-t e të gjitha kuizeve
+        with self.assertNumQueries(13):
+            process_push_jobs()
+
+        self.assertTrue(all('3 pyetje' in m['body'] for m in FakeTransport.batches[0]))
+        self.assertEqual(PushJob.objects.get().sent, 4)
+
+    def test_failed_chunk_keeps_full_error_and_codes_telemetry(self):
+        book = Book.objects.create(title='Libër', author='Autor', category='tjeter')
+        job = create_push_job('book', [book.pk])
+        with mock.patch.object(FakeTransport, 'send_each', side_effect=RuntimeError('quota exceeded for project')):
+            run_push_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.last_error), ('failed', 'quota exceeded for project'))
+        self.assertEqual(PushDelivery.objects.get().error_code, 'RuntimeError')
+
+
+class WorkerCrash(BaseException):
+    """Simulon vrasjen e procesit: nuk kapet nga `except Exception`"""
+
+
+class CrashingTransport(FakeTransport):
+    """Dështon (si crash) në grupin e dytë të send_each"""
+
+    def send_each(self, messages):
+        if FakeTransport.batches:
+            raise WorkerCrash()
+        return super().send_each(messages)
+
+
+class StolenLockTransport(FakeTransport):
+    """Gjatë grupit të parë një worker tjetër e rimerr punën"""
+
+    def send_each(self, messages):
+        PushJob.objects.update(locked_by='tjetri')
+        return super().send_each(messages)
+
+
+@override_settings(PUSH_TRANSPORT='notifications_api.tests.FakeTransport')
+class PushJobResumeTests(TestCase):
+    def setUp(self):
+        FakeTransport.batches = []
+        books = [Book.objects.create(title=f'Libër {i}', author='Autor', category='tjeter') for i in range(5)]
+        self.job = create_push_job('book', [book.pk for book in books])
+        PushJob.objects.filter(pk=self.job.pk).update(status='running', locked_by='w1', started_at=timezone.now())
+
+    def test_resumed_job_does_not_resend_delivered_objects(self):
+        with self.assertRaises(WorkerCrash):
+            run_push_job(PushJob.objects.get(), transport=CrashingTransport(), chunk_size=2, worker_id='w1')
+        # Grupi i parë u ruajt para crash-it
+        self.assertEqual(Book.objects.filter(notification_sent=True).count(), 2)
+
+        # Puna ngec si 'running' dhe rimerret pas PUSH_LOCK_TIMEOUT
+        PushJob.objects.update(started_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(process_push_jobs(transport=FakeTransport()), 1)
+
+        sent = [m['data']['book_id'] for batch in FakeTransport.batches for m in batch]
+        self.assertEqual(len(sent), len(set(sent)))
+        self.assertEqual(len(sent), 5)
+        job = PushJob.objects.get()
+        self.assertEqual((job.status, job.sent, job.total, job.skipped), ('done', 5, 5, 0))
+
+    def test_runner_stops_when_job_is_reclaimed(self):
+        run_push_job(PushJob.objects.get(), transport=StolenLockTransport(), chunk_size=2, worker_id='w1')
+
+        self.assertEqual(len(FakeTransport.batches), 1)
+        job = PushJob.objects.get()
+        # Statusi mbetet i worker-it që e mori punën
+        self.assertEqual((job.status, job.locked_by, job.finished_at), ('running', 'tjetri', None))
+
+    def test_heartbeat_refreshes_started_at(self):
+        old = timezone.now() - timedelta(minutes=4)
+        PushJob.objects.update(started_at=old)
+        run_push_job(PushJob.objects.get(), transport=FakeTransport(), chunk_size=2, worker_id='w1')
+        self.assertGreater(PushJob.objects.get().started_at, old)
+
+
+@override_settings(PUSH_TRANSPORT='notifications_api.tests.FakeTransport')
+class PushCoalescingTests(TestCase):
+    def setUp(self):
+        FakeTransport.sent = []
+        FakeTransport.batches = []
+        telemetry.reset()
+        self.book = Book.objects.create(title='Libër', author='Autor', category='tjeter')
+
+    def test_repeated_book_pushes_are_coalesced(self):
+        send_book_notification(self.book)
+        self.assertEqual(send_book_notification(self.book), (True, 'Coalesced'))
+        self.assertEqual(PushOutbox.objects.count(), 1)
+
+        process_outbox()
+        self.assertEqual(send_book_notification(self.book), (True, 'Coalesced'))
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.notification_count, 1)
+        self.assertEqual(telemetry.snapshot()['coalesced'], 2)
+
+    def test_push_is_allowed_again_after_the_window(self):
+        send_book_notification(self.book)
+        process_outbox()
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        PushOutbox.objects.update(created_at=an_hour_ago, sent_at=an_hour_ago)
+        Book.objects.filter(pk=self.book.pk).update(notification_sent_at=an_hour_ago)
+
+        self.assertNotEqual(send_book_notification(self.book), (True, 'Coalesced'))
+        self.assertEqual(PushOutbox.objects.count(), 2)
+
+    def test_failed_push_does_not_suppress_the_retry(self):
+        send_book_notification(self.book)
+        PushOutbox.objects.update(status='failed', last_error='UNAVAILABLE')
+
+        self.assertNotEqual(send_book_notification(self.book), (True, 'Coalesced'))
+        self.assertEqual(PushOutbox.objects.filter(status='pending').count(), 1)
+
+    def test_job_skips_books_already_queued(self):
+        other = Book.objects.create(title='Tjetër', author='Autor', category='tjeter')
+        send_book_notification(self.book)
+        create_push_job('book', [self.book.pk, other.pk])
+
+        process_push_jobs()
+
+        job = PushJob.objects.get()
+        self.assertEqual((job.sent, job.skipped), (1, 1))
+        self.assertEqual([m['data']['book_id'] for m in FakeTransport.batches[0]], [str(other.pk)])
+
+    def test_coalesced_count_is_persisted_for_push_stats(self):
+        send_book_notification(self.book)
+        send_book_notification(self.book)
+        create_push_job('book', [self.book.pk])
+        process_push_jobs()
+
+        out = StringIO()
+        call_command('push_stats', '--json', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['coalesced'], 2)
+        self.assertEqual(report['deliveries'], 0)
+
+    def test_concurrent_enqueue_is_coalesced_by_constraint(self):
+        send_book_notification(self.book)
+        # Procesi tjetër e kaloi kontrollin para se rreshti i parë të ishte i dukshëm
+        with mock.patch('notifications_api.services.recently_pushed', return_value=set()):
+            self.assertEqual(send_book_notification(self.book), (True, 'Coalesced'))
+        self.assertEqual(PushOutbox.objects.count(), 1)
+        self.assertEqual(PushDelivery.objects.filter(channel='coalesced').count(), 1)
+
+
+class TokenBucketTests(TestCase):
+    def setUp(self):
+        telemetry.reset()
+
+    def test_burst_passes_then_calls_wait_for_refill(self):
+        bucket = TokenBucket(rate=1000, capacity=10)
+        self.assertEqual(bucket.acquire(10), 0.0)
+
+        waited = bucket.acquire(20)
+        self.assertGreater(waited, 0.01)
+        self.assertEqual(telemetry.snapshot()['throttled'], 1)
+        self.assertGreater(telemetry.snapshot()['throttled_seconds'], 0.01)
+
+
+class FirebaseImportTests(TestCase):
+    def test_django_setup_does_not_import_firebase(self):
+        code = (
+            "import os, sys, django\n"
+            "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'be_blog.settings')\n"
+            "django.setup()\n"
+            "import books_api.models, notifications_api.services\n"
+            "print('firebase_admin' in sys.modules)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=settings.BASE_DIR
+        )
+        self.assertEqual(result.stdout.strip(), 'False')
+
+
+class NotificationListQueryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.book = Book.objects.create(title='Libër', author='Autor', category='tjeter')
+        self.quiz = create_quiz(book=self.book)
+
+    def create_notifications(self, count):
+        Notification.objects.bulk_create([
+            Notification(
+                title=f'Njoftim {i}',
+                description='Përshkrim',
+                type=['newBook', 'newQuiz', 'announcement'][i % 3],
+                book=self.book if i % 3 == 0 else None,
+                quiz=self.quiz if i % 3 == 1 else None,
+            )
+            for i in range(count)
+        ])
+
+    def test_list_query_count_is_constant_for_1000_notifications(self):
+        self.create_notifications(1000)
+
+        # validators (1) + faqja (1), pa JOIN dhe pa query për book/quiz
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/notifications/?page_size=100')
+        results = response.json()['results']
+        self.assertEqual(len(results), 100)
+        self.assertIn(str(self.book.id), [n['bookId'] for n in results])
+        self.assertIn(str(self.quiz.id), [n['quizId'] for n in results])
+
+        with self.assertNumQueries(2):
+            self.client.get(response.json()['next'])
+
+    def test_since_filters_on_created_at(self):
+        self.create_notifications(3)
+        Notification.objects.filter(title='Njoftim 0').update(created_at=timezone.now() - timedelta(days=2))
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+
+        response = self.client.get('/api/notifications/', {'since': since})
+        self.assertEqual(
+            sorted(n['title'] for n in response.json()['results']), ['Njoftim 1', 'Njoftim 2']
+        )
+        self.assertEqual(self.client.get('/api/notifications/?since=dje').status_code, 400)
+        self.assertEqual(self.client.get('/api/notifications/?since=2024-13-45T00:00:00').status_code, 400)
+
+    def test_admin_changelist_does_not_query_per_row(self):
+        self.client.force_login(get_user_model().objects.create_superuser('admin@example.com', 'Admin', 'pass'))
+        self.create_notifications(10)
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get('/admin/notifications_api/notification/')
+        self.assertContains(response, 'Njoftim 9')
+
+        self.create_notifications(90)
+        with CaptureQueriesContext(connection) as many:
+            self.client.get('/admin/notifications_api/notification/')
+        self.assertEqual(len(few), len(many))
+
+
+class NotificationReadStateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user('lexues@example.com', 'Lexues', 'pass')
+        self.client.force_authenticate(self.user)
+        now = timezone.now()
+        self.notifications = []
+        for i in range(5):
+            notification = Notification.objects.create(title=f'N{i}', description='', type='announcement')
+            Notification.objects.filter(pk=notification.pk).update(created_at=now - timedelta(minutes=10 - i))
+            notification.refresh_from_db()
+            self.notifications.append(notification)
+
+    def unread_count(self):
+        return self.client.get('/api/notifications/unread_count/').json()['unreadCount']
+
+    def read_flags(self, client=None):
+        results = (client or self.client).get('/api/notifications/').json()['results']
+        return {n['title']: n['isRead'] for n in results}
+
+    def test_mark_read_compacts_into_watermark(self):
+        n = self.notifications
+        self.client.post('/api/notifications/mark_read/', {'ids': [str(n[1].id), str(n[3].id)]}, format='json')
+        self.assertEqual(self.unread_count(), 3)
+        state = NotificationReadState.objects.get(user=self.user)
+        self.assertIsNone(state.read_until)
+        self.assertEqual(len(state.read_ids), 2)
+
+        # N0 mbyll boshllëkun: N0, N1 kalojnë te read_until, mbetet vetëm N3
+        response = self.client.post('/api/notifications/mark_read/', {'ids': [str(n[0].id)]}, format='json')
+        self.assertEqual(response.json()['unreadCount'], 2)
+        state.refresh_from_db()
+        self.assertEqual(state.read_until, n[1].created_at)
+        self.assertEqual(state.read_ids, [str(n[3].id)])
+        self.assertEqual(
+            self.read_flags(), {'N0': True, 'N1': True, 'N2': False, 'N3': True, 'N4': False}
+        )
+
+    def test_mark_all_read_and_new_notifications(self):
+        self.client.post('/api/notifications/mark_all_read/')
+        self.assertEqual(self.unread_count(), 0)
+
+        Notification.objects.create(title='E re', description='', type='announcement')
+        self.assertEqual(self.unread_count(), 1)
+        self.assertFalse(self.read_flags()['E re'])
+        self.assertEqual(NotificationReadState.objects.count(), 1)
+
+    def test_read_state_changes_etag_and_is_per_user(self):
+        etag = self.client.get('/api/notifications/')['ETag']
+        self.client.post('/api/notifications/mark_all_read/')
+        self.assertEqual(self.client.get('/api/notifications/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        self.assertFalse(any(self.read_flags(APIClient()).values()))
+        self.assertEqual(APIClient().get('/api/notifications/unread_count/').status_code, 401)
+        self.assertEqual(
+            self.client.post('/api/notifications/mark_read/', {'ids': ['jo-uuid']}, format='json').status_code, 400
+        )
+
+    def test_per_user_responses_are_not_shared_by_caches(self):
+        response = self.client.get('/api/notifications/')
+        self.assertIn('Authorization', response['Vary'])
+        self.assertIn('private', response['Cache-Control'])
+        cached = self.client.get('/api/notifications/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertIn('Authorization', cached['Vary'])
+        self.assertIn('private', cached['Cache-Control'])
+
+        anonymous = APIClient().get('/api/notifications/')
+        self.assertIn('Authorization', anonymous['Vary'])
+        self.assertNotIn('private', anonymous.get('Cache-Control', ''))
+
+
+@override_settings(
+    PUSH_TRANSPORT='notifications_api.tests.FakeTransport',
+    NOTIFICATION_DELIVERY_WINDOWS={'sq': ('Europe/Tirane', '08:00', '21:00'), 'nat': ('UTC', '22:00', '02:00')},
+)
+class NotificationSchedulerTests(TestCase):
+    def at(self, hour, minute=0):
+        return datetime(2026, 1, 15, hour, minute, tzinfo=dt_timezone.utc)
+
+    def scheduled(self, send_at, locale='', title='Planifikuar'):
+        return Notification.objects.create(
+            title=title, description='', type='announcement',
+            send_at=send_at, locale=locale, push_status='scheduled'
+        )
+
+    def test_next_delivery_time_respects_locale_windows(self):
+        # Tirana = UTC+1 në janar
+        self.assertEqual(next_delivery_time(Notification(send_at=self.at(10)), self.at(9)), self.at(10))
+        self.assertEqual(next_delivery_time(Notification(locale='sq'), self.at(12)), self.at(12))
+        self.assertEqual(next_delivery_time(Notification(locale='sq'), self.at(5)), self.at(7))
+        self.assertEqual(next_delivery_time(Notification(locale='sq'), self.at(21)), self.at(7) + timedelta(days=1))
+        self.assertEqual(next_delivery_time(Notification(locale='nat'), self.at(23)), self.at(23))
+        self.assertEqual(next_delivery_time(Notification(locale='nat'), self.at(12)), self.at(22))
+
+    def test_claim_queues_due_notifications_once(self):
+        due = self.scheduled(self.at(9), title='Gati')
+        future = self.scheduled(self.at(11), title='Më vonë')
+
+        self.assertEqual(claim_due_notifications(now=self.at(10)), [due])
+        self.assertEqual(claim_due_notifications(now=self.at(10)), [])
+
+        due.refresh_from_db()
+        future.refresh_from_db()
+        self.assertEqual((due.push_status, future.push_status), ('queued', 'scheduled'))
+        self.assertEqual(list(PushOutbox.objects.values_list('title', flat=True)), ['Gati'])
+
+    def test_claim_postpones_outside_locale_window(self):
+        notification = self.scheduled(self.at(3), locale='sq')
+
+        self.assertEqual(claim_due_notifications(now=self.at(4)), [])
+        notification.refresh_from_db()
+        self.assertEqual((notification.push_status, notification.send_at), ('scheduled', self.at(7)))
+        self.assertFalse(PushOutbox.objects.exists())
+
+    def test_scheduler_sleeps_until_next_due_time(self):
+        clock = [self.at(10)]
+        scheduler = NotificationScheduler(refresh_interval=300, clock=lambda: clock[0])
+        self.scheduled(self.at(10, 1))
+
+        self.assertEqual(scheduler.tick(), 0)
+        self.assertEqual(scheduler.next_wakeup(), 60)
+
+        clock[0] = self.at(10, 1)
+        # Pa rifreskim të heap-it: vetëm claim + outbox (+ savepoint-et)
+        with self.assertNumQueries(6):
+            self.assertEqual(scheduler.tick(), 1)
+        self.assertEqual(PushOutbox.objects.count(), 1)
+
+    def test_scheduled_notification_is_hidden_until_published(self):
+        layer = get_channel_layer()
+        async_to_sync(layer.flush)()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(CONTENT_UPDATES_GROUP, channel)
+
+        async def drain():
+            events = []
+            while True:
+                try:
+                    message = await asyncio.wait_for(layer.receive(channel), 0.05)
+                except asyncio.TimeoutError:
+                    return [(e['id'], e['action']) for e in events]
+                events.append(message['event'])
+
+        client = APIClient()
+        client.force_authenticate(get_user_model().objects.create_user('lexues@example.com', 'Lexues', 'pass'))
+        with self.captureOnCommitCallbacks(execute=True):
+            notification = self.scheduled(timezone.now() + timedelta(minutes=5))
+            public = Notification.objects.create(title='Publik', description='', type='announcement')
+        self.assertEqual(async_to_sync(drain)(), [(str(public.pk), 'created')])
+        self.assertEqual([n['title'] for n in client.get('/api/notifications/').json()['results']], ['Publik'])
+        self.assertEqual(client.post('/api/notifications/mark_all_read/').json()['unreadCount'], 0)
+
+        published_at = timezone.now() + timedelta(minutes=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(claim_due_notifications(now=published_at), [notification])
+        self.assertEqual(async_to_sync(drain)(), [(str(notification.pk), 'created')])
+
+        # Koha e publikimit, jo e krijimit: `since` dhe read_until e shohin si të re
+        response = client.get('/api/notifications/', {'since': public.created_at.isoformat()})
+        self.assertEqual([n['title'] for n in response.json()['results']], ['Planifikuar'])
+        self.assertEqual(client.get('/api/notifications/unread_count/').json()['unreadCount'], 1)
+
+    def test_admin_schedules_future_notification(self):
+        self.client.force_login(get_user_model().objects.create_superuser('admin@example.com', 'Admin', 'pass'))
+        send_at = timezone.now() + timedelta(hours=2)
+        self.client.post('/admin/notifications_api/notification/add/', {
+            'title': 'Nesër', 'description': 'Përshkrim', 'type': 'announcement', 'is_active': 'on',
+            'send_at_0': timezone.localtime(send_at).strftime('%Y-%m-%d'),
+            'send_at_1': timezone.localtime(send_at).strftime('%H:%M:%S'),
+            'locale': '',
+        })
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.push_status, 'scheduled')
+        self.assertFalse(PushOutbox.objects.exists())
+        self.assertEqual(self.client.get('/api/notifications/').json()['results'], [])
+
+
+@override_settings(PUSH_TRANSPORT='notifications_api.tests.FakeTransport', PUSH_RATE_LIMIT=None)
+class PushTelemetryTests(TestCase):
+    def setUp(self):
+        FakeTransport.sent = []
+        FakeTransport.batches = []
+        FakeTransport.failures = 0
+        telemetry.reset()
+
+    def test_outbox_sends_are_timed_and_persisted_per_object(self):
+        notification = Notification.objects.create(title='Njoftim', description='Trup', type='announcement')
+        enqueue_notification(notification)
+        FakeTransport.failures = 1
+        send_notification_to_all('Titull', 'Trup')
+
+        process_outbox(concurrency=1)
+
+        deliveries = {d.kind: d for d in PushDelivery.objects.all()}
+        self.assertEqual(set(deliveries), {'notification', 'topic'})
+        self.assertEqual(
+            sorted((d.success, d.error_code) for d in deliveries.values()), [(False, 'RuntimeError'), (True, '')]
+        )
+        self.assertEqual(PushDelivery.objects.get(object_id=str(notification.id)).channel, 'send')
+        self.assertTrue(all(d.payload_bytes > 0 and d.latency_ms >= 0 for d in deliveries.values()))
+
+        metrics = telemetry.snapshot()
+        self.assertEqual((metrics['calls'], metrics['failures']), (2, 1))
+        self.assertEqual(metrics['errors'], {'RuntimeError': 1})
+        self.assertEqual(sum(metrics['latency_buckets'].values()), 2)
+
+    def test_push_job_records_one_delivery_per_book(self):
+        books = [Book.objects.create(title=f'Libër {i}', author='Autor', category='tjeter') for i in range(3)]
+        run_push_job(create_push_job('book', [book.pk for book in books]))
+
+        self.assertEqual(
+            set(PushDelivery.objects.values_list('object_id', flat=True)), {str(book.pk) for book in books}
+        )
+        self.assertEqual(telemetry.snapshot()['calls'], 1)
+
+    def test_push_stats_command_reports_histogram_and_errors(self):
+        PushDelivery.objects.bulk_create([
+            PushDelivery(kind='book', object_id='1', channel='send', success=True, latency_ms=8, payload_bytes=100),
+            PushDelivery(kind='book', object_id='2', channel='send', success=True, latency_ms=40, payload_bytes=300),
+            PushDelivery(kind='topic', channel='send', success=False, error_code='UNAVAILABLE',
+                         latency_ms=3000, payload_bytes=200, failures=1),
+        ])
+        out = StringIO()
+        call_command('push_stats', '--json', stdout=out)
+        report = json.loads(out.getvalue())
+
+        self.assertEqual((report['deliveries'], report['failures']), (3, 1))
+        self.assertEqual(report['latency_buckets']['<=10'], 1)
+        self.assertEqual(report['latency_buckets']['<=50'], 1)
+        self.assertEqual(report['latency_buckets']['<=5000'], 1)
+        self.assertEqual(report['latency_p50'], '50')
+        self.assertEqual(report['errors'], {'UNAVAILABLE': 1})
+        self.assertEqual(report['by_kind']['book']['deliveries'], 2)
+
+        call_command('push_stats', stdout=StringIO())
@@ -1,19 +1,134 @@
-from rest_framework import viewsets
+import hashlib
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_datetime
+from rest_framework import status, viewsets
 from rest_framework.decorators import action
-from rest_framework.permissions import AllowAny
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from .models import Notification
+from be_blog.conditional import ConditionalGetMixin
+from be_blog.pagination import CreatedAtCursorPagination
+from .models import DeviceToken, Notification, NotificationReadState
 from .serializers import NotificationSerializer
+from .services import register_device_token
 
 
-class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Notification.objects.filter(is_active=True)
+class NotificationViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    # ✅ Vetëm kolonat që serializer-i përdor; book_id/quiz_id pa JOIN
+    queryset = Notification.objects.published().only(
+        'id', 'title', 'description', 'type', 'created_at', 'updated_at',
+        'book_id', 'quiz_id', 'image_url'
+    )
     serializer_class = NotificationSerializer
     permission_classes = [AllowAny]
+    pagination_class = CreatedAtCursorPagination
+    # isRead është për përdorues: një cache i përbashkët nuk duhet ta ndajë
+    vary_headers = ['Accept', 'Authorization']
+
+    def get_read_state(self):
+        """Statusi i leximit për përdoruesin e loguar (None për anonimët)"""
+        if not self.request.user.is_authenticated:
+            return None
+        if not hasattr(self, '_read_state'):
+            self._read_state = NotificationReadState.objects.filter(user=self.request.user).first()
+        return self._read_state
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['read_state'] = self.get_read_state()
+        return context
+
+    def get_validators(self, queryset):
+        """isRead ndryshon pa ndryshuar njoftimet - përfshi statusin e leximit te ETag"""
+        etag, last_modified = super().get_validators(queryset)
+        state = self.get_read_state()
+        if state is None:
+            return etag, last_modified
+        etag = '"%s"' % hashlib.md5(f'{etag}|{state.updated_at.isoformat()}'.encode('utf-8')).hexdigest()
+        return etag, max(last_modified or 0, int(state.updated_at.timestamp()))
+
+    def conditional_response(self, request, queryset, respond):
+        response = super().conditional_response(request, queryset, respond)
+        if request.user.is_authenticated:
+            # Edhe për sesionet me cookie, ku Authorization mungon
+            patch_cache_control(response, private=True)
+        return response
+
+    def filter_queryset(self, queryset):
+        """?since=<ISO 8601> - vetëm njoftimet e krijuara pas kësaj date"""
+        queryset = super().filter_queryset(queryset)
+        since = self.request.query_params.get('since')
+        if since:
+            try:
+                since_date = parse_datetime(since)
+            except ValueError:
+                # Formati i saktë, por datë e pamundur (p.sh. muaji 13)
+                since_date = None
+            if since_date is None:
+                raise ValidationError({'error': 'since duhet të jetë datë ISO 8601'})
+            if timezone.is_naive(since_date):
+                since_date = timezone.make_aware(since_date)
+            queryset = queryset.filter(created_at__gt=since_date)
+        return queryset
 
     @action(detail=False, methods=['post'])
     def register_token(self, request):
         """Regjistron FCM token nga Flutter app"""
-        token = request.data.get('token')
-        # Ruaj token në database nëse do përdorësh për target specifik
-        return Response({'status': 'Token registered'})
\ No newline at end of file
+        if not isinstance(request.data, dict):
+            return Response({'error': 'token is required'}, status=status.HTTP_400_BAD_REQUEST)
+        token = request.data.get('token') or ''
+        locale = request.data.get('locale') or ''
+        if not isinstance(token, str) or not isinstance(locale, str):
+            return Response({'error': 'token dhe locale duhet të jenë string'}, status=status.HTTP_400_BAD_REQUEST)
+        token = token.strip()
+        if not token:
+            return Response({'error': 'token is required'}, status=status.HTTP_400_BAD_REQUEST)
+        # Token-i i prerë nuk do të funksiononte më te FCM
+        max_length = DeviceToken._meta.get_field('token').max_length
+        if len(token) > max_length:
+            return Response(
+                {'error': f'token më i gjatë se {max_length} karaktere'}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        platform = request.data.get('platform', 'unknown')
+        if not isinstance(platform, str) or platform not in dict(DeviceToken.PLATFORM_CHOICES):
+            platform = 'unknown'
+
+        register_device_token(token, platform=platform, locale=locale[:10])
+        return Response({'status': 'Token registered'})
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def mark_all_read(self, request):
+        """Shënon të lexuara të gjitha njoftimet aktuale - një rresht për përdorues"""
+        until = self.queryset.aggregate(last=Max('created_at'))['last']
+        state, _ = NotificationReadState.objects.get_or_create(user=request.user)
+        if until and (state.read_until is None or until > state.read_until):
+            state.mark_all_read(until)
+            state.save()
+        return Response({'unreadCount': state.unread(self.queryset).count()})
+
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
+    def mark_read(self, request):
+        """Shënon të lexuara njoftimet me `ids`"""
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response({'error': 'ids duhet të jetë listë'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            notifications = list(self.queryset.filter(id__in=ids[:500]).only('id', 'created_at'))
+        except (DjangoValidationError, ValueError):
+            return Response({'error': 'ids të pavlefshme'}, status=status.HTTP_400_BAD_REQUEST)
+
+        state, _ = NotificationReadState.objects.get_or_create(user=request.user)
+        state.mark_read(notifications)
+        state.save()
+        return Response({'unreadCount': state.unread(self.queryset).count()})
+
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def unread_count(self, request):
+        """Numri i njoftimeve të palexuara me një COUNT"""
+        state = self.get_read_state() or NotificationReadState(user=request.user)
+        return Response({'unreadCount': state.unread(self.queryset).count()})
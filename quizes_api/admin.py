@@ -1,9 +1,10 @@
 from django.contrib import admin
 from django.contrib import messages
+from django.urls import reverse
 from django.utils.html import format_html
 from django.utils import timezone
-from .models import Quiz, Question, AnswerOption
-from notifications_api.services import send_quiz_notification
+from .models import Quiz, Question, AnswerOption, QuizAttempt
+from notifications_api.services import send_quiz_notification, create_push_job
 
 
 class AnswerOptionInline(admin.TabularInline):
@@ -101,7 +102,7 @@ class QuizAdmin(admin.ModelAdmin):
                 if success:
                     messages.success(
                         request,
-                        f'✅ Kuizi u ruajt dhe njoftimi u dërgua! Response: {response}'
+                        f'✅ Kuizi u ruajt dhe njoftimi u vendos në radhë: {response}'
                     )
                 else:
                     messages.warning(
@@ -115,41 +116,19 @@ class QuizAdmin(admin.ModelAdmin):
                 )
 
     def send_notification_for_quizzes(self, request, queryset):
-        """Dërgo notification për kuizet e zgjedhur"""
-        sent = 0
-        failed = 0
-        already_sent = 0
-
-        for quiz in queryset:
-            # Kontrollo nëse është dërguar tashmë
-            if quiz.notification_sent:
-                already_sent += 1
-                continue
-
-            try:
-                success, response = send_quiz_notification(quiz)
-                if success:
-                    sent += 1
-                else:
-                    failed += 1
-                    messages.warning(
-                        request,
-                        f'⚠️ Kuizi "{quiz.title}": {response}'
-                    )
-            except Exception as e:
-                failed += 1
-                messages.error(
-                    request,
-                    f'❌ Gabim për "{quiz.title}": {str(e)}'
-                )
-
-        # Mesazhet përfundimtare
-        if sent > 0:
-            messages.success(request, f'✅ U dërguan {sent} njoftime të reja')
+        """Krijon një punë të vetme për kuizet e zgjedhur; worker-i i dërgon në grupe"""
+        already_sent = queryset.filter(notification_sent=True).count()
+        quiz_ids = list(queryset.filter(notification_sent=False).values_list('id', flat=True))
+
+        if quiz_ids:
+            job = create_push_job('quiz', quiz_ids)
+            url = reverse('admin:notifications_api_pushjob_change', args=[job.pk])
+            messages.success(
+                request,
+                format_html('✅ U krijua puna <a href="{}">#{}</a> për {} njoftime', url, job.pk, len(quiz_ids))
+            )
         if already_sent > 0:
             messages.info(request, f'ℹ️ {already_sent} kuize kishin njoftim të dërguar tashmë')
-        if failed > 0:
-            messages.error(request, f'❌ {failed} njoftime dështuan')
 
     send_notification_for_quizzes.short_description = "🎯 Dërgo njoftim për kuizet e zgjedhur"
 
@@ -211,4 +190,20 @@ class AnswerOptionAdmin(admin.ModelAdmin):
             return format_html('<span style="color: green;">✓ Po</span>')
         return format_html('<span style="color: gray;">✗ Jo</span>')
 
-    is_correct.short_description = 'Përgjigje e saktë?'
\ No newline at end of file
+    is_correct.short_description = 'Përgjigje e saktë?'
+
+
+@admin.register(QuizAttempt)
+class QuizAttemptAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'quiz', 'user', 'score', 'total']
+    list_filter = ['created_at']
+    search_fields = ['quiz__title', 'user__email']
+    list_select_related = ['quiz', 'user']
+    raw_id_fields = ['quiz', 'user']
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class QuizesApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quizes_api'
+
+    def ready(self):
+        import quizes_api.signals
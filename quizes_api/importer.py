@@ -0,0 +1,198 @@
+import time
+import uuid
+
+from django.utils import timezone
+
+from be_blog.realtime import broadcast_content_update
+from books_api.importer import book_uuid_for
+from .models import AnswerOption, Question, Quiz
+
+
+def quiz_uuid_for(quiz_id):
+    """UUID deterministik i kuizit (i njëjtë me importet e mëparshme)"""
+    return uuid.uuid5(uuid.NAMESPACE_DNS, f"quiz_{quiz_id}")
+
+
+def question_uuid_for(quiz_id, question_id):
+    return uuid.uuid5(uuid.NAMESPACE_DNS, f"quiz_{quiz_id}_question_{question_id}")
+
+
+class InvalidQuiz(ValueError):
+    pass
+
+
+def _option_text(option_data):
+    return option_data.get('text', '') if isinstance(option_data, dict) else option_data
+
+
+def parse_quiz(quiz_data):
+    """
+    Kthen (quiz_uuid, numeric_book_id, title, questions) ku questions është
+    [(question_uuid, text, correct_option_index, [option texts])].
+    Ngre InvalidQuiz për fusha që mungojnë ose correctOptionIndex jashtë kufijve.
+    """
+    try:
+        quiz_id = quiz_data['id']
+        numeric_book_id = quiz_data['bookId']
+        title = quiz_data['title']
+    except (KeyError, TypeError) as exc:
+        raise InvalidQuiz(f'missing field {exc}')
+
+    questions = []
+    seen = set()
+    for index, question_data in enumerate(quiz_data.get('questions') or []):
+        try:
+            question_uuid = question_uuid_for(quiz_id, question_data['id'])
+            text = question_data['text']
+            correct = question_data['correctOptionIndex']
+            options = [_option_text(option) for option in question_data.get('options') or []]
+        except (KeyError, TypeError) as exc:
+            raise InvalidQuiz(f'question {index}: missing field {exc}')
+        if question_uuid in seen:
+            raise InvalidQuiz(f"question {question_data['id']}: duplicate id")
+        if isinstance(correct, bool) or not isinstance(correct, int) or not 0 <= correct < len(options):
+            raise InvalidQuiz(
+                f"question {question_data['id']}: correctOptionIndex {correct!r} "
+                f"out of range for {len(options)} options"
+            )
+        seen.add(question_uuid)
+        questions.append((question_uuid, text, correct, options))
+    return quiz_uuid_for(quiz_id), numeric_book_id, title, questions
+
+
+def _stored_signature(quiz):
+    return (
+        quiz.book_id,
+        quiz.title,
+        [
+            (question.pk, question.text, question.correct_option_index, [option.text for option in question.options.all()])
+            for question in quiz.questions.all()
+        ],
+    )
+
+
+class QuizImportEngine:
+    """
+    Importon kuizet në grupe: librat ekzistues lexohen një herë në memorie,
+    kuizet ekzistuese të grupit me 3 query, dhe vetëm kuizet e ndryshuara
+    shkruhen me bulk_create. Transaksionin e hap thirrësi (import_quizzes).
+
+    Me dry_run=True bëhet vetëm validimi dhe krahasimi, pa shkruar asgjë.
+    """
+
+    def __init__(self, book_id_mapping=None, dry_run=False):
+        from books_api.models import Book
+
+        self.book_id_mapping = book_id_mapping or {}
+        self.dry_run = dry_run
+        # Një query për të gjithë importin, jo një për kuiz
+        self.book_ids = set(Book.objects.values_list('pk', flat=True))
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.skipped = 0
+        self.invalid = 0
+        self.errors = []
+        self.quizzes = 0
+        self.rows = 0
+        self.elapsed = 0.0
+
+    @property
+    def quizzes_per_second(self):
+        return self.quizzes / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def book_uuid(self, numeric_book_id):
+        mapped = self.book_id_mapping.get(str(numeric_book_id))
+        return uuid.UUID(mapped) if mapped else book_uuid_for(numeric_book_id)
+
+    def import_batch(self, quizzes_data):
+        """Kthen [(title, status)] ku status është created/updated/unchanged/skipped/invalid"""
+        started = time.perf_counter()
+        results = []
+        parsed = {}
+        for quiz_data in quizzes_data:
+            self.quizzes += 1
+            title = quiz_data.get('title', '?') if isinstance(quiz_data, dict) else '?'
+            try:
+                quiz_uuid, numeric_book_id, title, questions = parse_quiz(quiz_data)
+            except InvalidQuiz as exc:
+                self.invalid += 1
+                self.errors.append(f"{title}: {exc}")
+                results.append((title, 'invalid'))
+                continue
+
+            book_uuid = self.book_uuid(numeric_book_id)
+            if book_uuid not in self.book_ids:
+                self.skipped += 1
+                self.errors.append(f'{title}: book {numeric_book_id} ({str(book_uuid)[:8]}...) not found')
+                results.append((title, 'skipped'))
+                continue
+            # Kuizi i fundit me të njëjtin id fiton
+            parsed[quiz_uuid] = (book_uuid, title, questions)
+
+        existing = {
+            quiz.pk: _stored_signature(quiz)
+            for quiz in Quiz.objects.with_questions().filter(pk__in=parsed)
+        }
+        changed = {}
+        for quiz_uuid, (book_uuid, title, questions) in parsed.items():
+            if quiz_uuid not in existing:
+                status = 'created'
+            elif existing[quiz_uuid] == (book_uuid, title, questions):
+                status = 'unchanged'
+            else:
+                status = 'updated'
+            if status != 'unchanged':
+                changed[quiz_uuid] = (status, book_uuid, title, questions)
+            setattr(self, status, getattr(self, status) + 1)
+            results.append((title, status))
+
+        if changed and not self.dry_run:
+            self._write(changed)
+        else:
+            self.rows += sum(
+                1 + len(questions) + sum(len(options) for _, _, _, options in questions)
+                for _, _, _, questions in changed.values()
+            )
+        self.elapsed += time.perf_counter() - started
+        return results
+
+    def _write(self, changed):
+        now = timezone.now()
+        # bulk_create nuk dërgon sinjale - updated_at vendoset këtu (ETag, bundle)
+        quizzes = [
+            Quiz(id=quiz_uuid, book_id=book_uuid, title=title, created_at=now, updated_at=now)
+            for quiz_uuid, (status, book_uuid, title, questions) in changed.items()
+        ]
+        Quiz.objects.bulk_create(
+            quizzes, update_conflicts=True, unique_fields=['id'], update_fields=['book', 'title', 'updated_at']
+        )
+
+        questions = [
+            Question(id=question_uuid, quiz_id=quiz_uuid, text=text, correct_option_index=correct, order=order)
+            for quiz_uuid, (_, _, _, quiz_questions) in changed.items()
+            for order, (question_uuid, text, correct, options) in enumerate(quiz_questions)
+        ]
+        # Pyetjet ruajnë id-në, që statistikat e përgjigjeve të mos fshihen
+        Question.objects.filter(quiz_id__in=changed).exclude(pk__in=[q.pk for q in questions]).delete()
+        Question.objects.bulk_create(
+            questions, batch_size=500, update_conflicts=True, unique_fields=['id'],
+            update_fields=['quiz', 'text', 'correct_option_index', 'order']
+        )
+
+        AnswerOption.objects.filter(question__quiz_id__in=changed).delete()
+        options = [
+            AnswerOption(question_id=question_uuid, text=text, order=order)
+            for _, (_, _, _, quiz_questions) in changed.items()
+            for question_uuid, _, _, option_texts in quiz_questions
+            for order, text in enumerate(option_texts)
+        ]
+        AnswerOption.objects.bulk_create(options, batch_size=500)
+        self.rows += len(quizzes) + len(questions) + len(options)
+
+        for quiz_uuid, (status, *_) in changed.items():
+            broadcast_content_update('quiz', quiz_uuid, status)
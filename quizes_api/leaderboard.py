@@ -0,0 +1,188 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import LeaderboardEntry, LeaderboardLock, QuizAttempt, UserQuizScore, UserTotalScore
+
+# Sa rreshta mban tabela e renditjes për çdo kuiz dhe për renditjen globale
+LEADERBOARD_SIZE = getattr(settings, 'LEADERBOARD_SIZE', 100)
+# Cache-Control max-age i endpoint-eve publike të renditjes
+LEADERBOARD_MAX_AGE = getattr(settings, 'LEADERBOARD_MAX_AGE', 30)
+
+# Pikët zbritës, në barazim fiton kush i arriti më herët
+RANK_ORDER = ('-score', 'achieved_at', 'user_id')
+
+
+def record_score(attempt):
+    """
+    Përditëson pikët më të mira, totalin dhe top-K pas një zgjidhjeje.
+    Thirret nga submit_attempt brenda transaksionit; pikët vetëm rriten,
+    prandaj mjafton të krahasohet me rreshtin e fundit të top-K.
+    """
+    if attempt.user_id is None:
+        return
+
+    best, created = UserQuizScore.objects.select_for_update().get_or_create(
+        user_id=attempt.user_id,
+        quiz_id=attempt.quiz_id,
+        defaults={'best_score': attempt.score, 'attempts': 1, 'achieved_at': attempt.created_at}
+    )
+    gained = attempt.score if created else max(attempt.score - best.best_score, 0)
+    if not created:
+        changes = {'attempts': F('attempts') + 1}
+        if gained:
+            changes.update(best_score=attempt.score, achieved_at=attempt.created_at)
+        UserQuizScore.objects.filter(pk=best.pk).update(**changes)
+    if not created and not gained:
+        return
+
+    update_top(attempt.quiz_id, attempt.user_id, attempt.score, attempt.created_at)
+
+    UserTotalScore.objects.bulk_create(
+        [UserTotalScore(user_id=attempt.user_id, achieved_at=attempt.created_at)],
+        ignore_conflicts=True
+    )
+    totals = UserTotalScore.objects.filter(user_id=attempt.user_id)
+    totals.update(
+        total_score=F('total_score') + gained,
+        quizzes=F('quizzes') + (1 if created else 0),
+        achieved_at=attempt.created_at
+    )
+    update_top(None, attempt.user_id, totals.values_list('total_score', flat=True).get(), attempt.created_at)
+
+
+def update_top(quiz_id, user_id, score, achieved_at):
+    """
+    Vendos përdoruesin në top-K të kuizit (ose global kur quiz_id=None) nëse e meriton.
+    Tabela bllokohet me LeaderboardLock, ndryshe dy zgjidhje njëkohësisht lexojnë të
+    njëjtin rresht të K-të dhe tabela mbetet me K+1 rreshta.
+    """
+    LeaderboardLock.objects.select_for_update().get_or_create(key=str(quiz_id) if quiz_id else 'global')
+    entries = LeaderboardEntry.objects.filter(quiz_id=quiz_id)
+
+    def update_entry():
+        # update() nuk prek auto_now - updated_at hyn në ETag-un e endpoint-it
+        return entries.filter(user_id=user_id).update(score=score, achieved_at=achieved_at, updated_at=timezone.now())
+
+    if update_entry():
+        return
+
+    try:
+        with transaction.atomic():
+            # Më pak se K rreshta: ose ka pak lojtarë, ose u fshinë përdorues (CASCADE).
+            # Plotësohet nga pikët, që të hyjnë edhe ata që kishin mbetur poshtë kufirit.
+            missing = LEADERBOARD_SIZE - entries.count()
+            if missing > 0:
+                _refill(quiz_id, entries, missing)
+                return
+
+            # Rreshti i K-të i tabelës së plotë
+            pk, worst = entries.order_by(*RANK_ORDER).values_list('pk', 'score')[LEADERBOARD_SIZE - 1]
+            # Në barazim fiton i hershmi, pra ai që është tashmë në tabelë
+            if score <= worst:
+                return
+            LeaderboardEntry.objects.filter(pk=pk).delete()
+            LeaderboardEntry.objects.create(quiz_id=quiz_id, user_id=user_id, score=score, achieved_at=achieved_at)
+    except IntegrityError:
+        # Një transaksion tjetër e futi përdoruesin ndërkohë (p.sh. snapshot i vjetër
+        # para bllokimit): rreshti ekziston, mjafton përditësimi
+        update_entry()
+
+
+def _refill(quiz_id, entries, missing):
+    """Shton `missing` rreshtat më të mirë nga UserQuizScore/UserTotalScore që s'janë në tabelë"""
+    if quiz_id is None:
+        scores, score_field = UserTotalScore.objects.all(), 'total_score'
+    else:
+        scores, score_field = UserQuizScore.objects.filter(quiz_id=quiz_id), 'best_score'
+    best = scores.exclude(user_id__in=entries.values('user_id')).order_by(
+        f'-{score_field}', 'achieved_at', 'user_id'
+    ).values_list('user_id', score_field, 'achieved_at')[:missing]
+    LeaderboardEntry.objects.bulk_create([
+        LeaderboardEntry(quiz_id=quiz_id, user_id=user_id, score=score, achieved_at=achieved_at)
+        for user_id, score, achieved_at in best
+    ])
+
+
+def _rank(queryset, score_field, user):
+    row = queryset.filter(user=user).values_list(score_field, 'achieved_at').first()
+    if row is None:
+        return None
+    score, achieved_at = row
+    # Numërim mbi indeksin (score, achieved_at), pa renditur të gjithë
+    ahead = queryset.filter(
+        Q(**{f'{score_field}__gt': score}) | Q(**{score_field: score, 'achieved_at__lt': achieved_at})
+    ).count()
+    return {'rank': ahead + 1, 'score': score, 'achievedAt': achieved_at.isoformat()}
+
+
+def quiz_rank(quiz, user):
+    """Vendi i përdoruesit në kuiz, edhe jashtë top-K; None nëse nuk ka luajtur"""
+    return _rank(UserQuizScore.objects.filter(quiz=quiz), 'best_score', user)
+
+
+def global_rank(user):
+    return _rank(UserTotalScore.objects.all(), 'total_score', user)
+
+
+def entry_data(entry, rank):
+    return {
+        'rank': rank,
+        'userId': entry.user_id,
+        'name': entry.user.name,
+        'score': entry.score,
+        'achievedAt': entry.achieved_at.isoformat(),
+    }
+
+
+def rebuild_leaderboards():
+    """
+    Rindërton pikët, totalet dhe top-K nga QuizAttempt (p.sh. pas fshirjes së
+    kuizeve ose për zgjidhjet e ruajtura para renditjes). Lexon të gjitha attempts.
+    """
+    best = {}
+    attempts = QuizAttempt.objects.filter(user__isnull=False).order_by('created_at')
+    for user_id, quiz_id, score, created_at in attempts.values_list('user_id', 'quiz_id', 'score', 'created_at').iterator():
+        current = best.get((user_id, quiz_id))
+        if current is None:
+            best[(user_id, quiz_id)] = [score, 1, created_at]
+        else:
+            current[1] += 1
+            if score > current[0]:
+                current[0], current[2] = score, created_at
+
+    totals = {}
+    for (user_id, quiz_id), (score, count, achieved_at) in best.items():
+        total = totals.setdefault(user_id, [0, 0, achieved_at])
+        total[0] += score
+        total[1] += 1
+        total[2] = max(total[2], achieved_at)
+
+    def top(rows):
+        return sorted(rows, key=lambda row: (-row[2], row[3], row[1]))[:LEADERBOARD_SIZE]
+
+    by_quiz = {}
+    for (user_id, quiz_id), (score, count, achieved_at) in best.items():
+        by_quiz.setdefault(quiz_id, []).append((quiz_id, user_id, score, achieved_at))
+    entries = [row for rows in by_quiz.values() for row in top(rows)]
+    entries += top([(None, user_id, score, achieved_at) for user_id, (score, count, achieved_at) in totals.items()])
+
+    with transaction.atomic():
+        UserQuizScore.objects.all().delete()
+        UserTotalScore.objects.all().delete()
+        LeaderboardEntry.objects.all().delete()
+        UserQuizScore.objects.bulk_create([
+            UserQuizScore(user_id=user_id, quiz_id=quiz_id, best_score=score, attempts=count, achieved_at=achieved_at)
+            for (user_id, quiz_id), (score, count, achieved_at) in best.items()
+        ], batch_size=1000)
+        UserTotalScore.objects.bulk_create([
+            UserTotalScore(user_id=user_id, total_score=score, quizzes=count, achieved_at=achieved_at)
+            for user_id, (score, count, achieved_at) in totals.items()
+        ], batch_size=1000)
+        LeaderboardEntry.objects.bulk_create([
+            LeaderboardEntry(quiz_id=quiz_id, user_id=user_id, score=score, achieved_at=achieved_at)
+            for quiz_id, user_id, score, achieved_at in entries
+        ], batch_size=1000)
+
+    return {'scores': len(best), 'users': len(totals), 'entries': len(entries)}
@@ -1,10 +1,12 @@
 import json
 import os
-import uuid
+from itertools import islice
 from django.core.management.base import BaseCommand
 from django.conf import settings
-from quizes_api.models import Quiz, Question, AnswerOption
-from books_api.models import Book
+from django.db import transaction
+from be_blog.jsonstream import iter_json_array
+from quizes_api.models import Quiz
+from quizes_api.importer import QuizImportEngine
 
 
 class Command(BaseCommand):
@@ -22,6 +24,22 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing quizzes before import'
         )
+        parser.add_argument(
+            '--stream',
+            action='store_true',
+            help='Parse the JSON file incrementally, one object at a time'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate the file (correctOptionIndex bounds, books) and report throughput without writing'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Quizzes compared and written per bulk batch'
+        )
 
     def handle(self, *args, **options):
         file_path = options['file']
@@ -54,128 +72,60 @@ class Command(BaseCommand):
         # Lexo JSON file
         self.stdout.write(f'Reading file: {file_path}')
         with open(file_path, 'r', encoding='utf-8') as file:
-            quizzes_data = json.load(file)
-
-        # Clear existing nëse është specifikuar
-        if options['clear']:
-            self.stdout.write('Clearing existing quizzes...')
-            Quiz.objects.all().delete()
-            self.stdout.write(self.style.WARNING('All quizzes deleted!'))
-
-        # Import quizzes
-        created_count = 0
-        updated_count = 0
-        skipped_count = 0
-
-        for quiz_data in quizzes_data:
-            self.stdout.write(f"\nProcessing quiz: {quiz_data['title']}")
-
-            # ✅ Gjej book UUID nga mapping ose gjenero
-            numeric_book_id = quiz_data['bookId']
-
-            if numeric_book_id in book_id_mapping:
-                book_uuid_str = book_id_mapping[numeric_book_id]
-                book_uuid = uuid.UUID(book_uuid_str)
+            if options['stream']:
+                # Një objekt në memorie për herë, jo gjithë file-i
+                quizzes_data = iter_json_array(file)
             else:
-                # Gjeneroj të njëjtin UUID që do gjeneronte import_books
-                book_uuid = uuid.uuid5(uuid.NAMESPACE_DNS, f"book_{numeric_book_id}")
-                self.stdout.write(
-                    self.style.WARNING(f'  Generated UUID for book {numeric_book_id}: {str(book_uuid)[:8]}...')
-                )
-
-            # Kontrollo nëse libri ekziston
-            try:
-                book = Book.objects.get(id=book_uuid)
-                self.stdout.write(
-                    self.style.SUCCESS(f'  Found book: {book.title}')
-                )
-            except Book.DoesNotExist:
-                self.stdout.write(
-                    self.style.ERROR(
-                        f'  ✗ Skipped quiz: Book with numeric ID {numeric_book_id} (UUID: {str(book_uuid)[:8]}...) not found'
-                    )
-                )
-                skipped_count += 1
-                continue
-
-            # ✅ Gjeneroj UUID deterministik për quiz
-            quiz_uuid = uuid.uuid5(uuid.NAMESPACE_DNS, f"quiz_{quiz_data['id']}")
-
-            # Krijo ose përditëso quiz-in
-            quiz, created = Quiz.objects.update_or_create(
-                id=quiz_uuid,
-                defaults={
-                    'book': book,
-                    'title': quiz_data['title'],
-                }
-            )
-
-            if created:
-                created_count += 1
-                self.stdout.write(
-                    self.style.SUCCESS(f'  ✓ Created quiz: {quiz.title} (ID: {str(quiz_uuid)[:8]}...)')
-                )
-            else:
-                updated_count += 1
-                self.stdout.write(
-                    self.style.WARNING(f'  ↻ Updated quiz: {quiz.title}')
-                )
-
-            # Menaxho questions
-            existing_question_ids = []
-
-            for q_index, question_data in enumerate(quiz_data.get('questions', [])):
-                # ✅ Gjeneroj UUID deterministik për question
-                question_uuid = uuid.uuid5(
-                    uuid.NAMESPACE_DNS,
-                    f"quiz_{quiz_data['id']}_question_{question_data['id']}"
-                )
-
-                question, q_created = Question.objects.update_or_create(
-                    id=question_uuid,
-                    defaults={
-                        'quiz': quiz,
-                        'text': question_data['text'],
-                        'correct_option_index': question_data['correctOptionIndex'],
-                        'order': q_index
-                    }
-                )
-                existing_question_ids.append(question.id)
-
-                if q_created:
-                    self.stdout.write(f'    + Added question: {question.text[:50]}...')
-
-                # Menaxho answer options
-                existing_option_ids = []
-
-                for opt_index, option_data in enumerate(question_data.get('options', [])):
-                    text = option_data.get('text', '') if isinstance(option_data, dict) else option_data
-
-                    option, opt_created = AnswerOption.objects.update_or_create(
-                        question=question,
-                        order=opt_index,
-                        defaults={
-                            'text': text,
-                        }
-                    )
-                    existing_option_ids.append(option.id)
-
-                # Fshi options që nuk janë më në JSON
-                question.options.exclude(id__in=existing_option_ids).delete()
-
-            # Fshi questions që nuk janë më në JSON
-            quiz.questions.exclude(id__in=existing_question_ids).delete()
+                quizzes_data = json.load(file)
+            self.import_quizzes(quizzes_data, book_id_mapping, options)
+
+    def import_quizzes(self, quizzes_data, book_id_mapping, options):
+        dry_run = options['dry_run']
+        if dry_run:
+            self.stdout.write(self.style.WARNING('Dry run - nothing will be written'))
+
+        # E gjithë importimi në një transaksion: ose të gjitha kuizet, ose asnjë
+        with transaction.atomic():
+            # Clear existing nëse është specifikuar
+            if options['clear'] and not dry_run:
+                self.stdout.write('Clearing existing quizzes...')
+                Quiz.objects.all().delete()
+                self.stdout.write(self.style.WARNING('All quizzes deleted!'))
+
+            engine = QuizImportEngine(book_id_mapping, dry_run=dry_run)
+            quizzes_data = iter(quizzes_data)
+            while True:
+                batch = list(islice(quizzes_data, options['batch_size']))
+                if not batch:
+                    break
+                for title, status in engine.import_batch(batch):
+                    if status == 'created':
+                        self.stdout.write(self.style.SUCCESS(f'✓ Created quiz: {title}'))
+                    elif status == 'updated':
+                        self.stdout.write(self.style.WARNING(f'↻ Updated quiz: {title}'))
+                    elif status == 'unchanged':
+                        self.stdout.write(f'= Unchanged quiz: {title}')
+
+        for error in engine.errors:
+            self.stdout.write(self.style.ERROR(f'✗ {error}'))
 
         # Summary
         self.stdout.write(
             self.style.SUCCESS(
-                f'\n\nImport completed! Created: {created_count}, '
-                f'Updated: {updated_count}, Skipped: {skipped_count}'
+                f'\n{"Dry run" if dry_run else "Import"} completed! Created: {engine.created}, '
+                f'Updated: {engine.updated}, Unchanged: {engine.unchanged}, '
+                f'Skipped: {engine.skipped}, Invalid: {engine.invalid}'
             )
         )
+        self.stdout.write(
+            f'{engine.quizzes} quizzes, {engine.rows} rows {"to write" if dry_run else "written"} '
+            f'in {engine.elapsed:.2f}s ({engine.quizzes_per_second:.0f} quizzes/sec, '
+            f'{engine.rows_per_second:.0f} rows/sec)'
+        )
 
         """
         python manage.py import_quizzes
 # Ose me opsione
 python manage.py import_quizzes --file=quizzes.json --clear
-        """
\ No newline at end of file
+python manage.py import_quizzes --dry-run
+        """
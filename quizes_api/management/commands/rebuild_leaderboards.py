@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from quizes_api.leaderboard import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = 'Rebuild best scores, totals and top-K leaderboards from stored quiz attempts'
+
+    def handle(self, *args, **options):
+        result = rebuild_leaderboards()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {result['scores']} scores, {result['users']} users, {result['entries']} leaderboard entries"
+        ))
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books_api', '0004_delta_sync'),
+        ('quizes_api', '0002_quiz_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='answeroption',
+            index=models.Index(fields=['question', 'order'], name='option_question_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['quiz', 'order'], name='question_quiz_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['book', 'created_at'], name='quiz_book_created_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizes_api', '0005_leaderboards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+            ],
+        ),
+    ]
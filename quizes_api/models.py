@@ -1,23 +1,47 @@
+from django.conf import settings
 from django.db import models
 import uuid
 from books_api.models import Book
 
 
+def questions_prefetch():
+    """Prefetch i pyetjeve dhe opsioneve, i renditur, një query për nivel"""
+    return models.Prefetch(
+        'questions',
+        queryset=Question.objects.order_by('order').prefetch_related(
+            models.Prefetch('options', queryset=AnswerOption.objects.order_by('order'))
+        )
+    )
+
+
+class QuizQuerySet(models.QuerySet):
+    def with_questions(self):
+        """Ngarkon pyetjet dhe opsionet me nga një query për secilin nivel"""
+        return self.prefetch_related(questions_prefetch())
+
+
 class Quiz(models.Model):
     # ✅ UUID automatik
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name='quizzes')
     title = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     # Tracking
     notification_sent = models.BooleanField(default=False, verbose_name='Njoftimi u dërgua')
     notification_sent_at = models.DateTimeField(null=True, blank=True, verbose_name='Dërguar më')
     notification_count = models.IntegerField(default=0, verbose_name='Nr. njoftimesh')
 
+    objects = QuizQuerySet.as_manager()
+
     class Meta:
         verbose_name_plural = "Quizzes"
         ordering = ['-created_at']
+        indexes = [
+            # by_book dhe bundle: filter sipas librit, renditje sipas created_at
+            models.Index(fields=['book', 'created_at'], name='quiz_book_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -33,6 +57,9 @@ class Question(models.Model):
 
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['quiz', 'order'], name='question_quiz_order_idx'),
+        ]
 
     def __str__(self):
         return f"{self.text[:50]}..."
@@ -45,6 +72,128 @@ class AnswerOption(models.Model):
 
     class Meta:
         ordering = ['order']
+        indexes = [
+            models.Index(fields=['question', 'order'], name='option_question_order_idx'),
+        ]
+
+    def __str__(self):
+        return self.text[:30]
+
+
+class QuizAttempt(models.Model):
+    """Një zgjidhje e dërguar; pikët llogariten në server"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='attempts')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        null=True, blank=True, related_name='quiz_attempts'
+    )
+    # {question_id: option_index} siç u dërgua nga klienti
+    answers = models.JSONField(default=dict)
+    score = models.IntegerField()
+    total = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['quiz', 'created_at'], name='attempt_quiz_created_idx'),
+        ]
 
     def __str__(self):
-        return self.text[:30]
\ No newline at end of file
+        return f"{self.quiz} - {self.score}/{self.total}"
+
+
+class QuestionOptionStat(models.Model):
+    """Histogrami i përgjigjeve: sa herë u zgjodh secili opsion i një pyetjeje"""
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='option_stats')
+    option_index = models.IntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['question', 'option_index'], name='option_stat_unique'),
+        ]
+
+
+class QuizScoreStat(models.Model):
+    """Shpërndarja e pikëve: sa zgjidhje të një kuizi morën `score` pikë"""
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='score_stats')
+    score = models.IntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['quiz', 'score'], name='score_stat_unique'),
+        ]
+
+
+class UserQuizScore(models.Model):
+    """Pikët më të mira të një përdoruesi për një kuiz; renditja lexon indeksin, jo attempts"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='quiz_scores')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='user_scores')
+    best_score = models.IntegerField(default=0)
+    attempts = models.IntegerField(default=0)
+    # Kur u arrit best_score për herë të parë - në barazim fiton më i hershmi
+    achieved_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'quiz'], name='user_quiz_score_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['quiz', '-best_score', 'achieved_at'], name='user_quiz_score_rank_idx'),
+        ]
+
+
+class UserTotalScore(models.Model):
+    """Shuma e pikëve më të mira të përdoruesit në të gjitha kuizet"""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='total_score')
+    total_score = models.IntegerField(default=0)
+    quizzes = models.IntegerField(default=0)
+    achieved_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-total_score', 'achieved_at'], name='user_total_score_rank_idx'),
+        ]
+
+
+class LeaderboardLock(models.Model):
+    """
+    Një rresht për çdo tabelë renditjeje (key = id e kuizit ose 'global'):
+    update_top e bllokon me select_for_update, që ndryshimet e top-K të radhiten
+    """
+    key = models.CharField(max_length=64, unique=True)
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Top-K i parë për çdo kuiz (quiz=None është renditja globale), i mbajtur
+    i kufizuar nga quizes_api.leaderboard në çdo zgjidhje të re
+    """
+    quiz = models.ForeignKey(
+        Quiz, on_delete=models.CASCADE, null=True, blank=True, related_name='leaderboard_entries'
+    )
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    score = models.IntegerField()
+    achieved_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Leaderboard entries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['quiz', 'user'], condition=models.Q(quiz__isnull=False),
+                name='leaderboard_quiz_user_unique'
+            ),
+            models.UniqueConstraint(
+                fields=['user'], condition=models.Q(quiz__isnull=True),
+                name='leaderboard_global_user_unique'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['quiz', '-score', 'achieved_at'], name='leaderboard_rank_idx'),
+        ]
@@ -0,0 +1,124 @@
+import uuid
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .leaderboard import record_score
+from .models import Question, QuestionOptionStat, QuizAttempt, QuizScoreStat
+
+
+class InvalidAnswers(ValueError):
+    pass
+
+
+def parse_answers(quiz, answers):
+    """
+    Kthen [(question, option_index)] për përgjigjet e dërguara. Pyetjet e
+    kuizit pa përgjigje llogariten gabim; pyetjet e huaja ose indekset jashtë
+    kufijve ngrenë InvalidAnswers.
+    """
+    if not isinstance(answers, dict):
+        raise InvalidAnswers('answers duhet të jetë {questionId: optionIndex}')
+
+    questions = {
+        question.pk: question
+        for question in Question.objects.filter(quiz=quiz).annotate(option_count=Count('options'))
+    }
+    parsed = []
+    for question_id, option_index in answers.items():
+        try:
+            question = questions[uuid.UUID(str(question_id))]
+        except (ValueError, KeyError):
+            raise InvalidAnswers(f'Pyetje e panjohur: {question_id}')
+        if any(seen is question for seen, _ in parsed):
+            raise InvalidAnswers(f'Pyetje e përsëritur: {question_id}')
+        if isinstance(option_index, bool) or not isinstance(option_index, int) \
+                or not 0 <= option_index < question.option_count:
+            raise InvalidAnswers(f'Indeks i pavlefshëm për {question_id}: {option_index}')
+        parsed.append((question, option_index))
+    return parsed, len(questions)
+
+
+def _increment(model, parent_field, keys):
+    """
+    count += 1 për çdo (parent_id, vlerë) me dy query: krijon rreshtat që
+    mungojnë me count=0, pastaj një UPDATE me F() (pa race mes proceseve)
+    """
+    parent, value = parent_field
+    model.objects.bulk_create(
+        [model(**{f'{parent}_id': parent_id, value: key}) for parent_id, key in keys],
+        ignore_conflicts=True
+    )
+    model.objects.filter(
+        reduce(or_, (Q(**{f'{parent}_id': parent_id, value: key}) for parent_id, key in keys))
+    ).update(count=F('count') + 1)
+
+
+def submit_attempt(quiz, answers, user=None):
+    """
+    Vlerëson përgjigjet me Question.correct_option_index dhe përditëson
+    statistikat në të njëjtin transaksion. Kthen (attempt, rezultatet për pyetje).
+    """
+    parsed, total = parse_answers(quiz, answers)
+    score = sum(1 for question, option_index in parsed if option_index == question.correct_option_index)
+
+    with transaction.atomic():
+        attempt = QuizAttempt.objects.create(
+            quiz=quiz,
+            user=user if user is not None and user.is_authenticated else None,
+            answers={str(question.pk): option_index for question, option_index in parsed},
+            score=score,
+            total=total,
+        )
+        if parsed:
+            _increment(
+                QuestionOptionStat, ('question', 'option_index'),
+                [(question.pk, option_index) for question, option_index in parsed]
+            )
+        _increment(QuizScoreStat, ('quiz', 'score'), [(quiz.pk, score)])
+        record_score(attempt)
+
+    results = [
+        {
+            'questionId': str(question.pk),
+            'selectedIndex': option_index,
+            'correctIndex': question.correct_option_index,
+            'correct': option_index == question.correct_option_index,
+        }
+        for question, option_index in parsed
+    ]
+    return attempt, results
+
+
+def quiz_stats(quiz):
+    """Statistikat nga tabelat e agreguara, pa lexuar QuizAttempt"""
+    scores = dict(QuizScoreStat.objects.filter(quiz=quiz).values_list('score', 'count'))
+    attempts = sum(scores.values())
+
+    histograms = {}
+    for question_id, option_index, count in QuestionOptionStat.objects.filter(
+        question__quiz=quiz
+    ).values_list('question_id', 'option_index', 'count'):
+        histograms.setdefault(question_id, {})[option_index] = count
+
+    questions = []
+    # Meta.ordering nuk aplikohet në query me GROUP BY
+    for question in Question.objects.filter(quiz=quiz).annotate(option_count=Count('options')).order_by('order'):
+        counts = histograms.get(question.pk, {})
+        answered = sum(counts.values())
+        questions.append({
+            'questionId': str(question.pk),
+            'options': [counts.get(index, 0) for index in range(question.option_count)],
+            'answered': answered,
+            'correctRate': counts.get(question.correct_option_index, 0) / answered if answered else 0.0,
+        })
+
+    return {
+        'quizId': str(quiz.pk),
+        'attempts': attempts,
+        'averageScore': sum(score * count for score, count in scores.items()) / attempts if attempts else 0.0,
+        'scores': {str(score): count for score, count in sorted(scores.items())},
+        'questions': questions,
+    }
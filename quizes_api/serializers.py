@@ -13,6 +13,32 @@ class AnswerOptionSerializer(serializers.ModelSerializer):
         }
 
 
+def question_data(question, with_answer=False):
+    """Pyetja si dict, pa makinerinë e fushave të DRF (opsionet duhet të jenë prefetch)"""
+    data = {
+        'id': str(question.id),  # ✅ Konverto në string
+        'text': question.text,
+        'options': [option.text for option in question.options.all()],
+    }
+    if with_answer:
+        data['correctOptionIndex'] = question.correct_option_index
+    return data
+
+
+def quiz_data(quiz, with_answers=False):
+    """
+    Kuizi si dict; përdor Quiz.objects.with_questions() për 3 query gjithsej.
+    correctOptionIndex nuk dërgohet si parazgjedhje: kuizet vlerësohen në server
+    dhe përgjigjet e sakta vijnë vetëm në përgjigjen e /submit/.
+    """
+    return {
+        'id': str(quiz.id),  # ✅ Konverto në string
+        'bookId': str(quiz.book_id),  # ✅ Book UUID në string
+        'title': quiz.title,
+        'questions': [question_data(question, with_answers) for question in quiz.questions.all()]
+    }
+
+
 class QuestionSerializer(serializers.ModelSerializer):
     id = serializers.UUIDField(read_only=True)  # ✅ UUID
     options = AnswerOptionSerializer(many=True, read_only=True)
@@ -22,12 +48,7 @@ class QuestionSerializer(serializers.ModelSerializer):
         fields = ['id', 'text', 'options', 'correct_option_index']
 
     def to_representation(self, instance):
-        return {
-            'id': str(instance.id),  # ✅ Konverto në string
-            'text': instance.text,
-            'options': [opt['text'] for opt in self.fields['options'].to_representation(instance.options.all())],
-            'correctOptionIndex': instance.correct_option_index
-        }
+        return question_data(instance)
 
 
 class QuizSerializer(serializers.ModelSerializer):
@@ -42,13 +63,8 @@ class QuizSerializer(serializers.ModelSerializer):
         ]
 
     def to_representation(self, instance):
-        data = super().to_representation(instance)
-        return {
-            'id': str(instance.id),  # ✅ Konverto në string
-            'bookId': str(instance.book_id),  # ✅ Book UUID në string
-            'title': instance.title,
-            'questions': data['questions']
-        }
+        # Pa super(): fushat e nested serializer-ave nuk ndërtohen fare
+        return quiz_data(instance, self.context.get('with_answers', False))
 
 
 class QuizCreateSerializer(serializers.ModelSerializer):
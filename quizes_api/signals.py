@@ -0,0 +1,32 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from be_blog.realtime import broadcast_content_update
+from .models import Quiz, Question, AnswerOption
+
+
+@receiver(post_save, sender=Quiz)
+def quiz_saved(sender, instance, created=False, **kwargs):
+    broadcast_content_update('quiz', instance.pk, 'created' if created else 'updated')
+
+
+@receiver(post_delete, sender=Quiz)
+def quiz_deleted(sender, instance, **kwargs):
+    broadcast_content_update('quiz', instance.pk, 'deleted')
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender, instance, **kwargs):
+    """Ndryshimet e pyetjeve përditësojnë Quiz.updated_at (për ETag)"""
+    Quiz.objects.filter(pk=instance.quiz_id).update(updated_at=timezone.now())
+    broadcast_content_update('quiz', instance.quiz_id)
+
+
+@receiver(post_save, sender=AnswerOption)
+@receiver(post_delete, sender=AnswerOption)
+def option_changed(sender, instance, **kwargs):
+    Quiz.objects.filter(questions__id=instance.question_id).update(updated_at=timezone.now())
+    for quiz_id in Question.objects.filter(pk=instance.question_id).values_list('quiz_id', flat=True):
+        broadcast_content_update('quiz', quiz_id)
@@ -1,3 +1,385 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from books_api.importer import book_uuid_for
+from books_api.models import Book
+from .models import (
+    Quiz, Question, AnswerOption, QuizAttempt, QuestionOptionStat, QuizScoreStat,
+    LeaderboardEntry, LeaderboardLock, UserQuizScore, UserTotalScore
+)
+from .importer import question_uuid_for, quiz_uuid_for
+from .leaderboard import rebuild_leaderboards
+from .serializers import QuizSerializer
+
+
+def create_quiz(book=None, title='Kuiz', questions=2, options=3):
+    if book is None:
+        book = Book.objects.create(title='Libër', author='Autor', category='tjeter')
+    quiz = Quiz.objects.create(book=book, title=title)
+    for order in range(questions):
+        question = Question.objects.create(
+            quiz=quiz,
+            text=f'Pyetja {order}',
+            correct_option_index=0,
+            order=order
+        )
+        for option_order in range(options):
+            AnswerOption.objects.create(question=question, text=f'Opsioni {option_order}', order=option_order)
+    return quiz
+
+
+class QuizConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.quiz = create_quiz()
+
+    def test_by_book_returns_304_until_a_question_changes(self):
+        url = f'/api/quizzes/by_book/?book_id={self.quiz.book_id}'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        option = AnswerOption.objects.filter(question__quiz=self.quiz).first()
+        option.text = 'Ndryshuar'
+        option.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['questions'][0]['options'][0], 'Ndryshuar')
+
+    def test_by_book_rejects_invalid_uuid(self):
+        response = self.client.get('/api/quizzes/by_book/?book_id=jo-uuid')
+        self.assertEqual(response.status_code, 400)
+
+
+class QuizPrefetchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.book = Book.objects.create(title='Libër', author='Autor', category='tjeter')
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_does_not_grow_with_questions(self):
+        create_quiz(self.book, 'Një', questions=1, options=1)
+        small, _ = self.count_queries(f'/api/quizzes/by_book/?book_id={self.book.id}')
+        small_list, _ = self.count_queries('/api/quizzes/')
+
+        for i in range(4):
+            create_quiz(self.book, f'Kuiz {i}', questions=5, options=4)
+        large, response = self.count_queries(f'/api/quizzes/by_book/?book_id={self.book.id}')
+        large_list, _ = self.count_queries('/api/quizzes/')
+
+        # ETag + kuizet + pyetjet + opsionet
+        self.assertEqual(small, 4)
+        self.assertEqual(small, large)
+        self.assertEqual(small_list, large_list)
+        self.assertEqual(len(response.json()), 5)
+
+    def test_keeps_question_and_option_order(self):
+        quiz = Quiz.objects.create(book=self.book, title='Renditja')
+        for order in (2, 0, 1):
+            question = Question.objects.create(quiz=quiz, text=f'P{order}', correct_option_index=1, order=order)
+            for option_order in (1, 0):
+                AnswerOption.objects.create(question=question, text=f'O{option_order}', order=option_order)
+
+        data = QuizSerializer(Quiz.objects.with_questions().get(pk=quiz.pk), context={'with_answers': True}).data
+        self.assertEqual(data['bookId'], str(self.book.id))
+        self.assertEqual([q['text'] for q in data['questions']], ['P0', 'P1', 'P2'])
+        self.assertEqual(data['questions'][0]['options'], ['O0', 'O1'])
+        self.assertEqual(data['questions'][0]['correctOptionIndex'], 1)
+
+
+class QuizAttemptTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.quiz = create_quiz(questions=3, options=3)
+        self.questions = list(self.quiz.questions.order_by('order'))
+        # Përgjigjja e saktë e pyetjes së dytë është 2
+        Question.objects.filter(pk=self.questions[1].pk).update(correct_option_index=2)
+        self.url = f'/api/quizzes/{self.quiz.id}/submit/'
+
+    def submit(self, answers):
+        answers = {str(self.questions[index].id): option for index, option in answers.items()}
+        return self.client.post(self.url, {'answers': answers}, format='json')
+
+    def test_scores_on_server(self):
+        response = self.submit({0: 0, 1: 1})
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        # Pyetja pa përgjigje llogaritet gabim
+        self.assertEqual((data['score'], data['total']), (1, 3))
+        self.assertEqual([r['correct'] for r in data['results']], [True, False])
+        self.assertEqual(data['results'][1]['correctIndex'], 2)
+
+        attempt = QuizAttempt.objects.get(pk=data['attemptId'])
+        self.assertIsNone(attempt.user)
+        self.assertEqual(attempt.score, 1)
+
+    def test_authenticated_attempt_keeps_user(self):
+        user = get_user_model().objects.create_user('lexues@example.com', 'Lexues', 'pass')
+        self.client.force_authenticate(user)
+        self.submit({0: 0})
+        self.assertEqual(QuizAttempt.objects.get().user, user)
+
+    def test_rejects_invalid_answers(self):
+        other = create_quiz().questions.first()
+        cases = [
+            {'answers': {str(other.id): 0}},
+            {'answers': {str(self.questions[0].id): 3}},
+            {'answers': {str(self.questions[0].id): '1'}},
+            {'answers': {'jo-uuid': 0}},
+            {'answers': [0, 1]},
+            {},
+            [0, 1],
+        ]
+        for payload in cases:
+            self.assertEqual(self.client.post(self.url, payload, format='json').status_code, 400, payload)
+        self.assertFalse(QuizAttempt.objects.exists())
+        self.assertEqual(self.client.post('/api/quizzes/jo-uuid/submit/', {}, format='json').status_code, 404)
+
+    def test_plain_get_hides_correct_answers_until_submit(self):
+        data = self.client.get(f'/api/quizzes/{self.quiz.id}/').json()
+        self.assertTrue(all('correctOptionIndex' not in q for q in data['questions']))
+        by_book = self.client.get(f'/api/quizzes/by_book/?book_id={self.quiz.book_id}').json()
+        self.assertNotIn('correctOptionIndex', by_book[0]['questions'][0])
+        listed = self.client.get('/api/quizzes/').json()
+        listed = listed['results'] if isinstance(listed, dict) else listed
+        self.assertNotIn('correctOptionIndex', listed[0]['questions'][0])
+        # Parametri i vjetër nuk i zbulon më
+        data = self.client.get(f'/api/quizzes/{self.quiz.id}/?scored=0').json()
+        self.assertNotIn('correctOptionIndex', data['questions'][0])
+
+        self.assertEqual(self.submit({1: 0}).json()['results'][0]['correctIndex'], 2)
+
+    @override_settings(QUIZ_SUBMIT_RATE='2/min')
+    def test_submit_is_rate_limited(self):
+        self.assertEqual(self.submit({0: 0}).status_code, 201)
+        self.assertEqual(self.submit({0: 0}).status_code, 201)
+        self.assertEqual(self.submit({0: 0}).status_code, 429)
+        self.assertEqual(QuizAttempt.objects.count(), 2)
+
+    def test_aggregates_are_updated_incrementally(self):
+        self.submit({0: 0, 1: 2, 2: 0})
+        self.submit({0: 1, 1: 2})
+        # Numër konstant query-sh: kuizi, pyetjet, attempt-i, 2+2 për numrat, savepoint-et
+        with self.assertNumQueries(9):
+            self.submit({0: 0, 1: 0, 2: 1})
+
+        self.assertEqual(QuestionOptionStat.objects.get(question=self.questions[0], option_index=0).count, 2)
+        self.assertEqual(
+            dict(QuizScoreStat.objects.filter(quiz=self.quiz).values_list('score', 'count')),
+            {3: 1, 1: 2}
+        )
+
+        # Kuizi, pikët, histogramet, pyetjet - asnjë lexim i QuizAttempt
+        with self.assertNumQueries(4):
+            stats = self.client.get(f'/api/quizzes/{self.quiz.id}/stats/').json()
+        self.assertEqual(stats['attempts'], 3)
+        self.assertEqual(stats['scores'], {'1': 2, '3': 1})
+        self.assertAlmostEqual(stats['averageScore'], 5 / 3)
+        self.assertEqual(stats['questions'][0]['options'], [2, 1, 0])
+        self.assertEqual(stats['questions'][1]['correctRate'], 2 / 3)
+        self.assertEqual(stats['questions'][2]['answered'], 2)
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.quiz = create_quiz(questions=3, options=2)
+        self.other = create_quiz(self.quiz.book, 'Tjetër', questions=2, options=2)
+        User = get_user_model()
+        self.users = [User.objects.create_user(f'u{i}@example.com', f'Lexues {i}', 'pass') for i in range(4)]
+
+    def play(self, user, quiz, correct):
+        """Dërgon një zgjidhje me `correct` përgjigje të sakta (0 është e saktë te create_quiz)"""
+        answers = {str(q.id): 0 if i < correct else 1 for i, q in enumerate(quiz.questions.order_by('order'))}
+        self.client.force_authenticate(user)
+        response = self.client.post(f'/api/quizzes/{quiz.id}/submit/', {'answers': answers}, format='json')
+        self.client.force_authenticate(None)
+        self.assertEqual(response.status_code, 201)
+
+    def test_keeps_best_score_and_totals(self):
+        user = self.users[0]
+        self.play(user, self.quiz, 2)
+        self.play(user, self.quiz, 1)
+        self.play(user, self.other, 2)
+
+        best = UserQuizScore.objects.get(user=user, quiz=self.quiz)
+        self.assertEqual((best.best_score, best.attempts), (2, 2))
+        total = UserTotalScore.objects.get(user=user)
+        self.assertEqual((total.total_score, total.quizzes), (4, 2))
+        self.assertEqual(LeaderboardEntry.objects.get(quiz__isnull=True, user=user).score, 4)
+
+    def test_top_k_stays_bounded(self):
+        with mock.patch('quizes_api.leaderboard.LEADERBOARD_SIZE', 2):
+            self.play(self.users[0], self.quiz, 1)
+            self.play(self.users[1], self.quiz, 2)
+            self.play(self.users[2], self.quiz, 1)  # barazim me users[0], por më vonë - jashtë
+            self.play(self.users[3], self.quiz, 3)
+            self.play(self.users[0], self.quiz, 3)  # rihyn me pikë më të mira
+
+        ranked = list(LeaderboardEntry.objects.filter(quiz=self.quiz).order_by('-score', 'achieved_at'))
+        self.assertEqual([entry.user for entry in ranked], [self.users[3], self.users[0]])
+
+        # Renditja jashtë top-K llogaritet nga UserQuizScore
+        self.client.force_authenticate(self.users[2])
+        rank = self.client.get(f'/api/quizzes/{self.quiz.id}/rank/').json()
+        self.assertEqual((rank['rank'], rank['score']), (4, 1))
+
+    def test_deleted_user_is_replaced_from_scores(self):
+        with mock.patch('quizes_api.leaderboard.LEADERBOARD_SIZE', 2):
+            self.play(self.users[0], self.quiz, 3)
+            self.play(self.users[1], self.quiz, 2)
+            self.play(self.users[2], self.quiz, 1)  # jashtë top-2
+            self.users[0].delete()
+            # I ardhuri me pikë më të ulëta nuk kalon para users[2]
+            self.play(self.users[3], self.quiz, 0)
+
+        ranked = LeaderboardEntry.objects.filter(quiz=self.quiz).order_by('-score', 'achieved_at')
+        self.assertEqual([entry.user for entry in ranked], [self.users[1], self.users[2]])
+        ranked = LeaderboardEntry.objects.filter(quiz__isnull=True).order_by('-score', 'achieved_at')
+        self.assertEqual([entry.user for entry in ranked], [self.users[1], self.users[2]])
+
+    def test_insert_conflict_does_not_fail_submit(self):
+        # Si transaksioni tjetër që e futi të njëjtin përdorues ndërkohë: submit nuk kthen 500
+        with mock.patch('quizes_api.leaderboard._refill', side_effect=IntegrityError('unique')):
+            self.play(self.users[0], self.quiz, 1)
+        self.assertFalse(LeaderboardEntry.objects.exists())
+        self.assertEqual(LeaderboardLock.objects.count(), 2)
+
+        # Zgjidhja e radhës e plotëson tabelën nga pikët
+        self.play(self.users[1], self.quiz, 2)
+        self.assertEqual(LeaderboardEntry.objects.filter(quiz=self.quiz).count(), 2)
+
+    def test_paged_endpoint_with_cache_headers(self):
+        for correct, user in enumerate(self.users):
+            self.play(user, self.quiz, correct)
+
+        url = f'/api/quizzes/{self.quiz.id}/leaderboard/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('public', response['Cache-Control'])
+        data = response.json()
+        self.assertEqual(data['count'], 4)
+        self.assertEqual([row['rank'] for row in data['results']], [1, 2, 3, 4])
+        self.assertEqual(data['results'][0]['name'], 'Lexues 3')
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.play(self.users[0], self.quiz, 3)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+        self.assertEqual(self.client.get('/api/quizzes/leaderboard/').json()['results'][0]['score'], 3)
+        self.assertEqual(self.client.get('/api/quizzes/leaderboard/rank/').status_code, 401)
+
+    def test_authenticated_responses_are_private(self):
+        self.play(self.users[0], self.quiz, 2)
+        self.client.force_authenticate(self.users[0])
+        for url in (
+            f'/api/quizzes/{self.quiz.id}/leaderboard/', '/api/quizzes/leaderboard/',
+            f'/api/quizzes/{self.quiz.id}/rank/', '/api/quizzes/leaderboard/rank/',
+        ):
+            cache_control = self.client.get(url)['Cache-Control']
+            self.assertIn('private', cache_control, url)
+            self.assertNotIn('public', cache_control, url)
+
+    def test_rebuild_matches_incremental_state(self):
+        for correct, user in enumerate(self.users):
+            self.play(user, self.quiz, correct)
+            self.play(user, self.other, min(correct, 2))
+
+        def state():
+            return sorted(LeaderboardEntry.objects.values_list('quiz_id', 'user_id', 'score'), key=str)
+
+        before = state()
+        result = rebuild_leaderboards()
+        self.assertEqual(state(), before)
+        self.assertEqual(result['users'], 4)
+
+
+class QuizImportTests(TestCase):
+    def setUp(self):
+        # Të njëjtët UUID si import_books, pa varur nga book_id_mapping.json
+        self.book = Book.objects.create(id=book_uuid_for('9001'), title='Libër', author='Autor', category='tjeter')
+        self.data = [
+            {
+                'id': f'test_{index}',
+                'bookId': '9001',
+                'title': f'Kuiz {index}',
+                'questions': [
+                    {
+                        'id': f'q{number}',
+                        'text': f'Pyetja {number}',
+                        'options': [{'text': 'A'}, {'text': 'B'}, 'C'],
+                        'correctOptionIndex': number % 3,
+                    }
+                    for number in range(3)
+                ],
+            }
+            for index in range(4)
+        ]
+
+    def run_import(self, data, *args):
+        handle, path = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(handle, 'w', encoding='utf-8') as fp:
+            json.dump(data, fp)
+        self.addCleanup(os.remove, path)
+        out = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_quizzes', f'--file={path}', '--batch-size=2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_bulk_import_with_deterministic_ids(self):
+        with CaptureQueriesContext(connection) as ctx:
+            output = self.run_import(self.data)
+        self.assertIn('Created: 4', output)
+        # Librat një herë + savepoint; për secilin nga 2 grupet: kuizet ekzistuese,
+        # upsert i kuizeve, fshirje + upsert i pyetjeve, fshirje + insert i opsioneve
+        self.assertEqual(len(ctx.captured_queries), 3 + 2 * 6)
+
+        quiz = Quiz.objects.with_questions().get(pk=quiz_uuid_for('test_1'))
+        self.assertEqual(quiz.book_id, self.book.id)
+        questions = list(quiz.questions.all())
+        self.assertEqual(questions[2].pk, question_uuid_for('test_1', 'q2'))
+        self.assertEqual([option.text for option in questions[0].options.all()], ['A', 'B', 'C'])
+        self.assertEqual(AnswerOption.objects.count(), 4 * 3 * 3)
+
+    def test_reimport_only_rewrites_changed_quizzes(self):
+        self.run_import(self.data)
+        QuestionOptionStat.objects.create(question_id=question_uuid_for('test_0', 'q0'), option_index=1, count=5)
+        untouched = Quiz.objects.get(pk=quiz_uuid_for('test_2')).updated_at
+
+        self.data[0]['questions'][0]['text'] = 'Ndryshuar'
+        del self.data[0]['questions'][2]
+        output = self.run_import(self.data)
+        self.assertIn('Updated: 1, Unchanged: 3', output)
+
+        quiz = Quiz.objects.get(pk=quiz_uuid_for('test_0'))
+        self.assertEqual([q.text for q in quiz.questions.all()], ['Ndryshuar', 'Pyetja 1'])
+        # Pyetja ruan id-në, prandaj edhe statistikat e saj
+        self.assertEqual(QuestionOptionStat.objects.get().count, 5)
+        self.assertEqual(Quiz.objects.get(pk=quiz_uuid_for('test_2')).updated_at, untouched)
+
+    def test_dry_run_validates_without_writing(self):
+        self.data[1]['questions'][0]['correctOptionIndex'] = 3
+        self.data[2]['bookId'] = 'mungon'
+        output = self.run_import(self.data, '--dry-run')
+
+        self.assertFalse(Quiz.objects.exists())
+        self.assertIn('Created: 2', output)
+        self.assertIn('Skipped: 1, Invalid: 1', output)
+        self.assertIn('correctOptionIndex 3 out of range for 3 options', output)
+        self.assertIn('quizzes/sec', output)
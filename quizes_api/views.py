@@ -1,13 +1,31 @@
+import uuid
+
+from django.conf import settings
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny
-from .models import Quiz
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.throttling import UserRateThrottle
+from be_blog.conditional import ConditionalGetMixin
+from .leaderboard import LEADERBOARD_MAX_AGE, RANK_ORDER, entry_data, global_rank, quiz_rank
+from .models import LeaderboardEntry, Quiz
+from .scoring import InvalidAnswers, quiz_stats, submit_attempt
 from .serializers import QuizSerializer
 
 
-class QuizViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Quiz.objects.all()
+class SubmitRateThrottle(UserRateThrottle):
+    """Kufizon dërgimet e përgjigjeve për përdorues (IP për anonimët), p.sh. QUIZ_SUBMIT_RATE = '30/min'"""
+    scope = 'quiz_submit'
+
+    def get_rate(self):
+        return getattr(settings, 'QUIZ_SUBMIT_RATE', '30/min')
+
+
+class QuizViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Quiz.objects.with_questions()
     serializer_class = QuizSerializer
     permission_classes = [AllowAny]
 
@@ -16,10 +34,94 @@ class QuizViewSet(viewsets.ReadOnlyModelViewSet):
         """Merr kuizet për një libër të caktuar"""
         book_id = request.query_params.get('book_id', None)
         if book_id:
-            quizzes = Quiz.objects.filter(book_id=book_id)
-            serializer = self.get_serializer(quizzes, many=True)
-            return Response(serializer.data)
+            try:
+                book_id = uuid.UUID(book_id)
+            except ValueError:
+                return Response(
+                    {'error': 'book_id must be a valid UUID'},
+                    status=400
+                )
+            quizzes = self.get_queryset().filter(book_id=book_id)
+            return self.conditional_response(
+                request, quizzes,
+                lambda: Response(self.get_serializer(quizzes, many=True).data)
+            )
         return Response(
             {'error': 'book_id is required'},
             status=400
-        )
\ No newline at end of file
+        )
+
+    @action(detail=True, methods=['post'], throttle_classes=[SubmitRateThrottle])
+    def submit(self, request, pk=None):
+        """Vlerëson përgjigjet {answers: {questionId: optionIndex}} në server"""
+        quiz = self.get_quiz()
+        if not isinstance(request.data, dict):
+            return Response({'error': 'body duhet të jetë {answers: {...}}'}, status=400)
+        try:
+            attempt, results = submit_attempt(quiz, request.data.get('answers'), request.user)
+        except InvalidAnswers as exc:
+            return Response({'error': str(exc)}, status=400)
+        return Response({
+            'attemptId': str(attempt.id),
+            'score': attempt.score,
+            'total': attempt.total,
+            'results': results,
+        }, status=201)
+
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """Histogrami i opsioneve për pyetje dhe shpërndarja e pikëve"""
+        return Response(quiz_stats(self.get_quiz()))
+
+    @action(detail=True, methods=['get'])
+    def leaderboard(self, request, pk=None):
+        """Top-K i kuizit, me faqe"""
+        return self.leaderboard_response(request, LeaderboardEntry.objects.filter(quiz=self.get_quiz()))
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
+    def rank(self, request, pk=None):
+        """Vendi i përdoruesit në kuiz, edhe jashtë top-K"""
+        return self.private_response(quiz_rank(self.get_quiz(), request.user) or {'rank': None, 'score': None})
+
+    @action(detail=False, methods=['get'], url_path='leaderboard')
+    def global_leaderboard(self, request):
+        """Top-K sipas shumës së pikëve më të mira në të gjitha kuizet"""
+        return self.leaderboard_response(request, LeaderboardEntry.objects.filter(quiz__isnull=True))
+
+    @action(detail=False, methods=['get'], url_path='leaderboard/rank', permission_classes=[IsAuthenticated])
+    def global_rank(self, request):
+        return self.private_response(global_rank(request.user) or {'rank': None, 'score': None})
+
+    def leaderboard_response(self, request, entries):
+        """
+        Faqe nga tabela e kufizuar top-K, me ETag. Cache-Control është publik vetëm
+        për anonimët; me përdorues të identifikuar përgjigjja mbetet private.
+        """
+        entries = entries.select_related('user').order_by(*RANK_ORDER)
+
+        def respond():
+            page = self.paginate_queryset(entries)
+            start = self.paginator.page.start_index()
+            return self.get_paginated_response(
+                [entry_data(entry, start + index) for index, entry in enumerate(page)]
+            )
+
+        response = self.conditional_response(request, entries, respond)
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True, max_age=LEADERBOARD_MAX_AGE)
+        else:
+            patch_cache_control(response, public=True, max_age=LEADERBOARD_MAX_AGE)
+        return response
+
+    def private_response(self, data):
+        """Renditja e përdoruesit: asnjë cache i përbashkët nuk duhet ta ruajë"""
+        response = Response(data)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_quiz(self):
+        """Kuizi pa prefetch të pyetjeve; ID e pavlefshme jep 404"""
+        try:
+            return get_object_or_404(Quiz, pk=uuid.UUID(str(self.kwargs['pk'])))
+        except ValueError:
+            raise Http404